@@ -0,0 +1,89 @@
+"""Top-N selection timings: full sort versus factorlab_engine.selection.
+
+Run from services/engine:
+
+    python -m benchmarks.top_n_selection
+
+Times one ML rebalance day (pick ``top_n`` of a universe's predictions) and one baseline
+schedule (pick ``top_n`` per monthly rebalance row) at 500 and 3000 symbols.
+"""
+
+from __future__ import annotations
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from factorlab_engine.selection import top_n_mask, top_n_order
+
+UNIVERSES = (500, 3000)
+TOP_N = (5, 50)
+REBALANCE_ROWS = 240  # 20 years of month ends
+
+
+def _sort_values_top_n(frame: pd.DataFrame, top_n: int) -> np.ndarray:
+    ranked = frame.sort_values(["predicted_return", "ticker"], ascending=[False, True])
+    return ranked.index.to_numpy()[:top_n]
+
+
+def _argsort_top_n(values: np.ndarray, top_n: int) -> np.ndarray:
+    return np.argsort(-values, kind="stable")[:top_n]
+
+
+def _lexsort_mask(values: np.ndarray, eligible: np.ndarray, top_n: int) -> np.ndarray:
+    keys = np.where(eligible, -values, 0.0)
+    order = np.lexsort((keys, ~eligible), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(values.shape[1])[None, :], axis=1)
+    return eligible & (ranks < top_n)
+
+
+def _best_us(func, repeat: int = 5) -> float:
+    number = 20
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'symbols':>7} {'top_n':>5} {'case':<28} {'sort us':>10} {'select us':>10} {'x':>6}")
+    for n_symbols in UNIVERSES:
+        tickers = [f"T{i:04d}" for i in range(n_symbols)]
+        preds = rng.normal(size=n_symbols).round(4)  # rounded so some predictions tie
+        frame = pd.DataFrame({"ticker": tickers, "predicted_return": preds})
+        scores = rng.normal(size=(REBALANCE_ROWS, n_symbols))
+        eligible = scores > -0.5
+        for top_n in TOP_N:
+            expected = _argsort_top_n(preds, top_n)
+            assert np.array_equal(top_n_order(preds, top_n, descending=True), expected)
+            assert np.array_equal(
+                top_n_mask(scores, top_n, descending=True, eligible=eligible),
+                _lexsort_mask(scores, eligible, top_n),
+            )
+            cases = (
+                (
+                    "ml day, sort_values",
+                    lambda: _sort_values_top_n(frame, top_n),
+                    lambda: top_n_order(preds, top_n, descending=True),
+                ),
+                (
+                    "ml day, argsort",
+                    lambda: _argsort_top_n(preds, top_n),
+                    lambda: top_n_order(preds, top_n, descending=True),
+                ),
+                (
+                    f"baseline {REBALANCE_ROWS} rows, lexsort",
+                    lambda: _lexsort_mask(scores, eligible, top_n),
+                    lambda: top_n_mask(scores, top_n, descending=True, eligible=eligible),
+                ),
+            )
+            for name, sort_fn, select_fn in cases:
+                sort_us, select_us = _best_us(sort_fn), _best_us(select_fn)
+                print(
+                    f"{n_symbols:>7} {top_n:>5} {name:<28} {sort_us:>10.1f} "
+                    f"{select_us:>10.1f} {sort_us / select_us:>6.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def mark_used(path: Path) -> None:
+    """Bump ``path``'s mtime so ``prune_least_recently_used`` keeps it longest."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_least_recently_used(root: Path, max_bytes: int, *, label: str) -> int:
+    """Delete the least recently used ``.npz`` files under ``root`` until it fits ``max_bytes``.
+
+    Recency is the file mtime, which every store and ``mark_used`` hit refreshes.  A
+    ``max_bytes`` of 0 or less disables the bound.  Returns the number of files removed;
+    files another process removed first are skipped.
+    """
+    if max_bytes <= 0:
+        return 0
+    files: list[tuple[float, int, Path]] = []
+    try:
+        for path in root.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    except OSError as exc:
+        print(f"[{label}] warning: could not scan {root} for eviction: {exc}")
+        return 0
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            print(f"[{label}] warning: could not evict {path}: {exc}")
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        print(f"[{label}] evicted {removed} least recently used file(s) from {root}")
+    return removed
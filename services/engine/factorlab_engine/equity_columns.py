@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, overload
+
+import numpy as np
+import pandas as pd
+
+
+def _day_array(dates: Iterable[Any]) -> np.ndarray:
+    return pd.DatetimeIndex(dates).to_numpy().astype("datetime64[D]")
+
+
+@dataclass(frozen=True, eq=False)
+class EquityColumns:
+    """Columnar equity curve: one entry per date, ascending.
+
+    Built from whole arrays instead of per-date label lookups.  It still reads like the
+    list of ``{"date", "portfolio", "benchmark"}`` rows it replaces (``len``, indexing,
+    iteration, ``==``); rows are only materialized when something asks for them.
+    """
+
+    dates: np.ndarray  # datetime64[D]
+    portfolio: np.ndarray  # float64
+    benchmark: np.ndarray  # float64
+
+    @classmethod
+    def from_series(
+        cls, dates: pd.Index, portfolio: pd.Series, benchmark: pd.Series
+    ) -> EquityColumns:
+        """Curve on the sorted dates present in ``dates`` and both NAV series."""
+        aligned = (
+            pd.Index(dates)
+            .intersection(portfolio.index)
+            .intersection(benchmark.index)
+            .sort_values()
+        )
+        return cls(
+            dates=_day_array(aligned),
+            portfolio=portfolio.reindex(aligned).to_numpy(dtype=float),
+            benchmark=benchmark.reindex(aligned).to_numpy(dtype=float),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> EquityColumns:
+        rows = list(rows)
+        return cls(
+            dates=_day_array([row["date"] for row in rows]),
+            portfolio=np.array([row["portfolio"] for row in rows], dtype=float),
+            benchmark=np.array([row["benchmark"] for row in rows], dtype=float),
+        )
+
+    def __len__(self) -> int:
+        return int(self.dates.shape[0])
+
+    @overload
+    def __getitem__(self, key: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, key: slice) -> EquityColumns: ...
+
+    def __getitem__(self, key: int | slice) -> dict[str, Any] | EquityColumns:
+        if isinstance(key, slice):
+            return EquityColumns(self.dates[key], self.portfolio[key], self.benchmark[key])
+        return self[key : key + 1 or None].to_rows()[0]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.to_rows())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, list):
+            return self.to_rows() == other
+        if not isinstance(other, EquityColumns):
+            return NotImplemented
+        return (
+            np.array_equal(self.dates, other.dates)
+            and np.array_equal(self.portfolio, other.portfolio)
+            and np.array_equal(self.benchmark, other.benchmark)
+        )
+
+    def date_strings(self) -> list[str]:
+        return np.datetime_as_string(self.dates, unit="D").tolist()
+
+    def to_columns(self) -> dict[str, list[Any]]:
+        """The three columns as JSON-ready lists (one ``strftime`` pass for all dates)."""
+        return {
+            "date": self.date_strings(),
+            "portfolio": self.portfolio.tolist(),
+            "benchmark": self.benchmark.tolist(),
+        }
+
+    def to_rows(self, run_id: str | None = None) -> list[dict[str, Any]]:
+        columns = self.to_columns()
+        rows = zip(columns["date"], columns["portfolio"], columns["benchmark"])
+        if run_id is None:
+            return [
+                {"date": date, "portfolio": portfolio, "benchmark": benchmark}
+                for date, portfolio, benchmark in rows
+            ]
+        return [
+            {"run_id": run_id, "date": date, "portfolio": portfolio, "benchmark": benchmark}
+            for date, portfolio, benchmark in rows
+        ]
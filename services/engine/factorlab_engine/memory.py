@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+_MB = 1024 * 1024
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            resident_pages = int(fh.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / _MB
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # Peak rather than current RSS, in KiB on Linux; close enough without /proc.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except (ImportError, OSError):
+        return 0.0
+
+
+def data_nbytes(obj: Any) -> int:
+    """Bytes held by the arrays of ``obj`` (frames, arrays, indexes, dataclasses of them).
+
+    Object arrays count their pointers only, so the figure is deterministic for given data.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, (np.ndarray, pd.Index, pd.Series)):
+        return int(obj.nbytes)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return sum(data_nbytes(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    return 0
+
+
+class MemoryReport:
+    """Data held at the end of each pipeline stage, for run metadata.
+
+    ``as_dict`` only has the deterministic array sizes, so repeated runs keep identical
+    metadata; process RSS is logged alongside each stage instead.
+    """
+
+    def __init__(self, label: str, dtype: Any) -> None:
+        self.label = label
+        self.dtype = np.dtype(dtype).name
+        self.stages: dict[str, float] = {}
+
+    def record(self, stage: str, *objects: Any) -> None:
+        data_mb = round(sum(data_nbytes(obj) for obj in objects) / _MB, 2)
+        self.stages[stage] = data_mb
+        print(f"{self.label} memory stage={stage} data={data_mb}MB rss={current_rss_mb():.0f}MB")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"feature_dtype": self.dtype, "stage_data_mb": dict(self.stages)}
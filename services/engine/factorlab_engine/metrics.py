@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = 252.0
+ROLLING_WINDOW_DAYS = 252
+# Decimals kept for the rolling and calendar-year values stored in run_metadata.
+ROUND_DECIMALS = 6
+# The keys _validate_backtest_result requires, in the order run_metrics stores them.
+METRIC_KEYS = (
+    "cagr",
+    "sharpe",
+    "max_drawdown",
+    "turnover",
+    "volatility",
+    "win_rate",
+    "profit_factor",
+    "calmar",
+)
+
+
+def performance_metrics(
+    returns: np.ndarray | pd.Series | pd.DataFrame,
+    turnover: float | np.ndarray = 0.0,
+) -> dict[str, np.ndarray]:
+    """Annualised performance metrics for one or many daily return series at once.
+
+    ``returns`` is 1-D (one series) or 2-D with periods down the rows and one column per
+    series, like a returns DataFrame.  Non-finite returns are skipped, as if dropped from
+    their series.  Every metric comes back as an array with one entry per series (NaN
+    where a series has no returns); ``turnover`` is passed through, broadcast per series.
+
+    Series are laid out one per contiguous row, so each is reduced exactly as it would be
+    on its own and a column's metrics do not depend on what else is in the batch.
+    """
+    values = np.asarray(returns, dtype=float)
+    rows = np.array((values if values.ndim == 2 else values[:, None]).T, order="C")
+    valid = np.isfinite(rows)
+    rows[~valid] = 0.0
+    count = valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = rows.sum(axis=1) / count
+        deviation = (mean[:, None] - rows) ** 2
+        deviation[~valid] = 0.0
+        vol = np.sqrt(deviation.sum(axis=1) / count)
+        volatility = vol * np.sqrt(PERIODS_PER_YEAR)
+        sharpe = np.where(vol > 1e-10, (mean / vol) * np.sqrt(PERIODS_PER_YEAR), 0.0)
+
+        # Skipped returns count as flat days: the equity curve just repeats a value.
+        equity = np.cumprod(1.0 + rows, axis=1)
+        drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1.0
+        max_drawdown = np.fmin.reduce(drawdown, axis=1, initial=0.0)
+        cagr = equity[:, -1] ** (PERIODS_PER_YEAR / count) - 1.0 if rows.shape[1] else mean
+        calmar = np.where(max_drawdown < 0, cagr / np.abs(max_drawdown), 0.0)
+
+        win_rate = (rows > 0).sum(axis=1) / count
+        gains = np.where(rows > 0, rows, 0.0).sum(axis=1)
+        losses = np.abs(np.where(rows < 0, rows, 0.0).sum(axis=1))
+        profit_factor = np.where(losses > 0, gains / losses, 0.0)
+
+    empty = count == 0
+    metrics = {
+        "cagr": cagr,
+        "sharpe": sharpe,
+        "max_drawdown": max_drawdown,
+        "turnover": np.broadcast_to(np.asarray(turnover, dtype=float), count.shape).copy(),
+        "volatility": volatility,
+        "win_rate": win_rate,
+        "profit_factor": profit_factor,
+        "calmar": calmar,
+    }
+    for key in METRIC_KEYS:
+        if key != "turnover":
+            metrics[key] = np.where(empty, np.nan, metrics[key])
+    return metrics
+
+
+def metric_rows(metrics: dict[str, np.ndarray]) -> list[dict[str, float]]:
+    """Split ``performance_metrics`` output into one plain-float dict per series."""
+    # win_rate is only NaN for a series without a single finite return.
+    if np.isnan(metrics["win_rate"]).any():
+        raise ValueError("No returns available")
+    columns = [metrics[key].tolist() for key in METRIC_KEYS]
+    return [dict(zip(METRIC_KEYS, values)) for values in zip(*columns)]
+
+
+def compute_metrics(daily_returns: np.ndarray | pd.Series, turnover: float) -> dict[str, float]:
+    """Metrics of a single daily return series; raises ValueError when it has no returns."""
+    return metric_rows(performance_metrics(daily_returns, turnover))[0]
+
+
+def _rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Max of every full ``window``-long slice of ``values``, in O(n) for any window.
+
+    Entry ``i`` covers ``values[i : i + window]``.  Splits the array into window-sized
+    blocks and combines a suffix max of one block with a prefix max of the next (van
+    Herk / Gil-Werman), so no window is scanned element by element.
+    """
+    n = len(values)
+    blocks = np.concatenate([values, np.full(-n % window, -np.inf)]).reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.maximum(suffix[: n - window + 1], prefix[window - 1 : n])
+
+
+def _last_of_each(keys: np.ndarray) -> np.ndarray:
+    """Positions where a run of equal ``keys`` ends (the last day of a month or year)."""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.flatnonzero(np.append(keys[1:] != keys[:-1], True))
+
+
+def _rounded(values: np.ndarray) -> list[float]:
+    return np.round(values, ROUND_DECIMALS).tolist()
+
+
+def compute_period_metrics(
+    daily_returns: pd.Series, *, window: int = ROLLING_WINDOW_DAYS
+) -> dict[str, Any]:
+    """Rolling 1-year and calendar-year metrics of a daily return series, for run_metadata.
+
+    Every statistic comes from prefix arrays built in one pass: rolling mean and volatility
+    from cumulative sums of returns and squared returns, rolling drawdown from the equity
+    curve against its trailing-window peak, and calendar-year returns from the equity at
+    each year's last day.  Rolling values need a full ``window`` of days and are kept at
+    month ends only, which is enough to chart them without shipping the daily curve.
+    Non-finite returns count as flat days, as in ``performance_metrics``.
+    """
+    dates = pd.DatetimeIndex(daily_returns.index)
+    returns = daily_returns.to_numpy(dtype=float, copy=True)
+    returns[~np.isfinite(returns)] = 0.0
+    equity = np.cumprod(1.0 + returns)
+
+    years = dates.year.to_numpy()
+    year_end = _last_of_each(years)
+    closes = equity[year_end]
+    opens = np.concatenate([[1.0], closes[:-1]])
+    calendar_years = {
+        "years": years[year_end].tolist(),
+        "days": np.diff(np.concatenate([[-1], year_end])).tolist(),
+        "returns": _rounded(closes / opens - 1.0),
+    }
+
+    rolling: dict[str, list[Any]] = {"dates": [], "sharpe": [], "volatility": [], "drawdown": []}
+    if len(returns) >= window:
+        sums = np.concatenate([[0.0], np.cumsum(returns)])
+        squares = np.concatenate([[0.0], np.cumsum(returns * returns)])
+        mean = (sums[window:] - sums[:-window]) / window
+        # E[r^2] - E[r]^2 can dip a hair below zero from cancellation on flat windows.
+        vol = np.sqrt(np.maximum((squares[window:] - squares[:-window]) / window - mean**2, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(vol > 1e-10, (mean / vol) * np.sqrt(PERIODS_PER_YEAR), 0.0)
+        drawdown = equity[window - 1 :] / _rolling_max(equity, window) - 1.0
+
+        window_dates = dates[window - 1 :]
+        month_end = _last_of_each(window_dates.year.to_numpy() * 12 + window_dates.month.to_numpy())
+        rolling = {
+            "dates": window_dates[month_end].strftime("%Y-%m-%d").tolist(),
+            "sharpe": _rounded(sharpe[month_end]),
+            "volatility": _rounded(vol[month_end] * np.sqrt(PERIODS_PER_YEAR)),
+            "drawdown": _rounded(drawdown[month_end]),
+        }
+
+    return {
+        "window_days": window,
+        "sampling": "month_end",
+        "rolling": rolling,
+        "calendar_years": calendar_years,
+    }
@@ -2,21 +2,29 @@ from __future__ import annotations
 
 from .ml_features import _feature_matrix, _sort_ml_rows, compute_daily_features
 from .ml_training import (
-    _build_model,
     _compute_metrics,
     _feature_importance,
     _lightgbm_deterministic_params,
     _lightgbm_version,
     _model_impl_for_strategy,
     run_walk_forward,
+    run_walk_forward_batch,
+)
+from .ml_training_models import _build_model
+from .ml_types import (
+    FEATURE_COLUMNS,
+    LIGHTGBM_DETERMINISM_MODE,
+    ML_RANDOM_SEED,
+    MLArtifacts,
+    MLModelSpec,
 )
-from .ml_types import FEATURE_COLUMNS, LIGHTGBM_DETERMINISM_MODE, ML_RANDOM_SEED, MLArtifacts
 
 __all__ = [
     "FEATURE_COLUMNS",
     "LIGHTGBM_DETERMINISM_MODE",
     "ML_RANDOM_SEED",
     "MLArtifacts",
+    "MLModelSpec",
     "_build_model",
     "_compute_metrics",
     "_feature_importance",
@@ -27,4 +35,5 @@ __all__ = [
     "_sort_ml_rows",
     "compute_daily_features",
     "run_walk_forward",
+    "run_walk_forward_batch",
 ]
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .disk_cache import mark_used, prune_least_recently_used
+from .ml_types import FEATURE_COLUMNS
+
+# Opt-in on-disk feature store used by compute_daily_features.  Empty (the default) disables it.
+_FEATURE_STORE_DIR: str = os.getenv("FEATURE_STORE_DIR", "")
+# Size bound of that directory; least recently used entries are evicted past it (0: none).
+_FEATURE_STORE_MAX_BYTES: int = int(float(os.getenv("FEATURE_STORE_MAX_MB", "1024")) * 1024 * 1024)
+# Bump whenever a feature definition changes; entries of another version are recomputed.
+FEATURE_SET_VERSION = "factorlab_daily_v1"
+_FEATURE_STORE_FORMAT_VERSION = 1
+STORED_COLUMNS = [*FEATURE_COLUMNS, "target_return", "benchmark_return"]
+# Rows after a ticker's first price (first common price with the benchmark for beta) that a
+# fresh computation leaves NaN; values served from a longer stored history are masked to match.
+_WARMUP_ROWS = {
+    "mom_5d": 5,
+    "mom_20d": 20,
+    "mom_60d": 60,
+    "mom_252d": 252,
+    "vol_20d": 20,
+    "vol_60d": 60,
+    "drawdown_252d": 251,
+    "beta_60d": 60,
+}
+# A fresh computation's rows from this position on carry no warmup NaNs, so they can be
+# appended to an older entry as if it had been computed over the whole range.
+_FULL_HISTORY_ROWS = max(_WARMUP_ROWS.values())
+_NEXT_DAY_COLUMNS = [
+    STORED_COLUMNS.index("target_return"),
+    STORED_COLUMNS.index("benchmark_return"),
+]
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+@dataclass(frozen=True)
+class StoredFeatures:
+    """One (ticker, benchmark) pair's features plus the filled prices they were computed from.
+
+    ``values`` is ``(len(STORED_COLUMNS), len(dates))``.  The prices double as the entry's
+    digest: a request is only served when its own prices equal them on every served date,
+    so a re-ingested or corrected price series invalidates the entry.
+    """
+
+    dates: np.ndarray  # datetime64[D], ascending, unique
+    price: np.ndarray  # float64, filled
+    benchmark: np.ndarray  # float64, filled
+    values: np.ndarray  # float64
+
+    def _locate(self, dates: np.ndarray) -> int | None:
+        """Offset of ``dates`` as one contiguous run of this entry's calendar, if it is one."""
+        start = int(np.searchsorted(self.dates, dates[0]))
+        end = start + len(dates)
+        if end > len(self.dates) or not np.array_equal(self.dates[start:end], dates):
+            return None
+        return start
+
+    def _same_prices(self, start: int, price: np.ndarray, benchmark: np.ndarray) -> bool:
+        end = start + len(price)
+        return np.array_equal(self.price[start:end], price, equal_nan=True) and np.array_equal(
+            self.benchmark[start:end], benchmark, equal_nan=True
+        )
+
+    def serve(
+        self, dates: np.ndarray, price: np.ndarray, benchmark: np.ndarray
+    ) -> np.ndarray | None:
+        """The values a fresh computation over exactly these inputs returns, or None."""
+        start = self._locate(dates)
+        if start is None or not self._same_prices(start, price, benchmark):
+            return None
+        values = self.values[:, start : start + len(dates)].copy()
+        values[_NEXT_DAY_COLUMNS, -1] = np.nan
+        _mask_warmup(values, price, benchmark)
+        return values
+
+    def extended_by(
+        self, dates: np.ndarray, price: np.ndarray, benchmark: np.ndarray, values: np.ndarray
+    ) -> StoredFeatures | None:
+        """This entry with a fresh computation's later dates appended, when they line up.
+
+        Needs the fresh range to start inside this entry with identical prices on the
+        overlap, and the overlap to be long enough that the appended rows are past warmup.
+        """
+        start = int(np.searchsorted(self.dates, dates[0]))
+        overlap = len(self.dates) - start
+        if not _FULL_HISTORY_ROWS <= overlap < len(dates):
+            return None
+        if self._locate(dates[:overlap]) is None or not self._same_prices(
+            start, price[:overlap], benchmark[:overlap]
+        ):
+            return None
+        merged = np.concatenate([self.values, values[:, overlap:]], axis=1)
+        # The old last row had no next day yet.
+        merged[_NEXT_DAY_COLUMNS, len(self.dates) - 1] = values[_NEXT_DAY_COLUMNS, overlap - 1]
+        return StoredFeatures(
+            dates=np.concatenate([self.dates, dates[overlap:]]),
+            price=np.concatenate([self.price, price[overlap:]]),
+            benchmark=np.concatenate([self.benchmark, benchmark[overlap:]]),
+            values=merged,
+        )
+
+
+def _mask_warmup(values: np.ndarray, price: np.ndarray, benchmark: np.ndarray) -> None:
+    priced = np.flatnonzero(~np.isnan(price))
+    if priced.size == 0:
+        return
+    first = int(priced[0])
+    benchmark_priced = np.flatnonzero(~np.isnan(benchmark))
+    first_common = max(first, int(benchmark_priced[0]) if benchmark_priced.size else len(price))
+    for name, rows in _WARMUP_ROWS.items():
+        origin = first_common if name == "beta_60d" else first
+        values[STORED_COLUMNS.index(name), : origin + rows] = np.nan
+
+
+class FeatureStore:
+    """Per-(ticker, benchmark) ``.npz`` files under one directory, replaced atomically.
+
+    ``lookup`` prunes the least recently used files once the directory outgrows
+    ``FEATURE_STORE_MAX_MB``.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, ticker: str, benchmark: str) -> Path:
+        name = f"{ticker}__{benchmark}__{FEATURE_SET_VERSION}"
+        return self.root / f"{_UNSAFE_FILENAME_CHARS.sub('_', name)}.npz"
+
+    def load(self, ticker: str, benchmark: str) -> StoredFeatures | None:
+        path = self._path(ticker, benchmark)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if (
+                    meta.get("version") != _FEATURE_STORE_FORMAT_VERSION
+                    or meta.get("feature_set") != FEATURE_SET_VERSION
+                    or meta.get("columns") != STORED_COLUMNS
+                ):
+                    return None
+                entry = StoredFeatures(
+                    dates=data["dates"].astype("datetime64[D]"),
+                    price=data["price"].astype(float),
+                    benchmark=data["benchmark"].astype(float),
+                    values=data["values"].astype(float),
+                )
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            print(f"[feature_store] warning: discarding unreadable store file {path}: {exc}")
+            return None
+        mark_used(path)
+        return entry
+
+    def store(self, ticker: str, benchmark: str, entry: StoredFeatures) -> None:
+        meta = {
+            "version": _FEATURE_STORE_FORMAT_VERSION,
+            "feature_set": FEATURE_SET_VERSION,
+            "columns": STORED_COLUMNS,
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(
+                    fh,
+                    dates=entry.dates,
+                    price=entry.price,
+                    benchmark=entry.benchmark,
+                    values=entry.values,
+                    meta=np.array(json.dumps(meta)),
+                )
+            os.replace(tmp_name, self._path(ticker, benchmark))
+        except OSError as exc:
+            # The store is an optimisation only; a full disk must never fail a run.
+            print(f"[feature_store] warning: could not write features for {ticker}: {exc}")
+
+    def prune(self) -> None:
+        prune_least_recently_used(self.root, _FEATURE_STORE_MAX_BYTES, label="feature_store")
+
+    def lookup(
+        self,
+        prices: pd.DataFrame,
+        benchmark_ticker: str,
+        tickers: list[str],
+        *,
+        compute: Callable[[list[str]], dict[str, np.ndarray]],
+    ) -> dict[str, np.ndarray]:
+        """``compute(tickers)``'s result, computing only the tickers the store cannot serve.
+
+        ``prices`` must already be sorted and filled.  Computed tickers are written back,
+        appended to their existing entry when the new range extends it.
+        """
+        if prices.empty:
+            return compute(tickers)
+        dates = prices.index.to_numpy().astype("datetime64[D]")
+        benchmark = prices[benchmark_ticker].to_numpy(dtype=float)
+        served: dict[str, np.ndarray] = {}
+        entries: dict[str, StoredFeatures | None] = {}
+        for ticker in tickers:
+            entry = self.load(ticker, benchmark_ticker)
+            values = None
+            if entry is not None:
+                values = entry.serve(dates, prices[ticker].to_numpy(dtype=float), benchmark)
+            if values is None:
+                entries[ticker] = entry
+            else:
+                served[ticker] = values
+
+        missed = [ticker for ticker in tickers if ticker not in served]
+        print(f"[feature_store] served={len(served)} computed={len(missed)}")
+        if missed:
+            fresh = compute(missed)
+            for j, ticker in enumerate(missed):
+                values = np.stack([fresh[name][:, j] for name in STORED_COLUMNS])
+                served[ticker] = values
+                price = prices[ticker].to_numpy(dtype=float)
+                entry = entries[ticker]
+                extended = None
+                if entry is not None:
+                    extended = entry.extended_by(dates, price, benchmark, values)
+                if extended is None:
+                    extended = StoredFeatures(dates, price, benchmark.copy(), values)
+                self.store(ticker, benchmark_ticker, extended)
+            self.prune()
+
+        return {
+            name: np.stack([served[ticker][i] for ticker in tickers], axis=1)
+            for i, name in enumerate(STORED_COLUMNS)
+        }
@@ -1,11 +1,56 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Any
+
 import numpy as np
 import pandas as pd
 
+from . import ml_feature_store
+from .ml_feature_store import STORED_COLUMNS
 from .ml_types import FEATURE_COLUMNS
 
 
+@dataclass(frozen=True)
+class LongFeatures:
+    """Daily feature panels stacked into long rows, in ``(date, ticker)`` order.
+
+    ``values[i]`` holds ``STORED_COLUMNS[i]``.  Rows carry int32 codes into ``dates`` and
+    the sorted ``tickers`` rather than a timestamp and a string each.
+    """
+
+    dates: pd.DatetimeIndex
+    tickers: list[str]
+    date_code: np.ndarray  # int32, ascending
+    ticker_code: np.ndarray  # int32, ascending within a date
+    values: np.ndarray  # (len(STORED_COLUMNS), rows), float32 or float64
+
+    def __len__(self) -> int:
+        return len(self.date_code)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[STORED_COLUMNS.index(name)]
+
+    def take(self, keep: np.ndarray) -> LongFeatures:
+        """The rows selected by boolean mask ``keep``, order preserved."""
+        return LongFeatures(
+            dates=self.dates,
+            tickers=self.tickers,
+            date_code=self.date_code[keep],
+            ticker_code=self.ticker_code[keep],
+            values=self.values[:, keep],
+        )
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "date": self.dates[self.date_code],
+                "ticker": np.asarray(self.tickers, dtype=object)[self.ticker_code],
+                **{name: self.values[i] for i, name in enumerate(STORED_COLUMNS)},
+            }
+        )
+
+
 def compute_daily_features(prices: pd.DataFrame, benchmark_ticker: str) -> pd.DataFrame:
     """Build a long-format feature DataFrame: one row per (date, non-benchmark symbol).
 
@@ -16,7 +61,58 @@ def compute_daily_features(prices: pd.DataFrame, benchmark_ticker: str) -> pd.Da
     simply produce NaN on that row; they are dropped per-row later, NOT by requiring
     every symbol to have data on the same date (which would inner-join away rows).
     """
+    features = stack_daily_features(prices, benchmark_ticker)
+    if features is None:
+        return pd.DataFrame()
+    return features.frame()
+
+
+def stack_daily_features(
+    prices: pd.DataFrame, benchmark_ticker: str, *, dtype: Any = np.float64
+) -> LongFeatures | None:
+    """``compute_daily_features`` as a ``LongFeatures`` panel; None without portfolio tickers.
+
+    The wide ``(dates, tickers)`` arrays are copied once into a ``(columns, dates,
+    tickers)`` block whose C-order reshape is already sorted by ``(date, ticker)``.
+
+    With FEATURE_STORE_DIR set, tickers already computed against the same prices are
+    served from the on-disk feature store instead of being recomputed.
+    """
     prices = prices.sort_index().ffill().dropna(how="all")
+
+    portfolio_tickers = sorted(t for t in prices.columns if t != benchmark_ticker)
+    if not portfolio_tickers:
+        return None
+
+    if ml_feature_store._FEATURE_STORE_DIR:
+        store = ml_feature_store.FeatureStore(ml_feature_store._FEATURE_STORE_DIR)
+        columns = store.lookup(
+            prices,
+            benchmark_ticker,
+            portfolio_tickers,
+            compute=lambda tickers: _feature_arrays(prices, benchmark_ticker, tickers),
+        )
+    else:
+        columns = _feature_arrays(prices, benchmark_ticker, portfolio_tickers)
+
+    n_dates, n_tickers = len(prices.index), len(portfolio_tickers)
+    panel = np.empty((len(STORED_COLUMNS), n_dates, n_tickers), dtype=dtype)
+    for i, name in enumerate(STORED_COLUMNS):
+        panel[i] = columns.pop(name)
+    return LongFeatures(
+        dates=pd.DatetimeIndex(prices.index, name=None),
+        tickers=portfolio_tickers,
+        date_code=np.repeat(np.arange(n_dates, dtype=np.int32), n_tickers),
+        ticker_code=np.tile(np.arange(n_tickers, dtype=np.int32), n_dates),
+        values=panel.reshape(len(STORED_COLUMNS), n_dates * n_tickers),
+    )
+
+
+def _feature_arrays(
+    prices: pd.DataFrame, benchmark_ticker: str, tickers: list[str]
+) -> dict[str, np.ndarray]:
+    """Every ``STORED_COLUMNS`` column as a ``(dates, tickers)`` array over filled prices."""
+    prices = prices[[*tickers, benchmark_ticker]]
     daily_ret = prices.pct_change()
 
     # Momentum features (vectorized over all columns)
@@ -40,34 +136,22 @@ def compute_daily_features(prices: pd.DataFrame, benchmark_ticker: str) -> pd.Da
 
     # Target: next-day return
     target_return = daily_ret.shift(-1)
-    benchmark_return = target_return[benchmark_ticker]
-
-    # Stack wide DataFrames to long format
-    portfolio_tickers = [t for t in prices.columns if t != benchmark_ticker]
-    if not portfolio_tickers:
-        return pd.DataFrame()
-
-    frames: list[pd.DataFrame] = []
-    for ticker in portfolio_tickers:
-        df = pd.DataFrame(
-            {
-                "date": prices.index,
-                "ticker": ticker,
-                "mom_5d": mom_5d[ticker].to_numpy(),
-                "mom_20d": mom_20d[ticker].to_numpy(),
-                "mom_60d": mom_60d[ticker].to_numpy(),
-                "mom_252d": mom_252d[ticker].to_numpy(),
-                "vol_20d": vol_20d[ticker].to_numpy(),
-                "vol_60d": vol_60d[ticker].to_numpy(),
-                "drawdown_252d": drawdown_252d[ticker].to_numpy(),
-                "beta_60d": beta_60d[ticker].to_numpy(),
-                "target_return": target_return[ticker].to_numpy(),
-                "benchmark_return": benchmark_return.to_numpy(),
-            }
-        )
-        frames.append(df)
-
-    return pd.concat(frames, ignore_index=True)
+    benchmark_return = target_return[benchmark_ticker].to_numpy()
+
+    wide = {
+        "mom_5d": mom_5d,
+        "mom_20d": mom_20d,
+        "mom_60d": mom_60d,
+        "mom_252d": mom_252d,
+        "vol_20d": vol_20d,
+        "vol_60d": vol_60d,
+        "drawdown_252d": drawdown_252d,
+        "beta_60d": beta_60d,
+        "target_return": target_return,
+    }
+    columns = {name: frame[tickers].to_numpy() for name, frame in wide.items()}
+    columns["benchmark_return"] = np.repeat(benchmark_return[:, None], len(tickers), axis=1)
+    return columns
 
 
 def _feature_matrix(frame: pd.DataFrame) -> pd.DataFrame:
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .ml_store import WalkForwardStore
+from .ml_training_models import (
+    _LIGHTGBM_MODEL_PARAMS,
+    _lightgbm_deterministic_params,
+    _require_lightgbm,
+)
+from .ml_types import FEATURE_COLUMNS
+
+
+class LightGBMWalkForward:
+    """Walk-forward LightGBM trainer that bins the store once and reuses it per refit.
+
+    The bin mapper comes from the first training window only, so later bin edges never
+    see features from dates a model was not allowed to train on.  Every store row is
+    binned with it once; each refit trains on a ``subset`` of that dataset instead of
+    re-binning its window.  With ``warm_start_trees > 0`` a refit continues boosting the
+    previous booster (``init_model``) for that many trees on the new window, and falls
+    back to a full refit once the booster would exceed ``max_trees``.
+    """
+
+    def __init__(
+        self,
+        store: WalkForwardStore,
+        first_date: int,
+        end_date: int,
+        *,
+        warm_start_trees: int = 0,
+    ) -> None:
+        self._lgb = _require_lightgbm()
+        self.store = store
+        self.n_estimators = int(_LIGHTGBM_MODEL_PARAMS["n_estimators"])
+        self.warm_start_trees = max(0, warm_start_trees)
+        self.max_trees = 2 * self.n_estimators
+        self.params: dict[str, Any] = {
+            "objective": "regression",
+            **{k: v for k, v in _LIGHTGBM_MODEL_PARAMS.items() if k != "n_estimators"},
+            "verbose": -1,
+            **_lightgbm_deterministic_params(),
+        }
+        self.booster: Any = None
+        self.full_refits = 0
+        self.warm_start_refits = 0
+
+        lo, hi = store.row_range(first_date, end_date)
+        self.bin_window = (first_date, end_date)
+        bins = self._lgb.Dataset(
+            store.features[:, lo:hi].T,
+            label=store.target_return[lo:hi],
+            feature_name=FEATURE_COLUMNS,
+            params=self.params,
+        ).construct()
+        self._dataset = self._lgb.Dataset(
+            store.features.T,
+            label=store.target_return,
+            feature_name=FEATURE_COLUMNS,
+            reference=bins,
+            params=self.params,
+            free_raw_data=False,  # warm starts score the window's raw rows
+        ).construct()
+
+    def fit(self, first_date: int, end_date: int) -> LightGBMWalkForward:
+        lo, hi = self.store.row_range(first_date, end_date)
+        window = self._dataset.subset(np.arange(lo, hi, dtype=np.int32), params=self.params)
+        warm = (
+            self.booster is not None
+            and self.warm_start_trees > 0
+            and self.booster.num_trees() + self.warm_start_trees <= self.max_trees
+        )
+        if warm:
+            self.booster = self._lgb.train(
+                self.params,
+                window,
+                num_boost_round=self.warm_start_trees,
+                init_model=self.booster,
+                keep_training_booster=True,
+            )
+            self.warm_start_refits += 1
+        else:
+            self.booster = self._lgb.train(
+                self.params,
+                window,
+                num_boost_round=self.n_estimators,
+                keep_training_booster=self.warm_start_trees > 0,
+            )
+            self.full_refits += 1
+        return self
+
+    def predict(self, features: Any) -> np.ndarray:
+        return self.booster.predict(np.asarray(features, dtype=self.store.features.dtype))
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        return self.booster.feature_importance(importance_type="split")
+
+    def training_metadata(self) -> dict[str, Any]:
+        return {
+            "mode": "dataset_reuse",
+            "bin_reference_window_days": self.bin_window[1] - self.bin_window[0],
+            "warm_start_trees": self.warm_start_trees,
+            "max_trees": self.max_trees,
+            "full_refits": self.full_refits,
+            "warm_start_refits": self.warm_start_refits,
+            "final_num_trees": int(self.booster.num_trees()) if self.booster is not None else 0,
+        }
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .ml_store import WalkForwardStore
+from .selection import top_n_order
+from .turnover import one_way_turnover_rows
+
+# Only this many of the most recent as_of dates keep their prediction rows.
+PREDICTION_DAYS_KEPT = 20
+
+
+class WalkForwardOutputs:
+    """Daily walk-forward results kept in arrays and turned into rows once, at the end.
+
+    Returns, benchmark returns and selected store rows go into arrays sized for the whole
+    plan.  Predictions are kept, and fully ranked, only for the last ``prediction_days``
+    days, so prediction rows that would be dropped are never built.
+    """
+
+    def __init__(
+        self,
+        store: WalkForwardStore,
+        n_days: int,
+        top_n: int,
+        *,
+        prediction_days: int = PREDICTION_DAYS_KEPT,
+    ) -> None:
+        self.store = store
+        self.days = 0
+        self.portfolio = np.empty(n_days, dtype=float)
+        self.benchmark = np.empty(n_days, dtype=float)
+        self._top_rows = np.empty(n_days, dtype=np.int64)
+        self._selected_counts = np.empty(n_days, dtype=np.int64)
+        self._selected_rows = np.empty(n_days * top_n, dtype=np.int64)
+        self._n_selected = 0
+        # (as_of_date, day, first store row, predictions, selected count)
+        self._recent: deque[tuple[pd.Timestamp, int, int, np.ndarray, int]] = deque(
+            maxlen=prediction_days
+        )
+
+    def record(
+        self,
+        as_of_date: pd.Timestamp,
+        lo: int,
+        preds: np.ndarray,
+        selected_rows: np.ndarray,
+        net_return: float,
+    ) -> None:
+        """Add one day: predictions for store rows ``lo:lo + len(preds)``, picks best first."""
+        day = self.days
+        selected_count = len(selected_rows)
+        top = int(selected_rows[0])
+        self.portfolio[day] = net_return
+        self.benchmark[day] = self.store.benchmark_return[top]
+        self._top_rows[day] = top
+        self._selected_counts[day] = selected_count
+        end = self._n_selected + selected_count
+        self._selected_rows[self._n_selected : end] = selected_rows
+        self._n_selected = end
+        self._recent.append((as_of_date, day, lo, preds, selected_count))
+        self.days += 1
+
+    def target_dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.store.target_date[self._top_rows[: self.days]])
+
+    def position_rows(self, run_id: str) -> list[dict[str, Any]]:
+        counts = self._selected_counts[: self.days]
+        day = np.repeat(np.arange(self.days), counts)
+        dates = np.asarray(self.target_dates().strftime("%Y-%m-%d"), dtype=object)[day]
+        symbols = self.store.tickers[self._selected_rows[: self._n_selected]]
+        weights = 1.0 / counts[day]
+        return [
+            {"run_id": run_id, "date": date, "symbol": str(symbol), "weight": weight}
+            for date, symbol, weight in zip(dates.tolist(), symbols.tolist(), weights.tolist())
+        ]
+
+    def prediction_rows(self, run_id: str, model_name: str) -> list[dict[str, Any]]:
+        target_dates = self.target_dates()
+        rows: list[dict[str, Any]] = []
+        for as_of_date, day, lo, preds, selected_count in self._recent:
+            order = top_n_order(preds, len(preds), descending=True)
+            ranked_rows = lo + order
+            ranked_preds = preds[order]
+            as_of_str = as_of_date.strftime("%Y-%m-%d")
+            target_date_str = target_dates[day].strftime("%Y-%m-%d")
+            weight = 1.0 / selected_count
+            tickers = self.store.tickers[ranked_rows].tolist()
+            realized = self.store.target_return[ranked_rows].tolist()
+            for rank, (ticker, predicted, realized_return) in enumerate(
+                zip(tickers, ranked_preds.tolist(), realized), start=1
+            ):
+                selected = rank <= selected_count
+                rows.append(
+                    {
+                        "run_id": run_id,
+                        "model_name": model_name,
+                        "as_of_date": as_of_str,
+                        "target_date": target_date_str,
+                        "ticker": str(ticker),
+                        "predicted_return": predicted,
+                        "realized_return": realized_return,
+                        "rank": rank,
+                        "selected": selected,
+                        "weight": weight if selected else 0.0,
+                    }
+                )
+        return rows
+
+
+class DailyPortfolio:
+    """Equal-weight top-N book rebuilt from each day's predictions, charged on turnover."""
+
+    def __init__(
+        self,
+        outputs: WalkForwardOutputs,
+        top_n: int,
+        cost_rate: float,
+        ticker_pos: np.ndarray,
+        n_tickers: int,
+    ) -> None:
+        self.outputs = outputs
+        self.top_n = top_n
+        self.cost_rate = cost_rate
+        self.ticker_pos = ticker_pos  # store row -> column of the weight vector
+        self.weights = np.zeros(n_tickers)
+
+    def rebalance(self, as_of_date: pd.Timestamp, lo: int, preds: np.ndarray) -> None:
+        """Hold the top predictions of store rows ``lo:lo + len(preds)`` for the next day."""
+        store = self.outputs.store
+        # A day's store rows are ticker-sorted, so tied predictions break by ticker.
+        selected_rows = lo + top_n_order(preds, self.top_n, descending=True)
+        new_weights = np.zeros(len(self.weights))
+        new_weights[self.ticker_pos[selected_rows]] = 1.0 / len(selected_rows)
+        turnover = float(one_way_turnover_rows(self.weights[None, :], new_weights[None, :])[0])
+        self.weights = new_weights
+
+        gross_ret = float(store.target_return[selected_rows].mean())
+        net_ret = gross_ret - self.cost_rate * turnover
+        self.outputs.record(as_of_date, lo, preds, selected_rows, net_ret)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import multiprocessing
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from .ml_store import WalkForwardStore
+from .ml_training_models import _build_model
+
+# Store shipped once to each refit worker by _init_refit_worker.
+_REFIT_STORE: WalkForwardStore | None = None
+
+
+def _init_refit_worker(store: WalkForwardStore) -> None:
+    global _REFIT_STORE
+    _REFIT_STORE = store
+
+
+def _fit_window(store: WalkForwardStore, strategy: str, first_date: int, end_date: int) -> Any:
+    lo, hi = store.row_range(first_date, end_date)
+    model = _build_model(strategy)
+    model.fit(store.feature_frame(lo, hi), store.target_return[lo:hi])
+    return model
+
+
+def _fit_window_in_worker(strategy: str, first_date: int, end_date: int) -> Any:
+    assert _REFIT_STORE is not None
+    return _fit_window(_REFIT_STORE, strategy, first_date, end_date)
+
+
+def iter_refit_models(
+    store: WalkForwardStore,
+    strategy: str,
+    windows: list[tuple[int, int]],
+    *,
+    workers: int = 1,
+) -> Iterator[Any]:
+    """Yield a model fitted on each ``(first_date, end_date)`` store window, in order.
+
+    With ``workers > 1`` the fits run on a spawn process pool that receives the store
+    once per worker.  At most ``2 * workers`` fitted models wait to be consumed, so
+    memory stays bounded however many refits a run has.  Fits are deterministic and
+    models round-trip through pickle unchanged, so results match the sequential path.
+    """
+    if workers <= 1 or len(windows) <= 1:
+        for first_date, end_date in windows:
+            yield _fit_window(store, strategy, first_date, end_date)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, len(windows)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_refit_worker,
+        initargs=(store,),
+    )
+    pending: deque[Future[Any]] = deque()
+    queued = iter(windows)
+    finished = False
+    try:
+        for first_date, end_date in queued:
+            pending.append(executor.submit(_fit_window_in_worker, strategy, first_date, end_date))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            model = pending.popleft().result()
+            for first_date, end_date in queued:
+                pending.append(
+                    executor.submit(_fit_window_in_worker, strategy, first_date, end_date)
+                )
+                break
+            yield model
+        finished = True
+    finally:
+        # On an early exit (job timeout, bad prediction) do not wait for queued fits.
+        executor.shutdown(wait=finished, cancel_futures=not finished)
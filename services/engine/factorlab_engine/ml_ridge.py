@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .ml_store import WalkForwardStore
+
+_EPS = float(np.finfo(np.float64).eps)
+
+
+class RollingRidge:
+    """``StandardScaler`` + ``Ridge`` fitted from rolling sufficient statistics.
+
+    Keeps the row count and the sums of x, y, xxᵀ and xy over the current walk-forward
+    window.  Sliding the window adds the days that entered and subtracts the days that
+    left, so a refit costs O(changed rows + n_features³) whatever the window length.
+    ``fit`` then solves the standardized ridge system exactly as the sklearn pipeline
+    does; predictions agree with it to floating-point rounding.
+
+    Sums are taken around a fixed shift (the first block's feature means) so the
+    subtraction of expired days does not cancel against large uncentered totals.
+    """
+
+    def __init__(self, n_features: int, alpha: float = 1.0) -> None:
+        self.alpha = alpha
+        self.n_features = n_features
+        self.reset()
+        self.mean_ = np.zeros(n_features)
+        self.scale_ = np.ones(n_features)
+        self.coef_ = np.zeros(n_features)
+        self.intercept_ = 0.0
+
+    def _accumulate(self, features: np.ndarray, y: np.ndarray, sign: float) -> None:
+        """Add (``sign=1``) or remove (``sign=-1``) rows; ``features`` is feature-major."""
+        if features.shape[1] == 0:
+            return
+        # Sums stay float64 whatever the feature dtype; cancellation would eat float32 sums.
+        features = np.asarray(features, dtype=np.float64)
+        if self._shift is None:
+            self._shift = features.mean(axis=1)
+        centered = features - self._shift[:, None]
+        self._n += int(sign) * features.shape[1]
+        self._sx += sign * centered.sum(axis=1)
+        self._sy += sign * float(y.sum())
+        self._sxx += sign * (centered @ centered.T)
+        self._sxy += sign * (centered @ y)
+
+    def add(self, features: np.ndarray, y: np.ndarray) -> None:
+        self._accumulate(features, y, 1.0)
+
+    def remove(self, features: np.ndarray, y: np.ndarray) -> None:
+        self._accumulate(features, y, -1.0)
+
+    def reset(self) -> None:
+        self._shift: np.ndarray | None = None
+        self._n = 0
+        self._sx = np.zeros(self.n_features)
+        self._sy = 0.0
+        self._sxx = np.zeros((self.n_features, self.n_features))
+        self._sxy = np.zeros(self.n_features)
+        self._window = (0, 0)
+
+    def slide(self, store: WalkForwardStore, first_date: int, end_date: int) -> None:
+        """Move the window to the store dates ``first_date <= k < end_date``."""
+        old_first, old_end = self._window
+        if self._n == 0 or first_date >= old_end or first_date < old_first or end_date < old_end:
+            # No overlap (or a window moving backwards): start over from the new rows.
+            self.reset()
+            old_first = old_end = first_date
+        lo, hi = store.row_range(old_first, first_date)
+        self.remove(store.features[:, lo:hi], store.target_return[lo:hi])
+        lo, hi = store.row_range(old_end, end_date)
+        self.add(store.features[:, lo:hi], store.target_return[lo:hi])
+        self._window = (first_date, end_date)
+
+    def fit(self) -> RollingRidge:
+        if self._n <= 0 or self._shift is None:
+            raise ValueError("RollingRidge has no rows to fit")
+        n = float(self._n)
+        mean_c = self._sx / n
+        y_mean = self._sy / n
+        # Population covariance and x/y cross-moments, as StandardScaler and Ridge see them.
+        cov = self._sxx / n - np.outer(mean_c, mean_c)
+        cross = self._sxy / n - mean_c * y_mean
+        var = np.clip(np.diag(cov), 0.0, None)
+        self.mean_ = self._shift + mean_c
+        self.scale_ = _standard_scale(var, self.mean_, n)
+
+        gram = n * cov / np.outer(self.scale_, self.scale_)
+        gram[np.diag_indices_from(gram)] += self.alpha
+        self.coef_ = np.linalg.solve(gram, n * cross / self.scale_)
+        self.intercept_ = y_mean
+        return self
+
+    def predict(self, features: Any) -> np.ndarray:
+        x = np.asarray(features, dtype=np.float64)
+        return (x - self.mean_) / self.scale_ @ self.coef_ + self.intercept_
+
+
+def _standard_scale(var: np.ndarray, mean: np.ndarray, n_samples: float) -> np.ndarray:
+    """``StandardScaler.scale_``: constant (or numerically constant) features scale by 1."""
+    scale = np.sqrt(var)
+    constant = var <= n_samples * _EPS * var + (n_samples * mean * _EPS) ** 2
+    scale[constant | (scale < 10 * _EPS)] = 1.0
+    return scale
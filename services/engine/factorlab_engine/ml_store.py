@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .ml_types import FEATURE_COLUMNS
+
+
+@dataclass(frozen=True)
+class WalkForwardStore:
+    """Model rows as date-sorted arrays, so every walk-forward window is one contiguous slice.
+
+    Rows keep the ``(date, ticker)`` order of ``_sort_ml_rows``.  ``offsets[k]`` is the first
+    row of ``dates[k]`` (``offsets[-1]`` is the row count), so a date range found with
+    ``searchsorted`` maps straight to a row range without masking the whole frame.
+    """
+
+    dates: np.ndarray  # unique row dates, ascending
+    offsets: np.ndarray  # int64, len(dates) + 1
+    tickers: np.ndarray  # object, per row
+    features: np.ndarray  # float64 or float32, (len(FEATURE_COLUMNS), rows), C-contiguous
+    target_return: np.ndarray
+    benchmark_return: np.ndarray
+    target_date: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: pd.DataFrame, *, dtype: Any = np.float64) -> WalkForwardStore:
+        """Build from rows already sorted by ``(date, ticker)``; features are cast to ``dtype``."""
+        row_dates = rows["date"].to_numpy()
+        dates, first_rows = np.unique(row_dates, return_index=True)
+        offsets = np.append(first_rows, len(rows)).astype(np.int64)
+        # Feature-major, like the single float block of a pandas frame, so model inputs
+        # keep the memory layout the DataFrame path handed to sklearn/LightGBM.
+        features = np.ascontiguousarray(rows[FEATURE_COLUMNS].to_numpy(dtype=dtype).T)
+        return cls(
+            dates=dates,
+            offsets=offsets,
+            tickers=rows["ticker"].to_numpy(dtype=object),
+            features=features,
+            target_return=rows["target_return"].to_numpy(dtype=float),
+            benchmark_return=rows["benchmark_return"].to_numpy(dtype=float),
+            target_date=rows["target_date"].to_numpy(),
+        )
+
+    def date_index(self, date: pd.Timestamp) -> int:
+        """Position of the first stored date on or after ``date``."""
+        return int(np.searchsorted(self.dates, np.datetime64(date), side="left"))
+
+    def row_range(self, first_date: int, end_date: int) -> tuple[int, int]:
+        """Rows of stored dates ``first_date <= k < end_date``."""
+        return int(self.offsets[first_date]), int(self.offsets[end_date])
+
+    def feature_frame(self, lo: int, hi: int) -> pd.DataFrame:
+        """Feature columns of rows ``lo:hi``, named so sklearn/LightGBM see the same inputs."""
+        block = np.ascontiguousarray(self.features[:, lo:hi])
+        return pd.DataFrame(block.T, columns=FEATURE_COLUMNS, copy=False)
+
+
+@dataclass(frozen=True)
+class WalkForwardStep:
+    """One rebalance day: its store date range to train on and whether it refits."""
+
+    as_of_date: pd.Timestamp
+    first_date: int
+    end_date: int
+    refit: bool
+
+
+def plan_walk_forward(
+    store: WalkForwardStore,
+    rebalance_dates: list[pd.Timestamp],
+    *,
+    train_window_cal_days: int,
+    min_train_days: int,
+    refit_freq: int,
+) -> list[tuple[int, WalkForwardStep]]:
+    """``(step_idx, step)`` for every rebalance day that has enough training history.
+
+    Refits only depend on their own window, so the whole schedule is known up front.
+    """
+    steps: list[tuple[int, WalkForwardStep]] = []
+    last_refit_idx = -refit_freq
+    for step_idx, as_of_date in enumerate(rebalance_dates):
+        window_start = as_of_date - pd.Timedelta(days=train_window_cal_days)
+        end_date = store.date_index(as_of_date)
+        first_date = store.date_index(window_start)
+        # Every stored date has at least one row, so the window's day count is an index diff.
+        if end_date - first_date < min_train_days:
+            continue
+        refit = step_idx - last_refit_idx >= refit_freq
+        if refit:
+            last_refit_idx = step_idx
+        steps.append((step_idx, WalkForwardStep(as_of_date, first_date, end_date, refit)))
+    return steps
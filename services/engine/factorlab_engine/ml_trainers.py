@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .ml_lightgbm import LightGBMWalkForward
+from .ml_refits import iter_refit_models
+from .ml_ridge import RollingRidge
+from .ml_store import WalkForwardStep, WalkForwardStore
+from .ml_training_models import _model_impl_for_strategy
+from .ml_types import FEATURE_COLUMNS
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+class StrategyTrainer:
+    """Refits and predicts one strategy's model along a walk-forward plan.
+
+    The training path follows the ML_* settings: rolling ridge sums
+    (ML_INCREMENTAL_RIDGE), one binned LightGBM dataset (ML_LIGHTGBM_DATASET_REUSE /
+    ML_LIGHTGBM_WARM_START_TREES) or fresh fits, inline or on ML_REFIT_WORKERS processes.
+    """
+
+    def __init__(
+        self,
+        strategy: str,
+        store: WalkForwardStore,
+        plan: list[tuple[int, WalkForwardStep]],
+    ) -> None:
+        self.strategy = strategy
+        self.model_impl = _model_impl_for_strategy(strategy)
+        self.store = store
+        self.incremental_ridge = strategy == "ml_ridge" and _env_flag("ML_INCREMENTAL_RIDGE")
+        self.lightgbm_warm_start_trees = int(os.getenv("ML_LIGHTGBM_WARM_START_TREES", "0"))
+        self.lightgbm_dataset_reuse = self.model_impl == "lightgbm" and (
+            self.lightgbm_warm_start_trees > 0 or _env_flag("ML_LIGHTGBM_DATASET_REUSE")
+        )
+        # Rolling ridge and a reused LightGBM dataset carry state from refit to refit.
+        self.refit_workers = (
+            1
+            if self.incremental_ridge or self.lightgbm_dataset_reuse
+            else int(os.getenv("ML_REFIT_WORKERS", "1"))
+        )
+        self.model: Any = None
+        self._rolling_ridge = RollingRidge(len(FEATURE_COLUMNS)) if self.incremental_ridge else None
+        self._lightgbm: LightGBMWalkForward | None = None
+        self._fitted_models = iter_refit_models(
+            store,
+            strategy,
+            [(step.first_date, step.end_date) for _, step in plan if step.refit],
+            workers=self.refit_workers,
+        )
+
+    def refit(self, step: WalkForwardStep) -> None:
+        first_idx, as_of_idx = step.first_date, step.end_date
+        if self._rolling_ridge is not None:
+            self._rolling_ridge.slide(self.store, first_idx, as_of_idx)
+            self.model = self._rolling_ridge.fit()
+        elif self.lightgbm_dataset_reuse:
+            if self._lightgbm is None:
+                self._lightgbm = LightGBMWalkForward(
+                    self.store,
+                    first_idx,
+                    as_of_idx,
+                    warm_start_trees=self.lightgbm_warm_start_trees,
+                )
+            self.model = self._lightgbm.fit(first_idx, as_of_idx)
+        else:
+            self.model = next(self._fitted_models)
+
+    def predict(self, features: pd.DataFrame, as_of_date: pd.Timestamp) -> np.ndarray:
+        preds = self.model.predict(features)
+        if not np.isfinite(preds).all():
+            raise RuntimeError(
+                f"ML walk-forward produced non-finite predictions at as_of={as_of_date.strftime('%Y-%m-%d')}."
+            )
+        if float(np.std(preds, ddof=0)) <= 1e-12:
+            raise RuntimeError(
+                f"ML walk-forward produced degenerate constant predictions at as_of={as_of_date.strftime('%Y-%m-%d')}."
+            )
+        return preds
+
+    def close(self) -> None:
+        """Stop any refit pool still running (after an early exit)."""
+        self._fitted_models.close()
+
+    def lightgbm_training(self) -> dict[str, Any] | None:
+        if self._lightgbm is not None:
+            return self._lightgbm.training_metadata()
+        if self.model_impl == "lightgbm":
+            return {"mode": "refit_per_window"}
+        return None
@@ -2,15 +2,22 @@ from __future__ import annotations
 
 import math
 import os
+from collections.abc import Sequence
 from typing import Any, Callable
 
 import numpy as np
 import pandas as pd
 
-from .ml_features import _feature_matrix, _sort_ml_rows, compute_daily_features
+from .equity_columns import EquityColumns
+from .memory import MemoryReport
+from .metrics import compute_metrics as _compute_metrics
+from .metrics import compute_period_metrics
+from .ml_feature_store import FEATURE_SET_VERSION
+from .ml_features import stack_daily_features
+from .ml_outputs import DailyPortfolio, WalkForwardOutputs
+from .ml_store import WalkForwardStore, plan_walk_forward
+from .ml_trainers import StrategyTrainer
 from .ml_training_models import (
-    _build_model,
-    _compute_metrics,
     _feature_importance,
     _lightgbm_deterministic_params,
     _lightgbm_version,
@@ -21,9 +28,11 @@ from .ml_types import (
     LIGHTGBM_DETERMINISM_MODE,
     ML_RANDOM_SEED,
     MLArtifacts,
+    MLModelSpec,
+    MLTrainingWindowStats,
 )
 from .ml_validation import prepare_model_rows, validate_initial_training_window
-from .turnover import annualize_turnover_from_position_rows, one_way_turnover
+from .turnover import annualize_turnover_from_position_rows
 
 
 def run_walk_forward(
@@ -45,164 +54,180 @@ def run_walk_forward(
     ML_TRAIN_WINDOW_DAYS, default 504 ~= 2 years).
 
     Model refit: every ML_REFIT_FREQ_DAYS trading days (default 5 = weekly).
+    With ML_INCREMENTAL_RIDGE=1, ml_ridge refits from rolling sufficient statistics
+    instead of refitting the sklearn pipeline on the whole window.
+    With ML_LIGHTGBM_DATASET_REUSE=1 (or ML_LIGHTGBM_WARM_START_TREES > 0), ml_lightgbm
+    bins the rows once and trains each window on a subset of that dataset.
+    With ML_FLOAT32=1, features, training matrices and predictions are float32.
+    With ML_REFIT_WORKERS > 1, the other refits are planned up front and fitted on a
+    process pool; the daily predict/portfolio loop stays sequential.
     Predictions and portfolio selection are still performed DAILY.
 
     Horizon: 1 trading day (target = next-day return).
     """
-    model_impl = _model_impl_for_strategy(strategy)
+    spec = MLModelSpec(
+        run_id=run_id,
+        strategy=strategy,
+        top_n=top_n,
+        cost_bps=cost_bps,
+        initial_capital=initial_capital,
+    )
+    return run_walk_forward_batch(
+        [spec],
+        prices=prices,
+        start_date=start_date,
+        end_date=end_date,
+        benchmark_ticker=benchmark_ticker,
+        progress_cb=progress_cb,
+    )[0]
+
+
+def run_walk_forward_batch(
+    specs: Sequence[MLModelSpec],
+    *,
+    prices: pd.DataFrame,
+    start_date: str,
+    end_date: str,
+    benchmark_ticker: str,
+    progress_cb: Callable[[int, int], None] | None = None,
+) -> list[MLArtifacts]:
+    """``run_walk_forward`` for several models over one universe and window.
+
+    Features, model rows, the walk-forward store and its train/test windows are built
+    once.  Each distinct strategy trains once per refit and predicts once per day; every
+    spec then picks its own portfolio from those predictions.  Returns one artifact per
+    spec, in order, each equal to what ``run_walk_forward`` returns for that spec alone.
+    """
+    if not specs:
+        raise ValueError("run_walk_forward_batch needs at least one model spec")
+    for spec in specs:
+        _model_impl_for_strategy(spec.strategy)
 
     min_train_days = int(os.getenv("ML_MIN_TRAIN_DAYS", "252"))
     train_window_days = int(os.getenv("ML_TRAIN_WINDOW_DAYS", "504"))
     model_refit_freq = int(os.getenv("ML_REFIT_FREQ_DAYS", "5"))
-    top_n_cfg = int(top_n if top_n is not None else int(os.getenv("ML_TOP_N", "5")))
-    cost_bps_cfg = float(
-        cost_bps if cost_bps is not None else float(os.getenv("ML_COST_BPS", "10"))
+    feature_dtype = (
+        np.float32 if os.getenv("ML_FLOAT32", "").lower() in ("1", "true", "yes") else np.float64
     )
-    cost_rate = cost_bps_cfg / 10_000.0
+    top_n_cfgs = [
+        int(spec.top_n if spec.top_n is not None else int(os.getenv("ML_TOP_N", "5")))
+        for spec in specs
+    ]
+    cost_bps_cfgs = [
+        float(spec.cost_bps if spec.cost_bps is not None else float(os.getenv("ML_COST_BPS", "10")))
+        for spec in specs
+    ]
 
     # Calendar-day equivalent for the rolling training window.
     train_window_cal_days = math.ceil(train_window_days * 365 / 252)
 
+    label = (
+        f"run={','.join(spec.run_id for spec in specs)} "
+        f"strategy={','.join(spec.strategy for spec in specs)}"
+    )
     print(
-        f"[ML] daily pipeline active; run={run_id} strategy={strategy} "
+        f"[ML] daily pipeline active; {label} "
         f"features={FEATURE_COLUMNS!r}, refit_freq={model_refit_freq}d, "
         f"train_window={train_window_days}d, min_train={min_train_days}d, horizon=1d"
     )
 
-    feature_frame = compute_daily_features(prices, benchmark_ticker=benchmark_ticker)
-    if feature_frame.empty:
+    memory = MemoryReport(f"[engine][ml] {label}", feature_dtype)
+    memory.record("prices", prices)
+    features = stack_daily_features(prices, benchmark_ticker=benchmark_ticker, dtype=feature_dtype)
+    if features is None or len(features) == 0:
         raise RuntimeError(
             "compute_daily_features returned an empty DataFrame — check prices and benchmark_ticker"
         )
 
     model_rows, in_window_rows, all_tickers = prepare_model_rows(
-        feature_frame=feature_frame,
+        features=features,
         prices=prices,
         start_date=start_date,
         end_date=end_date,
     )
-    training_stats = validate_initial_training_window(
-        model_rows=model_rows,
-        in_window_rows=in_window_rows,
-        all_tickers=all_tickers,
-        train_window_cal_days=train_window_cal_days,
-        min_train_days=min_train_days,
-        top_n_cfg=top_n_cfg,
-    )
+    memory.record("features", features)
+    memory.record("model_rows", model_rows, in_window_rows)
+    del features
+    training_stats = [
+        validate_initial_training_window(
+            model_rows=model_rows,
+            in_window_rows=in_window_rows,
+            all_tickers=all_tickers,
+            train_window_cal_days=train_window_cal_days,
+            min_train_days=min_train_days,
+            top_n_cfg=top_n_cfg,
+        )
+        for top_n_cfg in top_n_cfgs
+    ]
 
-    top_n_eff = max(1, min(top_n_cfg, len(all_tickers)))
+    top_n_effs = [max(1, min(top_n_cfg, len(all_tickers))) for top_n_cfg in top_n_cfgs]
     rebalance_dates: list[pd.Timestamp] = sorted(in_window_rows["date"].unique())
 
     print(
-        f"[engine][ml] run={run_id} strategy={strategy} stage=features done "
+        f"[engine][ml] {label} stage=features done "
         f"model_rows={len(model_rows)} rebalance_dates={len(rebalance_dates)} "
-        f"universe={len(all_tickers)} top_n={top_n_eff}"
+        f"universe={len(all_tickers)} top_n={','.join(str(n) for n in top_n_effs)}"
     )
+    print(f"[engine][ml] {label} stage=train_predict start")
 
-    all_predictions: list[dict[str, Any]] = []
-    position_rows: list[dict[str, Any]] = []
-    daily_portfolio: list[float] = []
-    daily_benchmark: list[float] = []
-    equity_dates: list[pd.Timestamp] = []
-    prev_weights = pd.Series(0.0, index=all_tickers)
-    model: Any = None
-    last_refit_idx = -model_refit_freq
-
-    print(f"[engine][ml] run={run_id} strategy={strategy} stage=train_predict start")
-
-    for step_idx, as_of_date in enumerate(rebalance_dates):
-        window_start = as_of_date - pd.Timedelta(days=train_window_cal_days)
-        train_slice = model_rows[
-            (model_rows["date"] >= window_start)
-            & (model_rows["date"] < as_of_date)
-            & (model_rows["ticker"].isin(all_tickers))
-        ]
-        train_slice = _sort_ml_rows(train_slice)
-
-        if train_slice["date"].nunique() < min_train_days:
-            continue
-
-        if step_idx - last_refit_idx >= model_refit_freq:
-            model = _build_model(strategy)
-            model.fit(_feature_matrix(train_slice), train_slice["target_return"].to_numpy())
-            last_refit_idx = step_idx
-            if progress_cb is not None:
-                progress_cb(step_idx + 1, len(rebalance_dates))
-
-        test_slice = in_window_rows[
-            (in_window_rows["date"] == as_of_date) & in_window_rows["ticker"].isin(all_tickers)
-        ].copy()
-        test_slice = _sort_ml_rows(test_slice)
-        if test_slice.empty:
-            continue
-
-        preds = model.predict(_feature_matrix(test_slice))  # type: ignore[union-attr]
-
-        if not np.isfinite(preds).all():
-            raise RuntimeError(
-                f"ML walk-forward produced non-finite predictions at as_of={as_of_date.strftime('%Y-%m-%d')}."
-            )
-        if float(np.std(preds, ddof=0)) <= 1e-12:
-            raise RuntimeError(
-                f"ML walk-forward produced degenerate constant predictions at as_of={as_of_date.strftime('%Y-%m-%d')}."
-            )
-
-        test_slice = test_slice.copy()
-        test_slice["predicted_return"] = preds
-        test_slice = test_slice.sort_values(
-            ["predicted_return", "ticker"], ascending=[False, True]
-        ).reset_index(drop=True)
-        test_slice["rank"] = np.arange(1, len(test_slice) + 1)
-        test_slice["selected"] = test_slice["rank"] <= top_n_eff
-        selected_count = int(test_slice["selected"].sum())
-        selected_weight = 1.0 / selected_count if selected_count > 0 else 0.0
-        test_slice["weight"] = np.where(test_slice["selected"], selected_weight, 0.0)
-        selected = test_slice[test_slice["selected"]]
-
-        new_weights = pd.Series(0.0, index=all_tickers)
-        for _, row in selected.iterrows():
-            new_weights.at[row["ticker"]] = selected_weight
-        turnover = one_way_turnover(prev_weights, new_weights)
-        prev_weights = new_weights
-
-        gross_ret = float(selected["target_return"].mean()) if len(selected) > 0 else 0.0
-        net_ret = gross_ret - cost_rate * turnover
-        bench_ret_v = float(test_slice["benchmark_return"].iloc[0]) if len(test_slice) > 0 else 0.0
-        target_date = pd.Timestamp(test_slice["target_date"].iloc[0])
-
-        daily_portfolio.append(net_ret)
-        daily_benchmark.append(bench_ret_v)
-        equity_dates.append(target_date)
-
-        as_of_str = as_of_date.strftime("%Y-%m-%d")
-        target_date_str = target_date.strftime("%Y-%m-%d")
-        for _, row in test_slice.iterrows():
-            all_predictions.append(
-                {
-                    "run_id": run_id,
-                    "model_name": strategy,
-                    "as_of_date": as_of_str,
-                    "target_date": target_date_str,
-                    "ticker": str(row["ticker"]),
-                    "predicted_return": float(row["predicted_return"]),
-                    "realized_return": float(row["target_return"]),
-                    "rank": int(row["rank"]),
-                    "selected": bool(row["selected"]),
-                    "weight": float(row["weight"]),
-                }
-            )
-
-        for _, row in selected.iterrows():
-            position_rows.append(
-                {
-                    "run_id": run_id,
-                    "date": target_date_str,
-                    "symbol": str(row["ticker"]),
-                    "weight": float(row["weight"]),
-                }
-            )
-
-    if not daily_portfolio:
+    # Every train window and test day below is a contiguous row slice of this store.
+    store = WalkForwardStore.from_rows(
+        model_rows[model_rows["ticker"].isin(all_tickers)], dtype=feature_dtype
+    )
+    memory.record("train_store", store)
+    train_start = pd.Timestamp(model_rows["date"].min()).strftime("%Y-%m-%d")
+    train_end = pd.Timestamp(model_rows["date"].max()).strftime("%Y-%m-%d")
+    rows_after_dropna = len(model_rows)
+    # The store holds everything the loop needs; drop the frames before training.
+    del model_rows, in_window_rows
+
+    plan = plan_walk_forward(
+        store,
+        rebalance_dates,
+        train_window_cal_days=train_window_cal_days,
+        min_train_days=min_train_days,
+        refit_freq=model_refit_freq,
+    )
+    # Position of each store row's ticker in all_tickers, for the daily weight vectors.
+    ticker_pos = pd.Index(all_tickers).get_indexer(store.tickers)
+    portfolios = [
+        DailyPortfolio(
+            WalkForwardOutputs(store, len(plan), top_n_eff),
+            top_n_eff,
+            cost_bps_cfg / 10_000.0,
+            ticker_pos,
+            len(all_tickers),
+        )
+        for top_n_eff, cost_bps_cfg in zip(top_n_effs, cost_bps_cfgs)
+    ]
+    trainers: dict[str, StrategyTrainer] = {}
+    try:
+        for spec in specs:
+            if spec.strategy not in trainers:
+                trainers[spec.strategy] = StrategyTrainer(spec.strategy, store, plan)
+
+        for step_idx, step in plan:
+            if step.refit:
+                for trainer in trainers.values():
+                    trainer.refit(step)
+                if progress_cb is not None:
+                    progress_cb(step_idx + 1, len(rebalance_dates))
+
+            lo, hi = store.row_range(step.end_date, step.end_date + 1)
+            if hi <= lo:
+                continue
+            test_features = store.feature_frame(lo, hi)
+            preds = {
+                strategy: trainer.predict(test_features, step.as_of_date)
+                for strategy, trainer in trainers.items()
+            }
+            for spec, portfolio in zip(specs, portfolios):
+                portfolio.rebalance(step.as_of_date, lo, preds[spec.strategy])
+    finally:
+        for trainer in trainers.values():
+            trainer.close()
+
+    if portfolios[0].outputs.days == 0:
         raise RuntimeError(
             "ML walk-forward produced no rebalances — check warmup period vs backtest window"
         )
@@ -210,9 +235,49 @@ def run_walk_forward(
     if progress_cb is not None and rebalance_dates:
         progress_cb(len(rebalance_dates), len(rebalance_dates))
 
-    all_as_of = sorted({r["as_of_date"] for r in all_predictions})
-    last_20 = set(all_as_of[-20:])
-    prediction_rows = [r for r in all_predictions if r["as_of_date"] in last_20]
+    shared_params = {
+        "train_window_days": train_window_days,
+        "model_refit_frequency": model_refit_freq,
+        "memory": memory,
+        "rows_after_dropna": rows_after_dropna,
+        "training_window": {
+            "min_train_days": min_train_days,
+            "train_window_days": train_window_days,
+            "train_start": train_start,
+            "train_end": train_end,
+        },
+    }
+    return [
+        _spec_artifacts(
+            spec,
+            trainers[spec.strategy],
+            portfolio.outputs,
+            top_n=top_n_eff,
+            cost_bps=cost_bps_cfg,
+            training_stats=stats,
+            shared_params=shared_params,
+        )
+        for spec, portfolio, top_n_eff, cost_bps_cfg, stats in zip(
+            specs, portfolios, top_n_effs, cost_bps_cfgs, training_stats
+        )
+    ]
+
+
+def _spec_artifacts(
+    spec: MLModelSpec,
+    trainer: StrategyTrainer,
+    outputs: WalkForwardOutputs,
+    *,
+    top_n: int,
+    cost_bps: float,
+    training_stats: MLTrainingWindowStats,
+    shared_params: dict[str, Any],
+) -> MLArtifacts:
+    run_id, strategy = spec.run_id, spec.strategy
+    model_impl = trainer.model_impl
+    prediction_rows = outputs.prediction_rows(run_id, strategy)
+    position_rows = outputs.position_rows(run_id)
+    equity_dates = outputs.target_dates()
 
     print(
         f"[engine][ml] run={run_id} strategy={strategy} stage=train_predict done "
@@ -220,67 +285,56 @@ def run_walk_forward(
         f"positions={len(position_rows)}"
     )
 
-    portfolio_ser = pd.Series(daily_portfolio, index=equity_dates)
-    benchmark_ser = pd.Series(daily_benchmark, index=equity_dates)
-    portfolio_nav = initial_capital * (1.0 + portfolio_ser).cumprod()
-    benchmark_nav = initial_capital * (1.0 + benchmark_ser).cumprod()
-
-    equity_rows = [
-        {
-            "date": dt.strftime("%Y-%m-%d"),
-            "portfolio": float(portfolio_nav.loc[dt]),
-            "benchmark": float(benchmark_nav.loc[dt]),
-        }
-        for dt in equity_dates
-    ]
+    portfolio_ser = pd.Series(outputs.portfolio[: outputs.days], index=equity_dates)
+    benchmark_ser = pd.Series(outputs.benchmark[: outputs.days], index=equity_dates)
+    portfolio_nav = spec.initial_capital * (1.0 + portfolio_ser).cumprod()
+    benchmark_nav = spec.initial_capital * (1.0 + benchmark_ser).cumprod()
+
+    equity_rows = EquityColumns.from_series(equity_dates, portfolio_nav, benchmark_nav)
 
     metrics = _compute_metrics(
         portfolio_ser,
         turnover=annualize_turnover_from_position_rows(position_rows, periods_per_year=252.0),
     )
 
-    if model is None:
+    if trainer.model is None:
         raise RuntimeError("Model was never trained")
 
-    rows_after_dropna = len(model_rows)
-    lightgbm_version = _lightgbm_version() if model_impl == "lightgbm" else None
-    deterministic_model_params = (
-        _lightgbm_deterministic_params() if model_impl == "lightgbm" else None
-    )
+    lightgbm = model_impl == "lightgbm"
+    training_window = shared_params["training_window"]
     metadata = {
         "run_id": run_id,
         "model_name": strategy,
-        "train_start": pd.Timestamp(model_rows["date"].min()).strftime("%Y-%m-%d"),
-        "train_end": pd.Timestamp(model_rows["date"].max()).strftime("%Y-%m-%d"),
+        "train_start": training_window["train_start"],
+        "train_end": training_window["train_end"],
         "train_rows": training_stats.n_train_rows,
         "prediction_rows": len(prediction_rows),
         "rebalance_count": len(equity_rows),
-        "top_n": top_n_eff,
-        "cost_bps": cost_bps_cfg,
+        "top_n": top_n,
+        "cost_bps": cost_bps,
         "feature_columns": FEATURE_COLUMNS,
-        "feature_importance": _feature_importance(model, FEATURE_COLUMNS),
+        "feature_importance": _feature_importance(trainer.model, FEATURE_COLUMNS),
         "model_params": {
             "model_impl": model_impl,
             "random_seed": ML_RANDOM_SEED,
             "horizon_days": 1,
-            "train_window_days": train_window_days,
-            "model_refit_frequency": model_refit_freq,
+            "train_window_days": shared_params["train_window_days"],
+            "model_refit_frequency": shared_params["model_refit_frequency"],
+            "incremental_ridge": trainer.incremental_ridge,
+            "refit_workers": trainer.refit_workers,
+            "memory": shared_params["memory"].as_dict(),
             "model_version": "factorlab_ml_daily_v1",
-            "feature_set": "factorlab_daily_v1",
-            "determinism_mode": (LIGHTGBM_DETERMINISM_MODE if model_impl == "lightgbm" else None),
-            "lightgbm_version": lightgbm_version,
-            "deterministic_model_params": deterministic_model_params,
-            "rows_after_dropna": rows_after_dropna,
+            "feature_set": FEATURE_SET_VERSION,
+            "determinism_mode": LIGHTGBM_DETERMINISM_MODE if lightgbm else None,
+            "lightgbm_version": _lightgbm_version() if lightgbm else None,
+            "deterministic_model_params": _lightgbm_deterministic_params() if lightgbm else None,
+            "lightgbm_training": trainer.lightgbm_training(),
+            "rows_after_dropna": shared_params["rows_after_dropna"],
             "train_days": training_stats.n_train_days,
             "avg_symbols_per_day": round(training_stats.avg_symbols, 2),
-            "training_window": {
-                "min_train_days": min_train_days,
-                "train_window_days": train_window_days,
-                "train_start": pd.Timestamp(model_rows["date"].min()).strftime("%Y-%m-%d"),
-                "train_end": pd.Timestamp(model_rows["date"].max()).strftime("%Y-%m-%d"),
-            },
-            "top_n": top_n_eff,
-            "cost_bps": cost_bps_cfg,
+            "training_window": dict(training_window),
+            "top_n": top_n,
+            "cost_bps": cost_bps,
             "warnings": [],
         },
     }
@@ -294,4 +348,5 @@ def run_walk_forward(
         prediction_rows=prediction_rows,
         metadata=metadata,
         position_rows=position_rows,
+        period_metrics=compute_period_metrics(portfolio_ser),
     )
@@ -3,50 +3,19 @@ from __future__ import annotations
 from typing import Any
 
 import numpy as np
-import pandas as pd
 from sklearn.linear_model import Ridge
 from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 
 from .ml_types import ML_RANDOM_SEED
 
-
-def _compute_metrics(returns: pd.Series, turnover: float) -> dict[str, float]:
-    """Compute annualised performance metrics from a daily returns series."""
-    clean = returns.replace([np.inf, -np.inf], np.nan).dropna()
-    if clean.empty:
-        raise ValueError("No returns available for ML metrics")
-
-    mean_period = float(clean.mean())
-    vol_period = float(clean.std(ddof=0))
-    ann_factor = np.sqrt(252.0)  # daily annualisation
-    volatility = vol_period * ann_factor
-    sharpe = (mean_period / vol_period) * ann_factor if vol_period > 0 else 0.0
-
-    equity = (1.0 + clean).cumprod()
-    peak = equity.cummax()
-    drawdown = equity / peak - 1.0
-    max_drawdown = float(drawdown.min())
-
-    n = len(clean)
-    cagr = float(equity.iloc[-1] ** (252.0 / n) - 1.0) if n > 0 else 0.0
-    calmar = cagr / abs(max_drawdown) if max_drawdown < 0 else 0.0
-    win_rate = float((clean > 0).mean())
-
-    gains = float(clean[clean > 0].sum())
-    losses = float(abs(clean[clean < 0].sum()))
-    profit_factor = gains / losses if losses > 0 else 0.0
-
-    return {
-        "cagr": cagr,
-        "sharpe": sharpe,
-        "max_drawdown": max_drawdown,
-        "turnover": float(turnover),
-        "volatility": volatility,
-        "win_rate": win_rate,
-        "profit_factor": profit_factor,
-        "calmar": calmar,
-    }
+# Fewer estimators for daily refits (refit ~252x/year vs ~12x monthly)
+_LIGHTGBM_MODEL_PARAMS: dict[str, Any] = {
+    "n_estimators": 200,
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "min_child_samples": 10,
+}
 
 
 def _build_model(strategy: str):
@@ -54,22 +23,9 @@ def _build_model(strategy: str):
         return make_pipeline(StandardScaler(), Ridge(alpha=1.0, random_state=ML_RANDOM_SEED))
 
     if strategy == "ml_lightgbm":
-        try:
-            from lightgbm import LGBMRegressor  # noqa: PLC0415
-        except (ImportError, OSError) as exc:
-            raise RuntimeError(
-                "ml_lightgbm requires LightGBM and its native OpenMP library to be "
-                "installed. No silent fallback will occur. "
-                "Install with: pip install 'lightgbm>=4.5.0' and on macOS run: "
-                "brew install libomp. "
-                f"Original error: {exc}"
-            ) from exc
-        # Fewer estimators for daily refits (refit ~252x/year vs ~12x monthly)
-        return LGBMRegressor(
-            n_estimators=200,
-            learning_rate=0.05,
-            num_leaves=31,
-            min_child_samples=10,
+        lightgbm = _require_lightgbm()
+        return lightgbm.LGBMRegressor(
+            **_LIGHTGBM_MODEL_PARAMS,
             verbose=-1,
             **_lightgbm_deterministic_params(),
         )
@@ -77,6 +33,20 @@ def _build_model(strategy: str):
     raise ValueError(f"Unsupported ML strategy: {strategy}")
 
 
+def _require_lightgbm() -> Any:
+    try:
+        import lightgbm  # noqa: PLC0415
+    except (ImportError, OSError) as exc:
+        raise RuntimeError(
+            "ml_lightgbm requires LightGBM and its native OpenMP library to be "
+            "installed. No silent fallback will occur. "
+            "Install with: pip install 'lightgbm>=4.5.0' and on macOS run: "
+            "brew install libomp. "
+            f"Original error: {exc}"
+        ) from exc
+    return lightgbm
+
+
 def _model_impl_for_strategy(strategy: str) -> str:
     if strategy == "ml_ridge":
         return "ridge"
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .equity_columns import EquityColumns
 
 # ---------------------------------------------------------------------------
 # Feature columns - daily, leakage-safe
@@ -20,14 +23,29 @@ ML_RANDOM_SEED = 0
 LIGHTGBM_DETERMINISM_MODE = "strict_same_deployment_v1"
 
 
+@dataclass(frozen=True)
+class MLModelSpec:
+    """One model of a walk-forward batch: the run it belongs to and its portfolio settings.
+
+    ``top_n`` and ``cost_bps`` default to ML_TOP_N / ML_COST_BPS like ``run_walk_forward``.
+    """
+
+    run_id: str
+    strategy: str
+    top_n: int | None = None
+    cost_bps: float | None = None
+    initial_capital: float = 100_000.0
+
+
 @dataclass(frozen=True)
 class MLArtifacts:
-    equity_rows: list[dict[str, Any]]
+    equity_rows: EquityColumns
     metrics: dict[str, float]
     feature_rows: list[dict[str, Any]]
     prediction_rows: list[dict[str, Any]]
     metadata: dict[str, Any]
     position_rows: list[dict[str, Any]]
+    period_metrics: dict[str, Any] | None = None
 
 
 @dataclass(frozen=True)
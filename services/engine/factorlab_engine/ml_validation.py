@@ -3,45 +3,57 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-from .ml_features import _sort_ml_rows
+from .ml_feature_store import STORED_COLUMNS
+from .ml_features import LongFeatures
 from .ml_types import FEATURE_COLUMNS, MLTrainingWindowStats
 
 
 def prepare_model_rows(
     *,
-    feature_frame: pd.DataFrame,
+    features: LongFeatures,
     prices: pd.DataFrame,
     start_date: str,
     end_date: str,
 ) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
-    feature_frame["date"] = pd.to_datetime(feature_frame["date"], utc=False)
-    trading_dates = pd.Index(pd.to_datetime(prices.sort_index().index, utc=False))
-    next_trading_dates = pd.Series(
-        trading_dates[1:].to_numpy(),
-        index=trading_dates[:-1],
-    )
-    feature_frame["target_date"] = feature_frame["date"].map(next_trading_dates)
+    """Model rows (complete features, target and target date) and their in-window subset.
+
+    ``features`` is already in ``(date, ticker)`` order, so both are boolean-mask views of
+    it: no dropna and no re-sort.
+    """
+    trading_dates = np.sort(pd.to_datetime(prices.index, utc=False).to_numpy())
+    next_pos = np.searchsorted(trading_dates, features.dates.to_numpy()) + 1
+    has_next = next_pos < len(trading_dates)
+    next_trading_dates = trading_dates[np.minimum(next_pos, len(trading_dates) - 1)]
 
-    features_clean = feature_frame.replace([np.inf, -np.inf], np.nan)
-    model_rows = features_clean.dropna(
-        subset=FEATURE_COLUMNS + ["target_return", "target_date"]
-    ).copy()
-    model_rows = _sort_ml_rows(model_rows)
+    values = features.values
+    checked = [STORED_COLUMNS.index(name) for name in [*FEATURE_COLUMNS, "target_return"]]
+    keep = np.isfinite(values[checked]).all(axis=0) & has_next[features.date_code]
+    rows = features.take(keep)
+    # +/-inf in an unchecked column (benchmark_return) still reads as missing.
+    rows.values[np.isinf(rows.values)] = np.nan
+
+    target_date = next_trading_dates[rows.date_code]
+    # One float block over the masked panel (no per-column copies), then the key columns.
+    model_rows = pd.DataFrame(rows.values.T, columns=STORED_COLUMNS, copy=False)
+    model_rows.insert(0, "date", features.dates[rows.date_code])
+    # Int-coded, sorted categories: ticker order matches a string sort.
+    model_rows.insert(
+        1, "ticker", pd.Categorical.from_codes(rows.ticker_code, categories=features.tickers)
+    )
+    model_rows["target_date"] = target_date
 
     start_ts = pd.to_datetime(start_date)
     end_ts = pd.to_datetime(end_date)
 
-    in_window_rows = model_rows[
-        (model_rows["target_date"] >= start_ts) & (model_rows["target_date"] <= end_ts)
-    ].copy()
-    in_window_rows = _sort_ml_rows(in_window_rows)
+    in_window = (target_date >= start_ts.to_datetime64()) & (target_date <= end_ts.to_datetime64())
+    in_window_rows = model_rows[in_window]
     if in_window_rows.empty:
         raise RuntimeError(
             f"No ML rows in backtest window {start_date}..{end_date} after feature dropna. "
             "Check that price data covers the requested backtest window."
         )
 
-    all_tickers = sorted(in_window_rows["ticker"].unique().tolist())
+    all_tickers = [features.tickers[code] for code in np.unique(rows.ticker_code[in_window])]
     if not all_tickers:
         raise RuntimeError("No non-benchmark tickers available for ML portfolio")
 
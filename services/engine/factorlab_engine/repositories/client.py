@@ -9,6 +9,8 @@ from typing import Any, Callable
 
 from supabase import Client, create_client
 
+from .shared_prices import SharedPriceFrame
+
 # heartbeat stall scanner won't trigger.
 _INGEST_MAX_RUNTIME_SECONDS: int = int(os.getenv("INGEST_MAX_RUNTIME_SECONDS", "300"))  # 5 min
 
@@ -28,6 +30,9 @@ _SUPABASE_SELECT_PAGE_SIZE = 1000
 # Identifies this worker process in jobs.worker_id for debugging.
 _WORKER_ID: str = f"{socket.gethostname()}:{os.getpid()}"
 
+# Job types that execute a run: their jobs carry a run_id and drive runs.status.
+_RUN_JOB_TYPES: frozenset[str] = frozenset({"backtest", "baseline_sweep"})
+
 
 @dataclass(frozen=True)
 class Job:
@@ -59,6 +64,13 @@ class DataIngestJob:
     requested_by_user_id: str | None = None
 
 
+@dataclass(frozen=True)
+class _SelectedRows:
+    """Rows gathered across keyset pages, shaped like a PostgREST response (``.data``)."""
+
+    data: list[dict[str, Any]]
+
+
 # Exponential back-off delays (seconds) indexed by attempt number.
 # attempt 1 → 60 s, 2 → 300 s, 3 → 900 s, 4+ → 3600 s
 _RETRY_DELAYS_SECONDS: list[int] = [60, 300, 900, 3600]
@@ -84,6 +96,10 @@ class ClientRepositoryMixin:
         self.client: Client = create_client(url, key)
         self._legacy_data_ingest_schema: bool | None = None
         self._notifications_available: bool | None = None
+        self._price_matrix_available: bool | None = None
+        self._run_rows_rpc_missing: frozenset[str] = frozenset()
+        # Attached by concurrent backtest workers; fetch_prices_frame serves from it first.
+        self.shared_prices: SharedPriceFrame | None = None
 
     def _is_missing_data_ingest_column_error(self, exc: Exception | str) -> bool:
         message = str(exc).lower()
@@ -142,6 +158,38 @@ class ClientRepositoryMixin:
             raise last_exc
         raise RuntimeError(f"{context} failed without raising an exception")
 
+    def _select_keyset(
+        self,
+        build_query: Callable[[], Any],
+        *,
+        key: str,
+        context: str,
+        page_size: int = _SUPABASE_SELECT_PAGE_SIZE,
+    ) -> list[dict[str, Any]]:
+        """Return every row of ``build_query()`` using keyset (seek) pagination on ``key``.
+
+        ``key`` must be unique within the filtered rows (e.g. ``date`` for one ticker, ``id``
+        for jobs).  Each page filters ``key > last seen value`` and orders by ``key`` instead of
+        skipping rows with OFFSET, so page cost stays constant however deep the scan goes.
+        Every page keeps its own ``_execute_with_retry`` loop.
+        """
+        rows: list[dict[str, Any]] = []
+        last_seen: Any = None
+        while True:
+
+            def _page(after: Any = last_seen) -> Any:
+                query = build_query()
+                if after is not None:
+                    query = query.gt(key, after)
+                return query.order(key).limit(page_size).execute()
+
+            result = self._execute_with_retry(_page, context=f"{context} after={last_seen}")
+            chunk = result.data or []
+            rows.extend(chunk)
+            if len(chunk) < page_size:
+                return rows
+            last_seen = chunk[-1][key]
+
     def _normalize_data_ingest_status(self, status: str | None) -> str | None:
         if status == "completed":
             return "succeeded"
@@ -327,16 +375,29 @@ class ClientRepositoryMixin:
         extended_fields: str,
         legacy_fields: str,
         query_builder: Any,
+        *,
+        keyset_key: str | None = None,
     ) -> Any:
+        def _run(fields: str) -> Any:
+            if keyset_key is None:
+                return query_builder(fields).execute()
+            return _SelectedRows(
+                self._select_keyset(
+                    lambda: query_builder(fields),
+                    key=keyset_key,
+                    context="select data_ingest_jobs",
+                )
+            )
+
         if self._legacy_data_ingest_mode() is True:
-            return query_builder(legacy_fields).execute()
+            return _run(legacy_fields)
         try:
-            return query_builder(extended_fields).execute()
+            return _run(extended_fields)
         except Exception as exc:
             if not self._is_missing_data_ingest_column_error(exc):
                 raise
             self._legacy_data_ingest_schema = True
-            return query_builder(legacy_fields).execute()
+            return _run(legacy_fields)
 
     def _update_data_ingest_row(self, job_id: str, values: dict[str, Any]) -> Any:
         payload = dict(values)
@@ -2,24 +2,88 @@ from __future__ import annotations
 
 from typing import Any
 
+from ..equity_columns import EquityColumns
+from . import run_rows
+from .run_rows import _encode_run_rows, _is_missing_run_rows_error, _run_rows_function
+
 
 class EquityRepositoryMixin:
     def _replace_equity_curve(
-        self, run_id: str, rows: list[dict[str, Any]], chunk_size: int = 500
+        self, run_id: str, rows: EquityColumns | list[dict[str, Any]], chunk_size: int = 500
+    ) -> None:
+        self._replace_run_rows("equity_curve", run_id, rows, chunk_size)
+
+    def _replace_run_rows(
+        self,
+        table: str,
+        run_id: str,
+        rows: EquityColumns | list[dict[str, Any]],
+        chunk_size: int = 500,
     ) -> None:
+        """Replace one run's rows in ``table``: bulk RPCs when available, else chunks.
+
+        An ``EquityColumns`` curve is sent straight from its arrays; the chunked path only
+        builds the rows of one chunk at a time.
+        """
+        if self._bulk_replace_run_rows(table, run_id, rows):
+            return
         self._execute_with_retry(
-            lambda: self.client.table("equity_curve").delete().eq("run_id", run_id).execute(),
-            context=f"delete_equity_curve run_id={run_id}",
+            lambda: self.client.table(table).delete().eq("run_id", run_id).execute(),
+            context=f"delete_{table} run_id={run_id}",
         )
         if not rows:
             return
         for start in range(0, len(rows), chunk_size):
             chunk = rows[start : start + chunk_size]
+            if isinstance(chunk, EquityColumns):
+                chunk = chunk.to_rows(run_id)
             self._execute_with_retry(
-                lambda chunk=chunk: self.client.table("equity_curve").insert(chunk).execute(),
-                context=f"insert_equity_curve run_id={run_id} rows={len(chunk)} offset={start}",
+                lambda chunk=chunk: self.client.table(table).insert(chunk).execute(),
+                context=f"insert_{table} run_id={run_id} rows={len(chunk)} offset={start}",
             )
 
+    def _bulk_replace_run_rows(
+        self, table: str, run_id: str, rows: EquityColumns | list[dict[str, Any]]
+    ) -> bool:
+        """Replace the rows through ``replace_<table>``, ``_RUN_ROWS_RPC_MAX_ROWS`` at a time.
+
+        The first call deletes the run's old rows and inserts the first slice in one
+        transaction; any further slices are appended with ``p_replace`` off.  Returns False
+        when the RPC is disabled, not deployed (remembered for the process), cannot take
+        these rows, or a call hits a statement timeout.  A timed-out call was rolled back,
+        so it is not re-sent as is: the smaller chunked statements (each retried on its
+        own) delete whatever was written and replace the rows instead.  Other errors
+        propagate like a failed chunk would.
+        """
+        missing = getattr(self, "_run_rows_rpc_missing", frozenset())
+        if not run_rows._RUN_ROWS_RPC or table in missing:
+            return False
+        limit = run_rows._RUN_ROWS_RPC_MAX_ROWS
+        if limit <= 0 or len(rows) <= limit:
+            slices = [rows]
+        else:
+            slices = [rows[start : start + limit] for start in range(0, len(rows), limit)]
+        payloads = [_encode_run_rows(table, run_id, part) for part in slices]
+        if any(payload is None for payload in payloads):
+            return False
+        function = _run_rows_function(table)
+        for offset, payload in enumerate(payloads):
+            params: dict[str, Any] = {"p_run_id": run_id, "p_payload": payload}
+            if offset:
+                params["p_replace"] = False
+            try:
+                self.client.rpc(function, params).execute()
+            except Exception as exc:
+                if self._is_transient_db_timeout(exc):
+                    print(f"[supabase_io] {function} timed out; using chunked inserts")
+                    return False
+                if not _is_missing_run_rows_error(exc, table):
+                    raise
+                print(f"[supabase_io] {function} unavailable; using chunked inserts")
+                self._run_rows_rpc_missing = missing | {table}
+                return False
+        return True
+
     def _upsert_metrics(self, run_id: str, metrics: dict[str, float]) -> None:
         payload = {
             "run_id": run_id,
@@ -59,36 +123,12 @@ class EquityRepositoryMixin:
     def _replace_model_predictions(
         self, run_id: str, rows: list[dict[str, Any]], chunk_size: int = 500
     ) -> None:
-        self._execute_with_retry(
-            lambda: self.client.table("model_predictions").delete().eq("run_id", run_id).execute(),
-            context=f"delete_model_predictions run_id={run_id}",
-        )
-        if not rows:
-            return
-        for start in range(0, len(rows), chunk_size):
-            chunk = rows[start : start + chunk_size]
-            self._execute_with_retry(
-                lambda chunk=chunk: self.client.table("model_predictions").insert(chunk).execute(),
-                context=(
-                    f"insert_model_predictions run_id={run_id} rows={len(chunk)} offset={start}"
-                ),
-            )
+        self._replace_run_rows("model_predictions", run_id, rows, chunk_size)
 
     def _replace_positions(
         self, run_id: str, rows: list[dict[str, Any]], chunk_size: int = 500
     ) -> None:
-        self._execute_with_retry(
-            lambda: self.client.table("positions").delete().eq("run_id", run_id).execute(),
-            context=f"delete_positions run_id={run_id}",
-        )
-        if not rows:
-            return
-        for start in range(0, len(rows), chunk_size):
-            chunk = rows[start : start + chunk_size]
-            self._execute_with_retry(
-                lambda chunk=chunk: self.client.table("positions").insert(chunk).execute(),
-                context=f"insert_positions run_id={run_id} rows={len(chunk)} offset={start}",
-            )
+        self._replace_run_rows("positions", run_id, rows, chunk_size)
 
     def _replace_model_metadata(self, run_id: str, metadata: dict[str, Any]) -> None:
         self._execute_with_retry(
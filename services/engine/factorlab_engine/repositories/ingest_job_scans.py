@@ -37,6 +37,7 @@ class DataIngestJobScansRepositoryMixin:
                     .eq("status", "running")
                     .lt("last_heartbeat_at", cutoff_heartbeat)
                 ),
+                keyset_key="id",
             )
             # Secondary: heartbeat alive but running too long
             result_maxtime = self._select_data_ingest_rows(
@@ -49,6 +50,7 @@ class DataIngestJobScansRepositoryMixin:
                     .lt("started_at", cutoff_max_runtime)
                     .not_.is_("started_at", "null")
                 ),
+                keyset_key="id",
             )
             # Deduplicate by id (a single job may appear in both result sets)
             seen_ids: set[str] = set()
@@ -159,6 +161,7 @@ class DataIngestJobScansRepositoryMixin:
                     .eq("status", "queued")
                     .lt("created_at", cutoff)
                 ),
+                keyset_key="id",
             )
             stuck = result.data or []
             if not stuck:
@@ -238,15 +241,17 @@ class DataIngestJobScansRepositoryMixin:
         try:
             now_iso = datetime.now(timezone.utc).isoformat()
             retry_status = "failed" if self._legacy_data_ingest_mode() else "retrying"
-            result = (
-                self.client.table("data_ingest_jobs")
-                .select("id,attempt_count,request_mode")
-                .eq("status", retry_status)
-                .lte("next_retry_at", now_iso)
-                .not_.is_("next_retry_at", "null")
-                .execute()
+            due = self._select_keyset(
+                lambda: (
+                    self.client.table("data_ingest_jobs")
+                    .select("id,attempt_count,request_mode")
+                    .eq("status", retry_status)
+                    .lte("next_retry_at", now_iso)
+                    .not_.is_("next_retry_at", "null")
+                ),
+                key="id",
+                context="requeue_due_data_ingest",
             )
-            due = result.data or []
             if not due:
                 return
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from .client import _WORKER_ID, Job
+from .client import _RUN_JOB_TYPES, _WORKER_ID, Job
 from .jobs_retries import JobsRetryRepositoryMixin
 
 
@@ -22,8 +22,8 @@ class JobsRepositoryMixin(JobsRetryRepositoryMixin):
         for row in rows:
             job_type = row.get("job_type", "backtest")
             run_id = row.get("run_id")
-            # Backtest jobs must have a run_id; skip orphaned rows
-            if job_type == "backtest" and not run_id:
+            # Backtest and sweep jobs must have a run_id; skip orphaned rows
+            if job_type in _RUN_JOB_TYPES and not run_id:
                 continue
             jobs.append(
                 Job(
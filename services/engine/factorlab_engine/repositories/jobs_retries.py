@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
-from .client import Job, _get_retry_delay
+from .client import _RUN_JOB_TYPES, Job, _get_retry_delay
 
 
 class JobsRetryRepositoryMixin:
@@ -31,29 +31,34 @@ class JobsRetryRepositoryMixin:
             # is still NULL (claimed but not yet ticked) use updated_at instead.
             # The or_() filter handles both cases in one query.
             try:
-                result = (
-                    self.client.table("jobs")
-                    .select(
-                        "id, run_id, name, stage, attempt_count, preflight_run_id, payload, job_type"
-                    )
-                    .eq("status", "running")
-                    .or_(
-                        f"heartbeat_at.lt.{cutoff},and(heartbeat_at.is.null,updated_at.lt.{cutoff})"
-                    )
-                    .execute()
+                stalled = self._select_keyset(
+                    lambda: (
+                        self.client.table("jobs")
+                        .select(
+                            "id, run_id, name, stage, attempt_count, preflight_run_id, payload, job_type"
+                        )
+                        .eq("status", "running")
+                        .or_(
+                            f"heartbeat_at.lt.{cutoff},and(heartbeat_at.is.null,updated_at.lt.{cutoff})"
+                        )
+                    ),
+                    key="id",
+                    context="scan_stalled_jobs",
                 )
             except Exception:
                 # heartbeat_at column not yet present — fall back to updated_at only.
-                result = (
-                    self.client.table("jobs")
-                    .select(
-                        "id, run_id, name, stage, attempt_count, preflight_run_id, payload, job_type"
-                    )
-                    .eq("status", "running")
-                    .lt("updated_at", cutoff)
-                    .execute()
+                stalled = self._select_keyset(
+                    lambda: (
+                        self.client.table("jobs")
+                        .select(
+                            "id, run_id, name, stage, attempt_count, preflight_run_id, payload, job_type"
+                        )
+                        .eq("status", "running")
+                        .lt("updated_at", cutoff)
+                    ),
+                    key="id",
+                    context="scan_stalled_jobs",
                 )
-            stalled = result.data or []
             if not stalled:
                 return
 
@@ -113,7 +118,7 @@ class JobsRetryRepositoryMixin:
                         f"(exhausted {next_attempt} attempts)"
                     )
 
-                    if row.get("job_type", "backtest") == "backtest" and row.get("run_id"):
+                    if row.get("job_type", "backtest") in _RUN_JOB_TYPES and row.get("run_id"):
                         run_id = str(row["run_id"])
                         self.client.table("runs").update({"status": "failed"}).eq(
                             "id", run_id
@@ -163,16 +168,18 @@ class JobsRetryRepositoryMixin:
         try:
             cutoff = (datetime.now(timezone.utc) - timedelta(minutes=timeout_minutes)).isoformat()
 
-            result = (
-                self.client.table("jobs")
-                .select(
-                    "id, run_id, name, stage, attempt_count, preflight_run_id, payload, job_type"
-                )
-                .eq("status", "queued")
-                .lt("created_at", cutoff)
-                .execute()
+            stuck = self._select_keyset(
+                lambda: (
+                    self.client.table("jobs")
+                    .select(
+                        "id, run_id, name, stage, attempt_count, preflight_run_id, payload, job_type"
+                    )
+                    .eq("status", "queued")
+                    .lt("created_at", cutoff)
+                ),
+                key="id",
+                context="scan_queued_too_long_jobs",
             )
-            stuck = result.data or []
             if not stuck:
                 return
 
@@ -311,16 +318,18 @@ class JobsRetryRepositoryMixin:
         """
         try:
             now_iso = datetime.now(timezone.utc).isoformat()
-            result = (
-                self.client.table("jobs")
-                .select("id, run_id, attempt_count, job_type")
-                .eq("status", "failed")
-                .lte("next_retry_at", now_iso)
-                .lt("attempt_count", max_attempts)
-                .not_.is_("next_retry_at", "null")
-                .execute()
+            due = self._select_keyset(
+                lambda: (
+                    self.client.table("jobs")
+                    .select("id, run_id, attempt_count, job_type")
+                    .eq("status", "failed")
+                    .lte("next_retry_at", now_iso)
+                    .lt("attempt_count", max_attempts)
+                    .not_.is_("next_retry_at", "null")
+                ),
+                key="id",
+                context="requeue_due_for_retry",
             )
-            due = result.data or []
             if not due:
                 return
 
@@ -337,7 +346,7 @@ class JobsRetryRepositoryMixin:
                         "updated_at": now_iso,
                     }
                 ).eq("id", row["id"]).execute()
-                if job_type == "backtest" and row.get("run_id"):
+                if job_type in _RUN_JOB_TYPES and row.get("run_id"):
                     self.client.table("runs").update({"status": "queued"}).eq(
                         "id", row["run_id"]
                     ).execute()
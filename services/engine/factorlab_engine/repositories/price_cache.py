@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..disk_cache import mark_used, prune_least_recently_used
+
+# Opt-in on-disk price cache used by fetch_prices_frame.  Empty (the default) disables it.
+_PRICE_CACHE_DIR: str = os.getenv("PRICE_CACHE_DIR", "")
+# Size bound of that directory; least recently used tickers are evicted past it (0: none).
+_PRICE_CACHE_MAX_BYTES: int = int(float(os.getenv("PRICE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+_PRICE_CACHE_FORMAT_VERSION = 1
+# Resolution pandas gives dates parsed from Supabase rows; cached frames use the same unit so
+# a cache hit is indistinguishable from a fresh fetch.
+_ROW_DATE_UNIT: str = pd.to_datetime(["2000-01-01"]).unit
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+@dataclass(frozen=True)
+class CachedPrices:
+    """One ticker's cached adj_close history plus the window and DB state it was read at.
+
+    ``start``/``end`` is the requested date range the arrays cover (the high-water mark is
+    ``end``); ``token`` combines data_state.data_cutoff_date with the ticker's ticker_stats
+    row, so an advanced cutoff or a re-ingest of the ticker invalidates the entry.
+    """
+
+    dates: np.ndarray  # datetime64[D], ascending, unique
+    adj_close: np.ndarray  # float64
+    start: str
+    end: str
+    token: str
+
+    def between(self, start: str, end: str) -> tuple[np.ndarray, np.ndarray]:
+        keep = (self.dates >= np.datetime64(start, "D")) & (self.dates <= np.datetime64(end, "D"))
+        return self.dates[keep], self.adj_close[keep]
+
+
+class PriceCache:
+    """Per-ticker ``.npz`` files under one directory, replaced atomically on every write.
+
+    ``prune`` keeps the directory within ``_PRICE_CACHE_MAX_BYTES``, evicting the tickers
+    least recently loaded or stored first.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{_UNSAFE_FILENAME_CHARS.sub('_', ticker)}.npz"
+
+    def load(self, ticker: str) -> CachedPrices | None:
+        path = self._path(ticker)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != _PRICE_CACHE_FORMAT_VERSION:
+                    return None
+                entry = CachedPrices(
+                    dates=data["dates"].astype("datetime64[D]"),
+                    adj_close=data["adj_close"].astype(float),
+                    start=str(meta["start"]),
+                    end=str(meta["end"]),
+                    token=str(meta["token"]),
+                )
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            print(f"[price_cache] warning: discarding unreadable cache file {path}: {exc}")
+            return None
+        mark_used(path)
+        return entry
+
+    def store(self, ticker: str, entry: CachedPrices) -> None:
+        meta = {
+            "version": _PRICE_CACHE_FORMAT_VERSION,
+            "start": entry.start,
+            "end": entry.end,
+            "token": entry.token,
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(
+                    fh,
+                    dates=entry.dates.astype("datetime64[D]"),
+                    adj_close=entry.adj_close.astype(float),
+                    meta=np.array(json.dumps(meta)),
+                )
+            os.replace(tmp_name, self._path(ticker))
+        except OSError as exc:
+            # The cache is an optimisation only; a full disk must never fail a run.
+            print(f"[price_cache] warning: could not write cache for {ticker}: {exc}")
+
+    def invalidate(self, tickers: list[str]) -> None:
+        """Drop the tickers' entries, e.g. after rows were written behind ticker_stats' back."""
+        for ticker in tickers:
+            try:
+                self._path(ticker).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                print(f"[price_cache] warning: could not invalidate cache for {ticker}: {exc}")
+
+    def prune(self) -> None:
+        prune_least_recently_used(self.root, _PRICE_CACHE_MAX_BYTES, label="price_cache")
+
+
+def invalidate_cached_prices(tickers: list[str]) -> None:
+    """Forget cached prices of ``tickers`` after writing their ``prices`` rows directly.
+
+    Writes that bypass ingest leave ticker_stats, and so the cache token, unchanged.
+    """
+    if _PRICE_CACHE_DIR:
+        PriceCache(_PRICE_CACHE_DIR).invalidate(tickers)
+
+
+def _rows_to_arrays(rows: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    dates = np.array([str(row["date"])[:10] for row in rows], dtype="datetime64[D]")
+    values = np.array([row["adj_close"] for row in rows], dtype=float)
+    return dates, values
+
+
+def _merge_price_arrays(
+    *parts: tuple[np.ndarray, np.ndarray],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate date/value segments; on duplicate dates the later segment wins."""
+    dates = np.concatenate([p[0] for p in parts]) if parts else np.array([], "datetime64[D]")
+    values = np.concatenate([p[1] for p in parts]) if parts else np.array([], float)
+    if dates.size == 0:
+        return dates, values
+    # Reverse so np.unique keeps the last occurrence of each date.
+    unique_dates, first_in_reversed = np.unique(dates[::-1], return_index=True)
+    return unique_dates, values[::-1][first_in_reversed]
+
+
+def _price_frame_from_arrays(columns: dict[str, tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    """Build the same unfilled wide frame ``fetch_unfilled_prices_frame`` pivots out of rows."""
+    series = {
+        ticker: pd.Series(
+            values,
+            index=pd.DatetimeIndex(dates.astype(f"datetime64[{_ROW_DATE_UNIT}]"), name="date"),
+        )
+        for ticker, (dates, values) in sorted(columns.items())
+        if dates.size
+    }
+    if not series:
+        return pd.DataFrame()
+    frame = pd.DataFrame(series)
+    frame.columns.name = "ticker"
+    frame = frame.sort_index()
+    # Aligning the per-ticker series can infer an index frequency; a pivot of DB rows never
+    # carries one.
+    frame.index = pd.DatetimeIndex(frame.index.to_numpy(), name="date")
+    return frame
+
+
+def _day_after(date: str) -> str:
+    return str(np.datetime64(date, "D") + 1)
+
+
+def _day_before(date: str) -> str:
+    return str(np.datetime64(date, "D") - 1)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import base64
+import os
+import sys
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .price_cache import _ROW_DATE_UNIT
+
+# Opt-in: load uncached price windows through the get_price_matrix RPC (migration
+# 20261018_get_price_matrix.sql) instead of per-ticker row queries.
+_PRICE_MATRIX_RPC: bool = os.getenv("PRICE_MATRIX_RPC", "").lower() in ("1", "true", "yes")
+_PRICE_MATRIX_FUNCTION = "get_price_matrix"
+
+
+def _is_missing_price_matrix_error(exc: Exception | str) -> bool:
+    message = str(exc).lower()
+    return _PRICE_MATRIX_FUNCTION in message and (
+        "could not find" in message or "does not exist" in message or "pgrst202" in message
+    )
+
+
+def _decode_price_matrix(payload: dict[str, Any]) -> pd.DataFrame:
+    """Decode a ``get_price_matrix`` payload into the unfilled wide adj_close frame.
+
+    ``values`` is base64 of big-endian float64s (``float8send``), row-major over
+    ``dates`` x ``tickers`` with NaN where a ticker has no row.  Tickers arrive in byte
+    order and dates ascending, the same layout ``DataFrame.pivot`` produces.  The decoded
+    buffer is byte-swapped in place and wrapped without a further copy.
+    """
+    tickers = [str(ticker) for ticker in payload.get("tickers") or []]
+    dates = payload.get("dates") or []
+    if not tickers or not dates:
+        return pd.DataFrame()
+
+    raw = bytearray(base64.b64decode(payload.get("values") or ""))
+    expected = len(dates) * len(tickers) * 8
+    if len(raw) != expected:
+        raise ValueError(
+            f"{_PRICE_MATRIX_FUNCTION} returned {len(raw)} bytes; expected {expected} "
+            f"for {len(dates)} dates x {len(tickers)} tickers"
+        )
+    values = np.frombuffer(raw, dtype=np.float64)
+    if sys.byteorder == "little":
+        values.byteswap(inplace=True)
+    matrix = values.reshape(len(dates), len(tickers))
+
+    index = pd.DatetimeIndex(
+        np.array(dates, dtype="datetime64[D]").astype(f"datetime64[{_ROW_DATE_UNIT}]"),
+        name="date",
+    )
+    return pd.DataFrame(matrix, index=index, columns=pd.Index(tickers, name="ticker"), copy=False)
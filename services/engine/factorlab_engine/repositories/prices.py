@@ -1,10 +1,48 @@
 from __future__ import annotations
 
-from typing import Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
 
+import numpy as np
 import pandas as pd
 
-from .client import _SUPABASE_SELECT_PAGE_SIZE
+from . import price_cache, price_matrix
+from .price_cache import (
+    CachedPrices,
+    PriceCache,
+    _day_after,
+    _day_before,
+    _merge_price_arrays,
+    _price_frame_from_arrays,
+    _rows_to_arrays,
+)
+from .price_matrix import (
+    _PRICE_MATRIX_FUNCTION,
+    _decode_price_matrix,
+    _is_missing_price_matrix_error,
+)
+
+_DATA_STATE_ID = 1
+# Per-ticker price queries issued at once by fetch_prices_frame.  Each query keeps its own
+# _execute_with_retry loop; 1 restores strictly sequential fetching.
+_PRICE_FETCH_CONCURRENCY: int = int(os.getenv("PRICE_FETCH_CONCURRENCY", "8"))
+_MAX_PRICE_FETCH_CONCURRENCY = 32
+
+_T = TypeVar("_T")
+
+
+def _map_tickers(fn: Callable[[str], _T], tickers: list[str]) -> list[_T]:
+    """Apply ``fn`` to every ticker on a bounded thread pool; results keep ticker order."""
+    workers = max(1, min(_PRICE_FETCH_CONCURRENCY, _MAX_PRICE_FETCH_CONCURRENCY, len(tickers)))
+    if workers == 1:
+        return [fn(ticker) for ticker in tickers]
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="price-fetch")
+    try:
+        return list(executor.map(fn, tickers))
+    finally:
+        # Don't block on in-flight queries when one ticker failed or the job timed out.
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 class PricesRepositoryMixin:
@@ -14,40 +52,40 @@ class PricesRepositoryMixin:
         if not tickers:
             return pd.DataFrame()
 
-        rows: list[dict[str, Any]] = []
-        # Fetch one ticker at a time so every query is a tight single-column
-        # index scan on idx_prices_ticker_date with no large OFFSET.  The
-        # multi-ticker IN(…)+ORDER BY approach requires Postgres to merge N
-        # sorted streams and skip potentially 10 000–20 000 rows on later pages,
-        # which reliably hits Supabase's statement timeout for long date windows
-        # (ML warmup = 5 years → ~2 500 rows per ticker → 5+ pages multi-ticker).
-        page_size = _SUPABASE_SELECT_PAGE_SIZE
-        for ticker in tickers:
-            offset = 0
-            while True:
-                result = self._execute_with_retry(
-                    lambda: (
-                        self.client.table("prices")
-                        .select("ticker,date,adj_close")
-                        .eq("ticker", ticker)
-                        .gte("date", start_date)
-                        .lte("date", end_date)
-                        .order("date")
-                        .range(offset, offset + page_size - 1)
-                        .execute()
-                    ),
-                    context=(
-                        f"fetch_prices_frame ticker={ticker} "
-                        f"range={start_date}..{end_date} offset={offset}"
-                    ),
+        # Set by concurrent workers whose parent pre-loaded the batch's prices.
+        shared = getattr(self, "shared_prices", None)
+        if shared is not None:
+            frame = shared.frame(tickers, start_date, end_date)
+            if frame is not None:
+                return frame
+
+        raw = self.fetch_unfilled_prices_frame(tickers, start_date, end_date)
+        return raw.ffill().dropna(how="all")
+
+    def fetch_unfilled_prices_frame(
+        self, tickers: list[str], start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        """Wide adj_close frame before forward-fill: NaN where a ticker has no row on a date."""
+        if not tickers:
+            return pd.DataFrame()
+
+        if price_cache._PRICE_CACHE_DIR:
+            tokens = self._price_cache_tokens(tickers)
+            if tokens is not None:
+                return self._fetch_prices_frame_cached(
+                    PriceCache(price_cache._PRICE_CACHE_DIR), tokens, start_date, end_date
                 )
-                chunk = result.data or []
-                if not chunk:
-                    break
-                rows.extend(chunk)
-                if len(chunk) < page_size:
-                    break
-                offset += page_size
+
+        if price_matrix._PRICE_MATRIX_RPC:
+            matrix = self.fetch_price_matrix(tickers, start_date, end_date)
+            if matrix is not None:
+                return matrix
+
+        rows: list[dict[str, Any]] = []
+        for ticker_rows in _map_tickers(
+            lambda ticker: self._fetch_ticker_price_rows(ticker, start_date, end_date), tickers
+        ):
+            rows.extend(ticker_rows)
 
         if not rows:
             return pd.DataFrame()
@@ -55,4 +93,139 @@ class PricesRepositoryMixin:
         frame = pd.DataFrame(rows)
         frame["date"] = pd.to_datetime(frame["date"], utc=False)
         pivot = frame.pivot(index="date", columns="ticker", values="adj_close")
-        return pivot.sort_index().ffill().dropna(how="all")
+        return pivot.sort_index()
+
+    def fetch_price_matrix(
+        self, tickers: list[str], start_date: str, end_date: str
+    ) -> pd.DataFrame | None:
+        """Load the unfilled wide adj_close frame in one ``get_price_matrix`` round trip.
+
+        Returns None when the RPC is not deployed (remembered for the process) or fails, so
+        the caller can fall back to per-ticker row queries.
+        """
+        if getattr(self, "_price_matrix_available", None) is False:
+            return None
+        params = {"p_tickers": list(tickers), "p_start": start_date, "p_end": end_date}
+        try:
+            result = self._execute_with_retry(
+                lambda: self.client.rpc(_PRICE_MATRIX_FUNCTION, params).execute(),
+                context=f"{_PRICE_MATRIX_FUNCTION} tickers={len(tickers)} "
+                f"range={start_date}..{end_date}",
+            )
+            frame = _decode_price_matrix(result.data or {})
+        except Exception as exc:
+            if _is_missing_price_matrix_error(exc):
+                print(f"[supabase_io] {_PRICE_MATRIX_FUNCTION} unavailable; using row queries")
+                self._price_matrix_available = False
+            else:
+                print(f"[supabase_io] {_PRICE_MATRIX_FUNCTION} warning, using row queries: {exc}")
+            return None
+        self._price_matrix_available = True
+        return frame
+
+    def _fetch_ticker_price_rows(
+        self, ticker: str, start_date: str, end_date: str
+    ) -> list[dict[str, Any]]:
+        # Query one ticker per request so every page is a tight single-column
+        # index seek on idx_prices_ticker_date (keyset on date, no OFFSET).  The
+        # multi-ticker IN(…)+ORDER BY approach requires Postgres to merge N
+        # sorted streams and skip potentially 10 000–20 000 rows on later pages,
+        # which reliably hits Supabase's statement timeout for long date windows
+        # (ML warmup = 5 years → ~2 500 rows per ticker → 5+ pages multi-ticker).
+        return self._select_keyset(
+            lambda: (
+                self.client.table("prices")
+                .select("ticker,date,adj_close")
+                .eq("ticker", ticker)
+                .gte("date", start_date)
+                .lte("date", end_date)
+            ),
+            key="date",
+            context=f"fetch_prices_frame ticker={ticker} range={start_date}..{end_date}",
+        )
+
+    def _price_cache_tokens(self, tickers: list[str]) -> dict[str, str] | None:
+        """Validity token per ticker: data cutoff plus the ticker's last ingest stats.
+
+        Returns None when the DB state cannot be read, in which case the cache is bypassed.
+        """
+        try:
+            state = (
+                self.client.table("data_state")
+                .select("data_cutoff_date")
+                .eq("id", _DATA_STATE_ID)
+                .execute()
+            )
+            state_rows = state.data or []
+            cutoff = str(state_rows[0].get("data_cutoff_date")) if state_rows else ""
+            stats = (
+                self.client.table("ticker_stats")
+                .select("symbol,last_date,row_count,updated_at")
+                .in_("symbol", list(tickers))
+                .execute()
+            )
+        except Exception as exc:
+            print(f"[price_cache] warning: bypassing cache, could not read data state: {exc}")
+            return None
+        stats_by_symbol = {row.get("symbol"): row for row in stats.data or []}
+        tokens: dict[str, str] = {}
+        for ticker in tickers:
+            row = stats_by_symbol.get(ticker) or {}
+            stamp = [str(row.get(key, "")) for key in ("last_date", "row_count", "updated_at")]
+            tokens[ticker] = "|".join([cutoff, *stamp])
+        return tokens
+
+    def _fetch_prices_frame_cached(
+        self,
+        cache: PriceCache,
+        tokens: dict[str, str],
+        start_date: str,
+        end_date: str,
+    ) -> pd.DataFrame:
+        tickers = list(tokens)
+        arrays = _map_tickers(
+            lambda ticker: self._load_cached_ticker(
+                cache, ticker, tokens[ticker], start_date, end_date
+            ),
+            tickers,
+        )
+        cache.prune()
+        return _price_frame_from_arrays(dict(zip(tickers, arrays)))
+
+    def _load_cached_ticker(
+        self,
+        cache: PriceCache,
+        ticker: str,
+        token: str,
+        start_date: str,
+        end_date: str,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        entry = cache.load(ticker)
+        if entry is None or entry.token != token:
+            dates, values = _rows_to_arrays(
+                self._fetch_ticker_price_rows(ticker, start_date, end_date)
+            )
+            entry = CachedPrices(dates, values, start_date, end_date, token)
+            cache.store(ticker, entry)
+        elif start_date < entry.start or end_date > entry.end:
+            # Only the dates outside the cached window are fetched.
+            parts = [(entry.dates, entry.adj_close)]
+            if start_date < entry.start:
+                parts.insert(
+                    0,
+                    _rows_to_arrays(
+                        self._fetch_ticker_price_rows(ticker, start_date, _day_before(entry.start))
+                    ),
+                )
+            if end_date > entry.end:
+                parts.append(
+                    _rows_to_arrays(
+                        self._fetch_ticker_price_rows(ticker, _day_after(entry.end), end_date)
+                    )
+                )
+            dates, values = _merge_price_arrays(*parts)
+            entry = CachedPrices(
+                dates, values, min(start_date, entry.start), max(end_date, entry.end), token
+            )
+            cache.store(ticker, entry)
+        return entry.between(start_date, end_date)
@@ -1,10 +1,60 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 
+import numpy as np
+
+from ..equity_columns import EquityColumns
 from .client import Job
 
+# Result-table writes save_success issues at once (equity curve, metrics, features,
+# predictions, metadata, positions).  Each keeps its own _execute_with_retry loop;
+# 1 restores strictly sequential writes.
+_PERSIST_WRITE_CONCURRENCY: int = int(os.getenv("PERSIST_WRITE_CONCURRENCY", "4"))
+# How long an interrupted save_success waits for writes already in flight to finish.
+_PERSIST_WRITE_DRAIN_SECONDS: float = float(os.getenv("PERSIST_WRITE_DRAIN_SECONDS", "30"))
+
+
+def _run_writes(writes: list[Callable[[], None]]) -> None:
+    """Run independent table writes on a bounded pool; re-raise the first failure in order.
+
+    A failed write lets the others finish, so no write is still in flight when the caller
+    records the failure.  An interrupt while waiting (the persist SIGALRM) cancels the
+    writes not yet started and waits up to ``_PERSIST_WRITE_DRAIN_SECONDS`` for the running
+    ones before propagating.  Threads cannot be cancelled: a write still running after
+    that keeps going and may land after ``save_failure`` marks the run failed, or overlap
+    a retried ``save_success``.  With ``PERSIST_WRITE_CONCURRENCY=1`` the writes run in
+    the calling thread, where the persist timeout interrupts them directly.
+    """
+    workers = max(1, min(_PERSIST_WRITE_CONCURRENCY, len(writes)))
+    if workers == 1:
+        for write in writes:
+            write()
+        return
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="persist-write")
+    futures: list[Future[None]] = []
+    try:
+        for write in writes:
+            futures.append(executor.submit(write))
+        wait(futures)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        _, running = wait(futures, timeout=_PERSIST_WRITE_DRAIN_SECONDS)
+        if running:
+            print(
+                f"[supabase_io] warning: {len(running)} result write(s) still running after "
+                f"an interrupted persist; they may finish after the failure is recorded"
+            )
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    for future in futures:
+        future.result()
+
 
 class ReportsRepositoryMixin:
     def save_success(
@@ -12,24 +62,34 @@ class ReportsRepositoryMixin:
         job: Job,
         duration_seconds: int,
         metrics: dict[str, float],
-        equity_rows: Iterable[dict[str, Any]],
+        equity_rows: EquityColumns | Iterable[dict[str, Any]],
         feature_rows: list[dict[str, Any]] | None = None,
         prediction_rows: list[dict[str, Any]] | None = None,
         model_metadata: dict[str, Any] | None = None,
         position_rows: list[dict[str, Any]] | None = None,
     ) -> None:
         assert job.run_id is not None, "save_success requires a run_id"
-        rows = list(equity_rows)
-        self._replace_equity_curve(job.run_id, rows)
-        self._upsert_metrics(job.run_id, metrics)
+        run_id = job.run_id
+        curve = (
+            equity_rows
+            if isinstance(equity_rows, EquityColumns)
+            else EquityColumns.from_rows(equity_rows)
+        )
+        # The result tables are independent of each other; only the runs/jobs status
+        # flips below must wait until every one of them is written.
+        writes: list[Callable[[], None]] = [
+            lambda: self._replace_equity_curve(run_id, curve),
+            lambda: self._upsert_metrics(run_id, metrics),
+        ]
         if feature_rows:
-            self._upsert_features_monthly(feature_rows)
+            writes.append(lambda: self._upsert_features_monthly(feature_rows))
         if prediction_rows is not None:
-            self._replace_model_predictions(job.run_id, prediction_rows)
+            writes.append(lambda: self._replace_model_predictions(run_id, prediction_rows))
         if model_metadata is not None:
-            self._replace_model_metadata(job.run_id, model_metadata)
+            writes.append(lambda: self._replace_model_metadata(run_id, model_metadata))
         if position_rows is not None:
-            self._replace_positions(job.run_id, position_rows)
+            writes.append(lambda: self._replace_positions(run_id, position_rows))
+        _run_writes(writes)
 
         # Mark run completed FIRST — this is the UI-visible status badge.
         # Doing this before the job row means that if the job update fails on a
@@ -37,10 +97,11 @@ class ReportsRepositoryMixin:
         # Both writes are idempotent (same value on retry), so re-running
         # save_success() after a partial failure is safe.
         runs_update: dict[str, Any] = {"status": "completed"}
-        if rows:
-            dates = [row["date"] for row in rows]
-            runs_update["executed_start_date"] = min(dates)
-            runs_update["executed_end_date"] = max(dates)
+        if len(curve):
+            span = curve.dates[[curve.dates.argmin(), curve.dates.argmax()]]
+            runs_update["executed_start_date"], runs_update["executed_end_date"] = (
+                np.datetime_as_string(span, unit="D").tolist()
+            )
         self._execute_with_retry(
             lambda: self.client.table("runs").update(runs_update).eq("id", job.run_id).execute(),
             context=f"finalize_run_success run_id={job.run_id}",
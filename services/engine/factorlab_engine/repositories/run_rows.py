@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from ..equity_columns import EquityColumns
+
+# Replace equity_curve / model_predictions / positions through the replace_<table> RPCs
+# (migration 20261018010000_replace_run_rows.sql); 0 keeps the chunked PostgREST inserts.
+_RUN_ROWS_RPC: bool = os.getenv("RUN_ROWS_RPC", "1").lower() in ("1", "true", "yes")
+# Rows per RPC call.  Larger row sets (e.g. the predictions of a long large-universe ML
+# run) are split into one replacing call and appending calls of at most this many rows, so
+# no single statement risks the PostgREST request or statement timeout; 0 sends one call.
+_RUN_ROWS_RPC_MAX_ROWS: int = int(os.getenv("RUN_ROWS_RPC_MAX_ROWS", "20000"))
+
+# Columns each replace_<table> function reads, and which of them are dictionary-encoded.
+_RUN_ROWS_COLUMNS: dict[str, tuple[tuple[str, ...], frozenset[str]]] = {
+    # Equity dates are unique per run, so a dictionary would not shrink them.
+    "equity_curve": (("date", "portfolio", "benchmark"), frozenset()),
+    "model_predictions": (
+        (
+            "model_name",
+            "as_of_date",
+            "target_date",
+            "ticker",
+            "predicted_return",
+            "realized_return",
+            "rank",
+            "selected",
+            "weight",
+        ),
+        frozenset({"model_name", "as_of_date", "target_date", "ticker"}),
+    ),
+    "positions": (("date", "symbol", "weight"), frozenset({"date", "symbol"})),
+}
+
+
+def _run_rows_function(table: str) -> str:
+    return f"replace_{table}"
+
+
+def _is_missing_run_rows_error(exc: Exception | str, table: str) -> bool:
+    message = str(exc).lower()
+    return _run_rows_function(table) in message and (
+        "could not find" in message or "does not exist" in message or "pgrst202" in message
+    )
+
+
+def _dictionary_column(values: list[Any]) -> dict[str, list[Any]]:
+    codes_by_value: dict[Any, int] = {}
+    codes = [codes_by_value.setdefault(value, len(codes_by_value)) for value in values]
+    return {"dict": list(codes_by_value), "codes": codes}
+
+
+def _encode_run_rows(
+    table: str, run_id: str, rows: EquityColumns | list[dict[str, Any]]
+) -> dict[str, Any] | None:
+    """Pack one run's rows into the columnar ``p_payload`` of ``replace_<table>``.
+
+    Each column becomes one JSON array; dates, tickers and model names repeat heavily, so
+    they are sent once in a ``dict`` with per-row ``codes``.  ``run_id`` travels as its own
+    parameter, and an ``EquityColumns`` curve is packed straight from its arrays.  Returns
+    None when a row does not carry exactly the function's columns (column defaults only
+    apply to the chunked inserts) or names another run, so the caller keeps the chunked
+    inserts for it.
+    """
+    if isinstance(rows, EquityColumns):
+        return {"rows": len(rows), "columns": rows.to_columns()}
+    columns, dictionary = _RUN_ROWS_COLUMNS[table]
+    expected = set(columns)
+    for row in rows:
+        if row.keys() - {"run_id"} != expected or row.get("run_id", run_id) != run_id:
+            return None
+    packed: dict[str, Any] = {}
+    for column in columns:
+        values = [row[column] for row in rows]
+        packed[column] = _dictionary_column(values) if column in dictionary else values
+    return {"rows": len(rows), "columns": packed}
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .price_cache import _ROW_DATE_UNIT
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Map an existing segment without registering it with the resource tracker.
+
+    The creator tracks and unlinks the segment.  Before Python 3.13 attaching registers it
+    again, so the tracker reports it as leaked (and unlinks it) when the attacher exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+@dataclass(frozen=True)
+class SharedPriceFrameSpec:
+    """Picklable descriptor of a price matrix published in shared memory.
+
+    ``tickers`` are the matrix columns (tickers that had rows); ``requested`` also holds
+    the tickers that were asked for but had none, so their absence is served faithfully.
+    """
+
+    name: str
+    n_dates: int
+    tickers: tuple[str, ...]
+    requested: frozenset[str]
+    start: str
+    end: str
+
+
+class SharedPriceFrame:
+    """Unfilled wide adj_close matrix in one shared-memory segment.
+
+    Layout: ``n_dates`` int64 timestamps followed by a row-major ``n_dates x len(tickers)``
+    float64 matrix with NaN where a ticker has no row.  The parent ``create``s and
+    ``unlink``s it; worker processes ``attach``, read read-only views and ``close`` the
+    mapping when their job is done.  Frames returned by ``frame`` may point into the
+    mapping, so they must be copied or released before ``close``.
+    """
+
+    def __init__(self, spec: SharedPriceFrameSpec, shm: shared_memory.SharedMemory) -> None:
+        self.spec = spec
+        self._shm = shm
+        n_dates, n_tickers = spec.n_dates, len(spec.tickers)
+        self.dates = np.ndarray((n_dates,), dtype=np.int64, buffer=shm.buf).view(
+            f"datetime64[{_ROW_DATE_UNIT}]"
+        )
+        self.matrix = np.ndarray(
+            (n_dates, n_tickers), dtype=np.float64, buffer=shm.buf, offset=n_dates * 8
+        )
+        # Every process maps the same pages; an in-place write would leak across runs.
+        self.dates.flags.writeable = False
+        self.matrix.flags.writeable = False
+
+    @classmethod
+    def create(
+        cls, frame: pd.DataFrame, requested: list[str], start: str, end: str
+    ) -> SharedPriceFrame | None:
+        """Copy an unfilled price frame into a new segment; None when there is nothing to share."""
+        if frame.empty:
+            return None
+        frame = frame.sort_index().sort_index(axis=1)
+        n_dates, n_tickers = frame.shape
+        shm = shared_memory.SharedMemory(create=True, size=n_dates * (n_tickers + 1) * 8)
+        dates = frame.index.to_numpy().astype(f"datetime64[{_ROW_DATE_UNIT}]").view(np.int64)
+        np.ndarray((n_dates,), dtype=np.int64, buffer=shm.buf)[:] = dates
+        np.ndarray((n_dates, n_tickers), dtype=np.float64, buffer=shm.buf, offset=n_dates * 8)[
+            :
+        ] = frame.to_numpy(dtype=np.float64)
+        spec = SharedPriceFrameSpec(
+            name=shm.name,
+            n_dates=n_dates,
+            tickers=tuple(str(col) for col in frame.columns),
+            requested=frozenset(requested),
+            start=start,
+            end=end,
+        )
+        return cls(spec, shm)
+
+    @classmethod
+    def attach(cls, spec: SharedPriceFrameSpec) -> SharedPriceFrame:
+        return cls(spec, _attach_untracked(spec.name))
+
+    def covers(self, tickers: list[str], start_date: str, end_date: str) -> bool:
+        return (
+            set(tickers) <= self.spec.requested
+            and self.spec.start <= start_date
+            and end_date <= self.spec.end
+        )
+
+    def frame(self, tickers: list[str], start_date: str, end_date: str) -> pd.DataFrame | None:
+        """Return what ``fetch_prices_frame`` would, or None when the request is not covered.
+
+        When the request spans every shared column and has no gaps to forward-fill, the
+        result is a zero-copy view of the shared matrix.
+        """
+        if not self.covers(tickers, start_date, end_date):
+            return None
+        wanted = set(tickers)
+        cols = [i for i, ticker in enumerate(self.spec.tickers) if ticker in wanted]
+        lo, hi = np.searchsorted(
+            self.dates, [np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1]
+        )
+        if not cols or lo >= hi:
+            return pd.DataFrame()
+
+        block = self.matrix[lo:hi]
+        if len(cols) < len(self.spec.tickers):
+            block = block[:, cols]
+        present = ~np.isnan(block)
+        # A fresh load has no column for a ticker without rows inside this window.
+        traded = present.any(axis=0)
+        if not traded.all():
+            block, present = block[:, traded], present[:, traded]
+            cols = [col for col, keep in zip(cols, traded) if keep]
+            if not cols:
+                return pd.DataFrame()
+        index = pd.DatetimeIndex(self.dates[lo:hi], name="date")
+        columns = pd.Index([self.spec.tickers[i] for i in cols], name="ticker")
+        frame = pd.DataFrame(block, index=index, columns=columns, copy=False)
+        if present.all():
+            return frame
+        # Dates on which none of the requested tickers traded do not exist in a fresh load.
+        frame = frame.loc[present.any(axis=1)]
+        return frame.ffill().dropna(how="all")
+
+    def close(self) -> bool:
+        """Unmap an attached segment; False if a served frame still views the mapping.
+
+        The mapping then stays alive only as long as that frame does.
+        """
+        del self.dates, self.matrix
+        try:
+            self._shm.close()
+        except BufferError:
+            return False
+        return True
+
+    def unlink(self) -> None:
+        """Unmap and remove the segment; only for the creator, after its workers are done."""
+        del self.dates, self.matrix
+        try:
+            self._shm.close()
+        finally:
+            self._shm.unlink()
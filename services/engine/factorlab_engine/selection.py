@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def top_n_mask(
+    values: np.ndarray,
+    top_n: int,
+    *,
+    descending: bool,
+    eligible: np.ndarray | None = None,
+) -> np.ndarray:
+    """Mark the best ``top_n`` eligible entries of every row of a 1-D or 2-D array.
+
+    Uses ``np.argpartition`` to find each row's cutoff value, so a row costs O(columns)
+    instead of a full sort.  Ties at the cutoff go to the lowest column positions, the
+    order a stable sort leaves tied labels in; pass columns in ticker order to break ties
+    by ticker.  NaN values are never selected.
+    """
+    values = np.asarray(values, dtype=float)
+    rows = np.atleast_2d(values)
+    usable = ~np.isnan(rows)
+    if eligible is not None:
+        usable &= np.atleast_2d(eligible)
+    n_cols = rows.shape[1]
+    top_n = min(max(int(top_n), 0), n_cols)
+    if top_n == 0 or rows.size == 0:
+        return np.zeros(values.shape, dtype=bool)
+
+    # Unusable entries sort after every usable one, including usable +inf keys.
+    keys = np.where(usable, -rows if descending else rows, np.inf)
+    cutoff = np.take_along_axis(
+        keys, np.argpartition(keys, top_n - 1, axis=1)[:, top_n - 1 : top_n], axis=1
+    )
+    selected = usable & (keys < cutoff)
+    tied = usable & (keys == cutoff)
+    open_slots = top_n - selected.sum(axis=1, keepdims=True)
+    selected |= tied & (np.cumsum(tied, axis=1) <= open_slots)
+    return selected.reshape(values.shape)
+
+
+def top_n_order(values: np.ndarray, top_n: int, *, descending: bool) -> np.ndarray:
+    """Positions of the best ``top_n`` entries of a 1-D array, best first.
+
+    Same selection and tie-break as ``top_n_mask``; only the entries up to the cutoff are
+    sorted, stably, so equal values stay in position order.
+    """
+    values = np.asarray(values, dtype=float)
+    usable = ~np.isnan(values)
+    keys = np.where(usable, -values if descending else values, np.inf)
+    top_n = min(max(int(top_n), 0), int(usable.sum()))
+    if top_n == 0:
+        return np.zeros(0, dtype=np.intp)
+    if top_n < len(keys):
+        cutoff = keys[np.argpartition(keys, top_n - 1)[top_n - 1]]
+        candidates = np.flatnonzero(usable & (keys <= cutoff))
+    else:
+        candidates = np.flatnonzero(usable)
+    return candidates[np.argsort(keys[candidates], kind="stable")][:top_n]
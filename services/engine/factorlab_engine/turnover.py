@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
 
+import numpy as np
 import pandas as pd
 
 
@@ -23,6 +24,68 @@ def one_way_turnover(
     return float(delta.abs().sum() / 2.0)
 
 
+def one_way_turnover_rows(prev_weights: np.ndarray, curr_weights: np.ndarray) -> np.ndarray:
+    """Row-wise one_way_turnover for two aligned (rows x tickers) weight matrices."""
+    prev = np.nan_to_num(np.asarray(prev_weights, dtype=float), nan=0.0)
+    curr = np.nan_to_num(np.asarray(curr_weights, dtype=float), nan=0.0)
+    return np.ascontiguousarray(np.abs(curr - prev)).sum(axis=1) / 2.0
+
+
+def _packed_row_sums(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Sum the masked entries of every row as if they had been dropped into a short Series.
+
+    Rows are grouped by how many entries they keep so each group reduces as one contiguous
+    matrix; the result is bit-identical to ``Series.dropna().sum()`` on every row.
+    """
+    counts = mask.sum(axis=1)
+    order = np.argsort(~mask, axis=1, kind="stable")
+    packed = np.take_along_axis(np.where(mask, values, 0.0), order, axis=1)
+    sums = np.zeros(values.shape[0], dtype=float)
+    for width in np.unique(counts[counts > 0]):
+        rows = counts == width
+        sums[rows] = np.ascontiguousarray(packed[rows, :width]).sum(axis=1)
+    return sums
+
+
+def drift_rebalance_weights(target_weights: np.ndarray, rebalance_prices: np.ndarray) -> np.ndarray:
+    """Pre-rebalance weights for every rebalance row of a (rebalances x tickers) schedule.
+
+    Row i is the allocation set at rebalance i-1 after buy-and-hold drift up to rebalance i,
+    using the prices observed on both rebalance dates.  Row 0 is all zeros (nothing held yet).
+    Holdings whose price growth is unknown (missing or non-positive prices) are dropped and the
+    remainder renormalized; rows with no usable drift fall back to the previous target weights.
+    """
+    weights = np.asarray(target_weights, dtype=float)
+    prices = np.asarray(rebalance_prices, dtype=float)
+    prev = np.zeros_like(weights)
+    prev[1:] = weights[:-1]
+    if weights.shape[0] < 2:
+        return prev
+
+    prev_prices = np.full_like(prices, np.nan)
+    prev_prices[1:] = prices[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = prices / np.where(prev_prices > 0, prev_prices, np.nan)
+        drifted = prev * growth
+        kept = (prev > 0) & ~np.isnan(drifted)
+        totals = _packed_row_sums(drifted, kept)
+        use_drift = (np.ascontiguousarray(prev).sum(axis=1) > 0) & (totals > 0)
+        normalized = np.where(kept, drifted / totals[:, None], 0.0)
+    return np.where(use_drift[:, None], normalized, prev)
+
+
+def rebalance_turnover_batch(
+    target_weights: np.ndarray, rebalance_prices: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Drifted pre-rebalance weights and one-way turnover for every rebalance in one pass.
+
+    Equivalent to calling one_way_turnover(drifted_prev, target) once per rebalance, where the
+    first rebalance is measured against an all-cash portfolio.
+    """
+    drifted = drift_rebalance_weights(target_weights, rebalance_prices)
+    return drifted, one_way_turnover_rows(drifted, target_weights)
+
+
 def annualize_turnover(
     rebalance_turnover: pd.Series,
     *,
@@ -39,28 +102,52 @@ def annualize_turnover(
     return float(clean.mean() * periods_per_year) if len(clean) > 0 else 0.0
 
 
+def turnover_series_from_position_columns(
+    dates: Sequence[Any] | np.ndarray,
+    symbols: Sequence[Any] | np.ndarray,
+    weights: Sequence[Any] | np.ndarray,
+) -> pd.Series:
+    """Columnar turnover_series_from_position_rows: one entry per (date, symbol, weight).
+
+    Each distinct date is one rebalance holding the listed weights; the first rebalance is
+    measured against an all-cash portfolio.  Later entries win for duplicate (date, symbol).
+    """
+    date_keys = np.asarray(dates).astype(str)
+    symbol_keys = np.asarray(symbols).astype(str)
+    weight_values = np.nan_to_num(np.asarray(weights, dtype=float), nan=0.0)
+    keep = (np.char.str_len(date_keys) > 0) & (np.char.str_len(symbol_keys) > 0)
+    if not keep.any():
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    date_keys, symbol_keys, weight_values = (
+        date_keys[keep],
+        symbol_keys[keep],
+        weight_values[keep],
+    )
+
+    unique_dates, date_codes = np.unique(date_keys, return_inverse=True)
+    _, symbol_codes = np.unique(symbol_keys, return_inverse=True)
+    n_symbols = int(symbol_codes.max()) + 1
+    flat = date_codes * n_symbols + symbol_codes
+    # np.unique keeps the first occurrence; search the reversed keys so the last write wins.
+    _, last_from_end = np.unique(flat[::-1], return_index=True)
+    last = len(flat) - 1 - last_from_end
+
+    matrix = np.zeros((len(unique_dates), n_symbols), dtype=float)
+    matrix.flat[flat[last]] = weight_values[last]
+    prev = np.zeros_like(matrix)
+    prev[1:] = matrix[:-1]
+    return pd.Series(one_way_turnover_rows(prev, matrix), index=pd.to_datetime(unique_dates))
+
+
 def turnover_series_from_position_rows(position_rows: list[dict[str, Any]]) -> pd.Series:
     if not position_rows:
-        return pd.Series(dtype=float)
-
-    grouped: dict[str, dict[str, float]] = {}
-    for row in position_rows:
-        date = str(row.get("date", ""))
-        symbol = str(row.get("symbol", ""))
-        if not date or not symbol:
-            continue
-        grouped.setdefault(date, {})[symbol] = float(row.get("weight") or 0.0)
-
-    dates = sorted(grouped)
-    prev_weights = pd.Series(dtype=float)
-    turnovers: list[float] = []
-
-    for date in dates:
-        curr_weights = pd.Series(grouped[date], dtype=float)
-        turnovers.append(one_way_turnover(prev_weights, curr_weights))
-        prev_weights = curr_weights
-
-    return pd.Series(turnovers, index=pd.to_datetime(dates))
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+
+    return turnover_series_from_position_columns(
+        [str(row.get("date", "")) for row in position_rows],
+        [str(row.get("symbol", "")) for row in position_rows],
+        [float(row.get("weight") or 0.0) for row in position_rows],
+    )
 
 
 def annualize_turnover_from_position_rows(
@@ -10,10 +10,15 @@ from .worker import execution as _execution
 from .worker import http_server as _http_server
 from .worker import ingest_legacy as _ingest_legacy
 from .worker import ingest_repair as _ingest_repair
+from .worker import ml_execution as _ml_execution
+from .worker import pool as _pool
+from .worker import price_sharing as _price_sharing
 from .worker import pricing as _pricing
 from .worker import progress as _progress
+from .worker import rebalance as _rebalance
 from .worker import settings as _settings
 from .worker import strategies as _strategies
+from .worker import sweep as _sweep
 
 for _module in (
     _claiming,
@@ -21,10 +26,15 @@ for _module in (
     _http_server,
     _ingest_legacy,
     _ingest_repair,
+    _ml_execution,
+    _pool,
+    _price_sharing,
     _pricing,
     _progress,
+    _rebalance,
     _settings,
     _strategies,
+    _sweep,
 ):
     for _name in dir(_module):
         if _name.startswith("__"):
@@ -42,6 +52,11 @@ def _build_baseline_result(*args, **kwargs):
     return _execution._build_baseline_result(*args, **kwargs)
 
 
+def _build_baseline_sweep(*args, **kwargs):
+    _sync_compat_patches()
+    return _sweep._build_baseline_sweep(*args, **kwargs)
+
+
 def _build_ml_result(*args, **kwargs):
     _sync_compat_patches()
     return _execution._build_ml_result(*args, **kwargs)
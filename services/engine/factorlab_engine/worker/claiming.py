@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import multiprocessing
 import os
 import platform
@@ -8,35 +9,49 @@ import time
 import traceback
 from collections.abc import Callable, Iterable
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from typing import Any
 
 import pandas as pd
 
+from factorlab_engine.repositories.client import _RUN_JOB_TYPES
+from factorlab_engine.repositories.shared_prices import SharedPriceFrameSpec
 from factorlab_engine.supabase_io import Job, SupabaseIO
 
 from .execution import _run_backtest
 from .http_server import _start_trigger_server, _wakeup
 from .ingest_legacy import _process_data_ingest_job
 from .ingest_repair import _process_data_ingest_job_v2
+from .ml_execution import _build_ml_batch_results, _group_ml_backtest_jobs
+from .pool import _BacktestWorkerPool, _finish_worker_job, _worker_io, _WorkerReport
+from .price_sharing import _attach_shared_prices, _release_shared_prices, _share_batch_prices
 from .progress import _build_run_metadata, _Heartbeat, _validate_backtest_result
 from .settings import (
     _PERSIST_TIMEOUT_SECONDS,
+    _SHARED_PRICE_FRAMES,
     MIN_SPAN_DAYS,
+    BacktestResult,
     _job_timeout_seconds_for_strategy,
     _utcnow,
     resolve_and_snapshot_universe_symbols,
 )
+from .sweep import _run_baseline_sweep, _sweep_timeout_seconds
 
 _MAX_BACKTEST_CONCURRENCY = 8
 
 
+class _JobTimeout(RuntimeError):
+    """Raised by the SIGALRM handler when a job's compute or persist budget runs out."""
+
+
 def _install_job_timeout(seconds: int) -> None:
     """Install a SIGALRM-based wall-clock timeout for the current process (POSIX only)."""
     if platform.system() == "Windows":
         return
 
     def _handler(signum: int, frame: object) -> None:
-        raise RuntimeError(
+        raise _JobTimeout(
             f"Job exceeded maximum runtime of {seconds}s ({seconds // 60} min). "
             "The backtest or model training took too long and was aborted. "
             "Try a shorter date range or a lighter-weight strategy."
@@ -56,7 +71,13 @@ def _cancel_job_timeout() -> None:
 def _process_job(io: SupabaseIO, job: Job) -> None:
     if not io.claim_job(job):
         return
+    _run_claimed_job(io, job)
 
+
+def _run_claimed_job(
+    io: SupabaseIO, job: Job, *, precomputed: BacktestResult | None = None
+) -> None:
+    """Run and persist a claimed job; ``precomputed`` replaces the backtest computation."""
     if job.job_type == "data_ingest":
         _process_data_ingest_job(io, job)
         # Chain to backtest if this was the last preflight ingest job for a waiting run
@@ -67,7 +88,11 @@ def _process_job(io: SupabaseIO, job: Job) -> None:
     run = io.fetch_run(job.run_id)  # type: ignore[arg-type]
     if run is None:
         raise RuntimeError(f"Run not found for run_id={job.run_id}")
-    job_timeout_seconds = _job_timeout_seconds_for_strategy(str(run.get("strategy_id", "")))
+    if job.job_type == "baseline_sweep":
+        # A sweep evaluates its whole grid, so it gets one backtest budget per group.
+        job_timeout_seconds = _sweep_timeout_seconds(run, job.payload)
+    else:
+        job_timeout_seconds = _job_timeout_seconds_for_strategy(str(run.get("strategy_id", "")))
     print(
         f"[engine] phase=start job={job.id} run={job.run_id} "
         f"compute_budget={job_timeout_seconds}s persist_budget={_PERSIST_TIMEOUT_SECONDS}s"
@@ -101,7 +126,13 @@ def _process_job(io: SupabaseIO, job: Job) -> None:
             def progress_cb(stage: str, pct: int) -> None:
                 io.update_job_progress(job.id, stage=stage, progress=pct)
 
-            result = _run_backtest(io, run, progress_cb)
+            sweep_summary: dict[str, Any] | None = None
+            if job.job_type == "baseline_sweep":
+                result, sweep_summary = _run_baseline_sweep(io, run, job.payload, progress_cb)
+            elif precomputed is not None:
+                result = precomputed
+            else:
+                result = _run_backtest(io, run, progress_cb)
 
             assert job.run_id is not None
 
@@ -109,7 +140,10 @@ def _process_job(io: SupabaseIO, job: Job) -> None:
             _validate_backtest_result(result, job.run_id)
 
             progress_cb("persist", 82)
-            io.update_run_metadata(job.run_id, _build_run_metadata(run, result))
+            run_metadata = _build_run_metadata(run, result)
+            if sweep_summary is not None:
+                run_metadata["sweep"] = sweep_summary
+            io.update_run_metadata(job.run_id, run_metadata)
             progress_cb("persist", 88)
 
             # Computation is done. Cancel the compute SIGALRM and install a separate
@@ -128,7 +162,7 @@ def _process_job(io: SupabaseIO, job: Job) -> None:
                 job=job,
                 duration_seconds=duration,
                 metrics=result.metrics,
-                equity_rows=({"run_id": job.run_id, **row} for row in result.equity_rows),
+                equity_rows=result.equity_rows,
                 feature_rows=result.feature_rows,
                 prediction_rows=result.prediction_rows,
                 model_metadata=result.model_metadata,
@@ -139,14 +173,100 @@ def _process_job(io: SupabaseIO, job: Job) -> None:
             print(f"[engine] phase=completed job={job.id} in {duration}s")
     except Exception as exc:
         _cancel_job_timeout()
-        duration = int((_utcnow() - started).total_seconds())
-        err_str = str(exc)
-        # Print first — so the error is always visible in logs even if the DB write fails.
-        print(f"[engine] phase=failed job={job.id} in {duration}s: {err_str}")
-        try:
-            io.save_failure(job, duration, err_str)
-        except Exception as save_exc:
-            print(f"[engine] CRITICAL: could not persist failure for job={job.id}: {save_exc}")
+        _record_job_failure(io, job, started, exc)
+
+
+def _record_job_failure(io: SupabaseIO, job: Job, started: datetime, exc: Exception) -> None:
+    duration = int((_utcnow() - started).total_seconds())
+    err_str = str(exc)
+    # Print first — so the error is always visible in logs even if the DB write fails.
+    print(f"[engine] phase=failed job={job.id} in {duration}s: {err_str}")
+    try:
+        io.save_failure(job, duration, err_str)
+    except Exception as save_exc:
+        print(f"[engine] CRITICAL: could not persist failure for job={job.id}: {save_exc}")
+
+
+def _compute_ml_job_batch(io: SupabaseIO, jobs: list[Job]) -> dict[str, BacktestResult]:
+    """Batched results by run id, or ``{}`` when the batch fails and jobs must run alone.
+
+    A batch that runs out of its compute budget raises ``_JobTimeout`` instead: its jobs
+    would each need about as long again on their own.
+    """
+    try:
+        runs = []
+        for job in jobs:
+            run = io.fetch_run(job.run_id)  # type: ignore[arg-type]
+            if run is None:
+                raise RuntimeError(f"Run not found for run_id={job.run_id}")
+            resolve_and_snapshot_universe_symbols(io, run)
+            runs.append(run)
+    except Exception as exc:
+        print(f"[engine] warning: ml batch setup failed, running jobs one by one: {exc}")
+        return {}
+
+    def beat() -> None:
+        for job in jobs:
+            io.heartbeat_job(job.id)
+
+    def progress_cb(stage: str, pct: int) -> None:
+        for job in jobs:
+            io.update_job_progress(job.id, stage=stage, progress=pct)
+
+    budget = sum(_job_timeout_seconds_for_strategy(str(run["strategy_id"])) for run in runs)
+    print(
+        f"[engine] phase=ml_batch_start jobs={','.join(job.id for job in jobs)} "
+        f"compute_budget={budget}s"
+    )
+    _install_job_timeout(budget)
+    try:
+        with _Heartbeat(beat, interval=10, job_id=jobs[0].id):
+            results = _build_ml_batch_results(io, runs, on_progress=progress_cb)
+    except _JobTimeout:
+        raise
+    except Exception as exc:
+        print(f"[engine] warning: ml batch failed, running jobs one by one: {exc}")
+        return {}
+    finally:
+        _cancel_job_timeout()
+    return {str(run["id"]): result for run, result in zip(runs, results)}
+
+
+def _process_ml_job_batch(io: SupabaseIO, jobs: tuple[Job, ...]) -> None:
+    """Claim compatible ML backtests, train them in one walk-forward, then finish each job.
+
+    Each job keeps its own validation, metadata, persistence and failure record.  If the
+    batch fails every claimed job is computed on its own instead, unless it timed out:
+    then every claimed job is recorded as failed with the timeout.
+    """
+    claimed = [job for job in jobs if io.claim_job(job)]
+    started = _utcnow()
+    try:
+        results = _compute_ml_job_batch(io, claimed) if len(claimed) > 1 else {}
+    except _JobTimeout as exc:
+        for job in claimed:
+            _record_job_failure(io, job, started, exc)
+        return
+
+    # Jobs persist one after another, each for up to its own timeout; the ones still
+    # waiting keep beating so the stall watchdog does not requeue finished computations.
+    waiting = list(claimed)
+
+    def beat() -> None:
+        for job in tuple(waiting):
+            io.heartbeat_job(job.id)
+
+    with _Heartbeat(beat, interval=10, job_id=claimed[0].id if claimed else ""):
+        for job in claimed:
+            waiting.remove(job)
+            _run_claimed_job(io, job, precomputed=results.get(str(job.run_id)))
+
+
+def _process_backtest_unit(io: SupabaseIO, unit: Job | tuple[Job, ...]) -> None:
+    if isinstance(unit, tuple):
+        _process_ml_job_batch(io, unit)
+    else:
+        _process_job(io, unit)
 
 
 def _resolve_backtest_concurrency() -> int:
@@ -162,55 +282,101 @@ def _partition_jobs_for_concurrency(jobs: list[Job]) -> tuple[list[Job], list[Jo
     backtest_jobs: list[Job] = []
     sequential_jobs: list[Job] = []
     for job in jobs:
-        if job.job_type == "backtest":
+        if job.job_type in _RUN_JOB_TYPES:
             backtest_jobs.append(job)
         else:
             sequential_jobs.append(job)
     return backtest_jobs, sequential_jobs
 
 
-def _process_job_with_fresh_io(job: Job) -> None:
-    _process_job(SupabaseIO(), job)
+def _process_job_in_warm_worker(
+    job: Job | tuple[Job, ...], *, shared_prices: SharedPriceFrameSpec | None = None
+) -> _WorkerReport:
+    io = _worker_io()
+    attached = _attach_shared_prices(shared_prices) if shared_prices else None
+    io.shared_prices = attached
+    try:
+        _process_backtest_unit(io, job)
+    finally:
+        io.shared_prices = None
+        if attached is not None:
+            _release_shared_prices(attached)
+    return _finish_worker_job()
 
 
 def _process_backtest_jobs_concurrently(
-    jobs: list[Job],
+    jobs: list[Job | tuple[Job, ...]],
     *,
     max_workers: int,
-    runner: Callable[[Job], Any] = _process_job_with_fresh_io,
+    runner: Callable[[Job | tuple[Job, ...]], Any] = _process_job_in_warm_worker,
     executor_cls: type[ProcessPoolExecutor] = ProcessPoolExecutor,
     as_completed_fn: Callable[[Iterable[Any]], Iterable[Any]] = as_completed,
     mp_context_factory: Callable[[str], Any] = multiprocessing.get_context,
+    shared_prices: SharedPriceFrameSpec | None = None,
+    pool: _BacktestWorkerPool | None = None,
 ) -> int:
+    """Run ``jobs`` (single jobs or ML batches) on ``pool`` or on a one-off pool."""
     if not jobs:
         return 0
-
-    worker_count = max(1, min(max_workers, len(jobs), _MAX_BACKTEST_CONCURRENCY))
-    mp_context = mp_context_factory("spawn")
+    if shared_prices is not None:
+        runner = functools.partial(runner, shared_prices=shared_prices)
+
+    one_off = pool is None
+    if pool is None:
+        pool = _BacktestWorkerPool(
+            max(1, min(max_workers, len(jobs), _MAX_BACKTEST_CONCURRENCY)),
+            executor_cls=executor_cls,
+            mp_context_factory=mp_context_factory,
+        )
     processed = 0
-    with executor_cls(max_workers=worker_count, mp_context=mp_context) as executor:
-        futures = [executor.submit(runner, job) for job in jobs]
+    try:
+        futures = [pool.executor().submit(runner, job) for job in jobs]
         for future in as_completed_fn(futures):
             try:
-                future.result()
+                pool.record(future.result())
                 processed += 1
+            except BrokenProcessPool as exc:
+                print(f"[engine] backtest worker process died: {exc}")
+                pool.mark_broken()
             except Exception as exc:
                 print(f"[engine] concurrent backtest worker failed: {exc}")
                 traceback.print_exc()
+    finally:
+        if one_off:
+            pool.shutdown()
+        else:
+            pool.end_batch()
     return processed
 
 
-def _process_backtest_jobs(io: SupabaseIO, jobs: list[Job], *, concurrency: int) -> None:
-    if concurrency <= 1 or len(jobs) <= 1:
-        for job in jobs:
-            _process_job(io, job)
+def _process_backtest_jobs(
+    io: SupabaseIO,
+    jobs: list[Job],
+    *,
+    concurrency: int,
+    pool: _BacktestWorkerPool | None = None,
+) -> None:
+    units = _group_ml_backtest_jobs(io, jobs)
+    if concurrency <= 1 or len(units) <= 1:
+        for unit in units:
+            _process_backtest_unit(io, unit)
         return
 
     print(
-        f"[engine] processing {len(jobs)} backtest job(s) "
-        f"with concurrency={min(concurrency, len(jobs), _MAX_BACKTEST_CONCURRENCY)}"
+        f"[engine] processing {len(jobs)} backtest job(s) as {len(units)} unit(s) "
+        f"with concurrency={min(concurrency, len(units), _MAX_BACKTEST_CONCURRENCY)}"
     )
-    _process_backtest_jobs_concurrently(jobs, max_workers=concurrency)
+    shared = _share_batch_prices(io, jobs) if _SHARED_PRICE_FRAMES else None
+    try:
+        _process_backtest_jobs_concurrently(
+            units,
+            max_workers=concurrency,
+            shared_prices=shared.spec if shared is not None else None,
+            pool=pool,
+        )
+    finally:
+        if shared is not None:
+            shared.unlink()
 
 
 def main() -> None:
@@ -227,52 +393,60 @@ def main() -> None:
 
     io = SupabaseIO()
     print("[engine] worker started")
-    while True:
-        try:
-            # --- Watchdog & retry scheduler (run before fetching new work) ---
-            # jobs table (backtest + legacy data_ingest jobs)
-            io.scan_and_requeue_stalled_jobs(stall_minutes=job_stall_minutes, max_attempts=5)
-            io.scan_and_requeue_queued_too_long(
-                timeout_minutes=job_queue_timeout_minutes, max_attempts=5
-            )
-            io.requeue_due_for_retry(max_attempts=5)
-            # data_ingest_jobs table (new explicit-schema ingest jobs)
-            io.scan_stalled_data_ingest_jobs(stall_minutes=2, max_attempts=5)
-            io.scan_queued_too_long_data_ingest(timeout_minutes=10, max_attempts=5)
-            io.requeue_due_data_ingest(max_attempts=5)
-
-            # Fetch from both queues and process
-            jobs = io.fetch_queued_jobs(limit=batch_size)
-            ingest_jobs = io.fetch_queued_data_ingest_jobs(limit=batch_size)
-            print(
-                f"[engine] poll queued_backtest={len(jobs)} "
-                f"queued_ingest={len(ingest_jobs)} batch_size={batch_size}"
-            )
+    # Kept warm across polls; processes are only spawned once concurrency > 1 is used.
+    pool = _BacktestWorkerPool(backtest_concurrency) if backtest_concurrency > 1 else None
+    try:
+        while True:
+            try:
+                # --- Watchdog & retry scheduler (run before fetching new work) ---
+                # jobs table (backtest + legacy data_ingest jobs)
+                io.scan_and_requeue_stalled_jobs(stall_minutes=job_stall_minutes, max_attempts=5)
+                io.scan_and_requeue_queued_too_long(
+                    timeout_minutes=job_queue_timeout_minutes, max_attempts=5
+                )
+                io.requeue_due_for_retry(max_attempts=5)
+                # data_ingest_jobs table (new explicit-schema ingest jobs)
+                io.scan_stalled_data_ingest_jobs(stall_minutes=2, max_attempts=5)
+                io.scan_queued_too_long_data_ingest(timeout_minutes=10, max_attempts=5)
+                io.requeue_due_data_ingest(max_attempts=5)
+
+                # Fetch from both queues and process
+                jobs = io.fetch_queued_jobs(limit=batch_size)
+                ingest_jobs = io.fetch_queued_data_ingest_jobs(limit=batch_size)
+                print(
+                    f"[engine] poll queued_backtest={len(jobs)} "
+                    f"queued_ingest={len(ingest_jobs)} batch_size={batch_size}"
+                )
+
+                if not jobs and not ingest_jobs:
+                    if once:
+                        print("[engine] no more queued jobs — exiting")
+                        break
+                    _wakeup.wait(timeout=poll_seconds)
+                    _wakeup.clear()
+                    continue
 
-            if not jobs and not ingest_jobs:
-                if once:
-                    print("[engine] no more queued jobs — exiting")
-                    break
-                _wakeup.wait(timeout=poll_seconds)
                 _wakeup.clear()
-                continue
-
-            _wakeup.clear()
-            backtest_jobs, sequential_jobs = _partition_jobs_for_concurrency(jobs)
-            _process_backtest_jobs(io, backtest_jobs, concurrency=backtest_concurrency)
-            for job in sequential_jobs:
-                _process_job(io, job)
-            for ingest_job in ingest_jobs:
-                if io.claim_data_ingest_job(ingest_job):
-                    _process_data_ingest_job_v2(io, ingest_job)
-        except (SystemExit, KeyboardInterrupt):
-            raise
-        except Exception as exc:
-            # An unhandled error in watchdog scans or queue fetches must not crash the
-            # long-running Render service. Log, sleep, and retry so the worker stays alive.
-            print(f"[engine] CRITICAL: main loop error, sleeping 30s before retry: {exc}")
-            traceback.print_exc()
-            time.sleep(30)
+                backtest_jobs, sequential_jobs = _partition_jobs_for_concurrency(jobs)
+                _process_backtest_jobs(
+                    io, backtest_jobs, concurrency=backtest_concurrency, pool=pool
+                )
+                for job in sequential_jobs:
+                    _process_job(io, job)
+                for ingest_job in ingest_jobs:
+                    if io.claim_data_ingest_job(ingest_job):
+                        _process_data_ingest_job_v2(io, ingest_job)
+            except (SystemExit, KeyboardInterrupt):
+                raise
+            except Exception as exc:
+                # An unhandled error in watchdog scans or queue fetches must not crash the
+                # long-running Render service. Log, sleep, and retry so the worker stays alive.
+                print(f"[engine] CRITICAL: main loop error, sleeping 30s before retry: {exc}")
+                traceback.print_exc()
+                time.sleep(30)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-import os
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
 from typing import Any
 
 import pandas as pd
 
-from factorlab_engine.ml import run_walk_forward
+from factorlab_engine.metrics import compute_metrics as _compute_metrics
+from factorlab_engine.metrics import compute_period_metrics
 from factorlab_engine.supabase_io import SupabaseIO
 
+from .ml_execution import _build_ml_result
 from .pricing import (
     _download_prices,
     _ensure_min_history,
@@ -17,13 +20,10 @@ from .pricing import (
 )
 from .progress import (
     _apply_rebalance_costs,
-    _build_price_snapshot_metadata,
-    _compute_metrics,
     _equity_rows,
-    _ml_required_snapshot_cutoff,
     _read_initial_capital,
-    _validate_ml_snapshot_prices,
 )
+from .rebalance import PositionColumns
 from .settings import (
     _TREND_DEFENSIVE,
     _TREND_DEFENSIVE_FALLBACK,
@@ -45,31 +45,63 @@ from .strategies import (
 )
 
 
-def _build_baseline_result(
+@dataclass(frozen=True)
+class _BaselineInputs:
+    """Prices and resolved tickers shared by every baseline strategy evaluated for a run."""
+
+    prices: pd.DataFrame
+    universe_tickers: list[str]
+    bench_col: str
+    defensive_ticker: str | None
+
+    def for_strategy(self, strategy_id: str, run_start: str) -> _BaselineInputs:
+        """Trim a shared warmup back to the history ``strategy_id`` alone would have loaded."""
+        warmup_start = _subtract_calendar_days(
+            run_start, _baseline_warmup_calendar_days(strategy_id)
+        )
+        keep = self.prices.index >= pd.Timestamp(warmup_start)
+        return replace(self, prices=self.prices.loc[keep])
+
+    @property
+    def universe_prices(self) -> pd.DataFrame:
+        # The full `prices` frame may contain the benchmark ticker (added so equity-curve
+        # math works) and the trend-filter defensive asset (TLT/BIL). Passing the wider
+        # frame to equal_weight / momentum / low_vol would make those strategies hold the
+        # benchmark as a portfolio asset, which is incorrect.
+        return self.prices[[c for c in self.universe_tickers if c in self.prices.columns]]
+
+
+def _baseline_price_window(
+    run: dict[str, Any], strategies: Sequence[str]
+) -> tuple[list[str], str, str]:
+    """Tickers and ``(warmup_start, run_end)`` that baseline ``strategies`` load for ``run``."""
+    tickers = list(resolve_universe_symbols(run))
+    benchmark_ticker_raw = _resolve_run_benchmark_ticker(run)
+    if benchmark_ticker_raw not in tickers:
+        tickers = [*tickers, benchmark_ticker_raw]
+    # trend_filter needs the defensive ticker in the price data
+    if "trend_filter" in strategies and _TREND_DEFENSIVE not in tickers:
+        tickers = [*tickers, _TREND_DEFENSIVE]
+
+    warmup_days = max(_baseline_warmup_calendar_days(strat) for strat in strategies)
+    warmup_start = _subtract_calendar_days(str(run["start_date"]), warmup_days)
+    return tickers, warmup_start, str(run["end_date"])
+
+
+def _load_baseline_inputs(
     io: SupabaseIO,
     run: dict[str, Any],
+    strategies: Sequence[str],
     *,
     on_progress: ProgressCallback | None = None,
-) -> BacktestResult:
+) -> _BaselineInputs:
+    """Load prices once for ``strategies``, covering the longest warmup any of them needs."""
     universe_tickers = resolve_universe_symbols(run)
-    tickers = list(universe_tickers)
     benchmark_ticker_raw = _resolve_run_benchmark_ticker(run)
-    if benchmark_ticker_raw not in tickers:
-        tickers = [*tickers, benchmark_ticker_raw]
-
-    strat = run["strategy_id"]
-    costs_bps = float(run.get("costs_bps") or 0.0)
-    top_n = int(run.get("top_n") or 5)
+    tickers, warmup_start, run_end = _baseline_price_window(run, strategies)
     run_start = str(run["start_date"])
-    run_end = str(run["end_date"])
-    warmup_start = _subtract_calendar_days(run_start, _baseline_warmup_calendar_days(strat))
-
-    # trend_filter needs the defensive ticker in the price data
-    defensive_ticker: str | None = None
-    if strat == "trend_filter":
-        defensive_ticker = _TREND_DEFENSIVE
-        if defensive_ticker not in tickers:
-            tickers = [*tickers, defensive_ticker]
+    needs_defensive = "trend_filter" in strategies
+    defensive_ticker: str | None = _TREND_DEFENSIVE if needs_defensive else None
 
     if on_progress:
         on_progress("load_data", 20)
@@ -84,11 +116,7 @@ def _build_baseline_result(
         _persist_prices_to_db(io, prices)
 
     # For trend_filter: if defensive ticker still missing, try BIL fallback
-    if (
-        strat == "trend_filter"
-        and defensive_ticker is not None
-        and defensive_ticker not in prices.columns
-    ):
+    if needs_defensive and defensive_ticker is not None and defensive_ticker not in prices.columns:
         fallback = _TREND_DEFENSIVE_FALLBACK
         tickers_fb = [t for t in tickers if t != defensive_ticker] + [fallback]
         try:
@@ -110,37 +138,56 @@ def _build_baseline_result(
             ) from exc
 
     run_window_prices = _slice_frame_to_run_window(prices, run_start, run_end)
-    _ensure_min_history(run_window_prices, context=f"run {run['id']} strategy {strat}")
-    bench_col = _select_available_benchmark_ticker(benchmark_ticker_raw, prices.columns)
+    _ensure_min_history(
+        run_window_prices, context=f"run {run['id']} strategy {', '.join(strategies)}"
+    )
+    return _BaselineInputs(
+        prices=prices,
+        universe_tickers=universe_tickers,
+        bench_col=_select_available_benchmark_ticker(benchmark_ticker_raw, prices.columns),
+        defensive_ticker=defensive_ticker,
+    )
 
-    if on_progress:
-        on_progress("compute_signals", 40)
-    # Slice prices to investable universe only. The full `prices` frame may
-    # contain the benchmark ticker (added so equity-curve math works) and the
-    # trend-filter defensive asset (TLT/BIL). Passing the wider frame to
-    # equal_weight / momentum / low_vol would make those strategies hold the
-    # benchmark as a portfolio asset, which is incorrect.
-    universe_prices = prices[[c for c in universe_tickers if c in prices.columns]]
-    rebalance_positions: list[dict[str, Any]] = []
+
+def _baseline_strategy_outputs(
+    strat: str,
+    inputs: _BaselineInputs,
+    top_n: int,
+    *,
+    signal: pd.DataFrame | None = None,
+) -> tuple[pd.Series, float, pd.Series, PositionColumns]:
+    """Dispatch one baseline strategy; ``signal`` reuses a precomputed score/vol matrix."""
+    universe_prices = inputs.universe_prices
     if strat == "equal_weight":
-        daily_rets, turnover, rebalance_turnover, rebalance_positions = _equal_weight(
-            universe_prices
-        )
-    elif strat == "momentum_12_1":
-        daily_rets, turnover, rebalance_turnover, rebalance_positions = _momentum_12_1(
-            universe_prices, top_n
-        )
-    elif strat == "low_vol":
-        daily_rets, turnover, rebalance_turnover, rebalance_positions = _low_vol(
-            universe_prices, top_n
-        )
-    elif strat == "trend_filter":
-        assert defensive_ticker is not None
-        daily_rets, turnover, rebalance_turnover, rebalance_positions = _trend_filter(
-            prices, universe_tickers, bench_col, defensive_ticker, top_n
+        return _equal_weight(universe_prices)
+    if strat == "momentum_12_1":
+        return _momentum_12_1(universe_prices, top_n, scores=signal)
+    if strat == "low_vol":
+        return _low_vol(universe_prices, top_n, vol_60=signal)
+    if strat == "trend_filter":
+        assert inputs.defensive_ticker is not None
+        return _trend_filter(
+            inputs.prices,
+            inputs.universe_tickers,
+            inputs.bench_col,
+            inputs.defensive_ticker,
+            top_n,
+            scores=signal,
         )
-    else:
-        raise ValueError(f"Unsupported baseline strategy: {strat}")
+    raise ValueError(f"Unsupported baseline strategy: {strat}")
+
+
+def _baseline_result_from_outputs(
+    run: dict[str, Any],
+    inputs: _BaselineInputs,
+    outputs: tuple[pd.Series, float, pd.Series, PositionColumns],
+    costs_bps: float,
+    *,
+    on_progress: ProgressCallback | None = None,
+) -> BacktestResult:
+    run_start = str(run["start_date"])
+    run_end = str(run["end_date"])
+    daily_rets, turnover, rebalance_turnover, rebalance_positions = outputs
 
     if on_progress:
         on_progress("rebalance", 60)
@@ -154,7 +201,7 @@ def _build_baseline_result(
         rebalance_turnover, periods_per_year=12.0, exclude_initial=False
     )
     benchmark_rets = _slice_series_to_run_window(
-        prices[bench_col].pct_change().fillna(0.0),
+        inputs.prices[inputs.bench_col].pct_change().fillna(0.0),
         run_start,
         run_end,
     )
@@ -168,116 +215,34 @@ def _build_baseline_result(
 
     if on_progress:
         on_progress("metrics", 78)
-    # Attach run_id to each position row
-    position_rows: list[dict[str, Any]] = [
-        {"run_id": run["id"], **p}
-        for p in _slice_positions_to_run_window(rebalance_positions, run_start, run_end)
-    ]
+    # Positions stay columnar until here; rows (with run_id) are built once for persistence.
+    position_rows = _slice_positions_to_run_window(rebalance_positions, run_start, run_end).to_rows(
+        run["id"]
+    )
     metrics = _compute_metrics(daily_rets, turnover)
-    return BacktestResult(equity_rows=rows, metrics=metrics, position_rows=position_rows)
+    return BacktestResult(
+        equity_rows=rows,
+        metrics=metrics,
+        position_rows=position_rows,
+        period_metrics=compute_period_metrics(daily_rets),
+    )
 
 
-def _build_ml_result(
+def _build_baseline_result(
     io: SupabaseIO,
     run: dict[str, Any],
     *,
     on_progress: ProgressCallback | None = None,
 ) -> BacktestResult:
-    tickers = resolve_universe_symbols(run)
-    requested_benchmark = _resolve_run_benchmark_ticker(run)
-    if requested_benchmark not in tickers:
-        tickers = [requested_benchmark, *tickers]
-
-    warmup_years = int(os.getenv("ML_WARMUP_YEARS", "5"))
-    warmup_start = (pd.to_datetime(run["start_date"]) - pd.DateOffset(years=warmup_years)).strftime(
-        "%Y-%m-%d"
-    )
-
-    if on_progress:
-        on_progress("load_data", 15)
-    prices = io.fetch_prices_frame(tickers, warmup_start, run["end_date"])
-    snapshot_cutoff = _ml_required_snapshot_cutoff(run)
-    _validate_ml_snapshot_prices(
-        prices,
-        required_tickers=tickers,
-        required_cutoff=snapshot_cutoff,
-    )
-    available_columns = set(str(c) for c in prices.columns)
-
-    # Hard guard: ML requires at least one investable (non-benchmark) symbol.
-    investable = [t for t in tickers if t != requested_benchmark and t in available_columns]
-    if not investable:
-        raise ValueError(
-            "ML run aborted: no non-benchmark universe symbols are available in price data. "
-            "Ingest the selected universe or choose a different universe."
-        )
-    _ensure_min_history(prices, context=f"run {run['id']} strategy {run['strategy_id']}")
-
-    if on_progress:
-        on_progress("features", 30)
-    benchmark_ticker = _select_available_benchmark_ticker(requested_benchmark, prices.columns)
-
-    top_n_raw = int(run.get("top_n") or 10)
-    top_n_for_ml = max(1, min(top_n_raw, len(investable)))
-    if top_n_for_ml < top_n_raw:
-        print(
-            f"[engine][ml] run={run['id']} top_n clamped {top_n_raw}→{top_n_for_ml} "
-            f"(universe has {len(investable)} investable symbols)"
-        )
+    strat = run["strategy_id"]
+    costs_bps = float(run.get("costs_bps") or 0.0)
+    top_n = int(run.get("top_n") or 5)
+    inputs = _load_baseline_inputs(io, run, [strat], on_progress=on_progress)
 
     if on_progress:
-        on_progress("train", 75)
-    last_train_progress = 75
-
-    def ml_progress(processed_steps: int, total_steps: int) -> None:
-        nonlocal last_train_progress
-        if not on_progress or total_steps <= 0:
-            return
-        next_progress = 75 + min(14, int((processed_steps / total_steps) * 14))
-        if next_progress <= last_train_progress and processed_steps < total_steps:
-            return
-        last_train_progress = next_progress
-        on_progress("train", next_progress)
-
-    ml = run_walk_forward(
-        run_id=run["id"],
-        strategy=run["strategy_id"],
-        prices=prices,
-        start_date=run["start_date"],
-        end_date=run["end_date"],
-        benchmark_ticker=benchmark_ticker,
-        top_n=top_n_for_ml,
-        cost_bps=float(run.get("costs_bps") or 10.0),
-        initial_capital=_read_initial_capital(run),
-        progress_cb=ml_progress,
-    )
-    model_params = (ml.metadata or {}).get("model_params", {})
-    if not isinstance(model_params, dict):
-        model_params = {}
-    expected_impl = "ridge" if run["strategy_id"] == "ml_ridge" else "lightgbm"
-    actual_impl = str(model_params.get("model_impl") or "")
-    if actual_impl != expected_impl:
-        raise RuntimeError(
-            f"ML strategy dispatch mismatch: requested={run['strategy_id']} "
-            f"expected_impl={expected_impl} actual_impl={actual_impl or 'n/a'}"
-        )
-    if len(ml.prediction_rows) == 0:
-        raise RuntimeError(
-            f"ML strategy {run['strategy_id']} produced no predictions. "
-            "Run aborted to avoid silent fallback or degenerate output."
-        )
-    return BacktestResult(
-        equity_rows=ml.equity_rows,
-        metrics=ml.metrics,
-        feature_rows=ml.feature_rows,
-        prediction_rows=ml.prediction_rows,
-        model_metadata=ml.metadata,
-        position_rows=ml.position_rows,
-        run_audit_metadata=_build_price_snapshot_metadata(
-            prices,
-            required_cutoff=snapshot_cutoff,
-        ),
-    )
+        on_progress("compute_signals", 40)
+    outputs = _baseline_strategy_outputs(strat, inputs, top_n)
+    return _baseline_result_from_outputs(run, inputs, outputs, costs_bps, on_progress=on_progress)
 
 
 def _run_backtest(
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+from factorlab_engine.ml import MLArtifacts, MLModelSpec, run_walk_forward, run_walk_forward_batch
+from factorlab_engine.supabase_io import Job, SupabaseIO
+
+from .pricing import (
+    _ensure_min_history,
+    _resolve_run_benchmark_ticker,
+    _select_available_benchmark_ticker,
+)
+from .progress import (
+    _build_price_snapshot_metadata,
+    _ml_required_snapshot_cutoff,
+    _read_initial_capital,
+    _validate_ml_snapshot_prices,
+)
+from .settings import _ML_JOB_BATCHING, BacktestResult, ProgressCallback, resolve_universe_symbols
+
+
+def _ml_price_window(run: dict[str, Any]) -> tuple[list[str], str, str]:
+    """Tickers and ``(warmup_start, run_end)`` an ML run loads for ``run``."""
+    tickers = resolve_universe_symbols(run)
+    requested_benchmark = _resolve_run_benchmark_ticker(run)
+    if requested_benchmark not in tickers:
+        tickers = [requested_benchmark, *tickers]
+
+    warmup_years = int(os.getenv("ML_WARMUP_YEARS", "5"))
+    warmup_start = (pd.to_datetime(run["start_date"]) - pd.DateOffset(years=warmup_years)).strftime(
+        "%Y-%m-%d"
+    )
+    return tickers, warmup_start, str(run["end_date"])
+
+
+@dataclass(frozen=True)
+class _MLInputs:
+    """Validated prices for an ML run, shared by every run batched with it."""
+
+    prices: pd.DataFrame
+    benchmark_ticker: str
+    snapshot_cutoff: str
+    n_investable: int
+
+
+def _ml_batch_key(run: dict[str, Any]) -> tuple[Any, ...] | None:
+    """ML runs with equal keys load the same prices and can train in one batch."""
+    if run.get("strategy_id") not in ("ml_ridge", "ml_lightgbm"):
+        return None
+    tickers, warmup_start, run_end = _ml_price_window(run)
+    return (
+        tuple(tickers),
+        warmup_start,
+        run_end,
+        str(run["start_date"]),
+        _resolve_run_benchmark_ticker(run),
+        _ml_required_snapshot_cutoff(run),
+    )
+
+
+def _load_ml_inputs(
+    io: SupabaseIO,
+    run: dict[str, Any],
+    *,
+    context: str,
+    on_progress: ProgressCallback | None = None,
+) -> _MLInputs:
+    requested_benchmark = _resolve_run_benchmark_ticker(run)
+    tickers, warmup_start, run_end = _ml_price_window(run)
+
+    if on_progress:
+        on_progress("load_data", 15)
+    prices = io.fetch_prices_frame(tickers, warmup_start, run_end)
+    snapshot_cutoff = _ml_required_snapshot_cutoff(run)
+    _validate_ml_snapshot_prices(
+        prices,
+        required_tickers=tickers,
+        required_cutoff=snapshot_cutoff,
+    )
+    available_columns = set(str(c) for c in prices.columns)
+
+    # Hard guard: ML requires at least one investable (non-benchmark) symbol.
+    investable = [t for t in tickers if t != requested_benchmark and t in available_columns]
+    if not investable:
+        raise ValueError(
+            "ML run aborted: no non-benchmark universe symbols are available in price data. "
+            "Ingest the selected universe or choose a different universe."
+        )
+    _ensure_min_history(prices, context=context)
+
+    if on_progress:
+        on_progress("features", 30)
+    return _MLInputs(
+        prices=prices,
+        benchmark_ticker=_select_available_benchmark_ticker(requested_benchmark, prices.columns),
+        snapshot_cutoff=snapshot_cutoff,
+        n_investable=len(investable),
+    )
+
+
+def _ml_model_spec(run: dict[str, Any], inputs: _MLInputs) -> MLModelSpec:
+    top_n_raw = int(run.get("top_n") or 10)
+    top_n_for_ml = max(1, min(top_n_raw, inputs.n_investable))
+    if top_n_for_ml < top_n_raw:
+        print(
+            f"[engine][ml] run={run['id']} top_n clamped {top_n_raw}→{top_n_for_ml} "
+            f"(universe has {inputs.n_investable} investable symbols)"
+        )
+    return MLModelSpec(
+        run_id=run["id"],
+        strategy=run["strategy_id"],
+        top_n=top_n_for_ml,
+        cost_bps=float(run.get("costs_bps") or 10.0),
+        initial_capital=_read_initial_capital(run),
+    )
+
+
+def _ml_train_progress(on_progress: ProgressCallback | None) -> Callable[[int, int], None]:
+    """Map walk-forward steps onto the 75-89% "train" band of a job's progress."""
+    if on_progress:
+        on_progress("train", 75)
+    last_train_progress = 75
+
+    def ml_progress(processed_steps: int, total_steps: int) -> None:
+        nonlocal last_train_progress
+        if not on_progress or total_steps <= 0:
+            return
+        next_progress = 75 + min(14, int((processed_steps / total_steps) * 14))
+        if next_progress <= last_train_progress and processed_steps < total_steps:
+            return
+        last_train_progress = next_progress
+        on_progress("train", next_progress)
+
+    return ml_progress
+
+
+def _ml_backtest_result(run: dict[str, Any], ml: MLArtifacts, inputs: _MLInputs) -> BacktestResult:
+    model_params = (ml.metadata or {}).get("model_params", {})
+    if not isinstance(model_params, dict):
+        model_params = {}
+    expected_impl = "ridge" if run["strategy_id"] == "ml_ridge" else "lightgbm"
+    actual_impl = str(model_params.get("model_impl") or "")
+    if actual_impl != expected_impl:
+        raise RuntimeError(
+            f"ML strategy dispatch mismatch: requested={run['strategy_id']} "
+            f"expected_impl={expected_impl} actual_impl={actual_impl or 'n/a'}"
+        )
+    if len(ml.prediction_rows) == 0:
+        raise RuntimeError(
+            f"ML strategy {run['strategy_id']} produced no predictions. "
+            "Run aborted to avoid silent fallback or degenerate output."
+        )
+    return BacktestResult(
+        equity_rows=ml.equity_rows,
+        metrics=ml.metrics,
+        feature_rows=ml.feature_rows,
+        prediction_rows=ml.prediction_rows,
+        model_metadata=ml.metadata,
+        position_rows=ml.position_rows,
+        period_metrics=ml.period_metrics,
+        run_audit_metadata=_build_price_snapshot_metadata(
+            inputs.prices,
+            required_cutoff=inputs.snapshot_cutoff,
+        ),
+    )
+
+
+def _build_ml_result(
+    io: SupabaseIO,
+    run: dict[str, Any],
+    *,
+    on_progress: ProgressCallback | None = None,
+) -> BacktestResult:
+    inputs = _load_ml_inputs(
+        io, run, context=f"run {run['id']} strategy {run['strategy_id']}", on_progress=on_progress
+    )
+    spec = _ml_model_spec(run, inputs)
+    ml = run_walk_forward(
+        run_id=spec.run_id,
+        strategy=spec.strategy,
+        prices=inputs.prices,
+        start_date=run["start_date"],
+        end_date=run["end_date"],
+        benchmark_ticker=inputs.benchmark_ticker,
+        top_n=spec.top_n,
+        cost_bps=spec.cost_bps,
+        initial_capital=spec.initial_capital,
+        progress_cb=_ml_train_progress(on_progress),
+    )
+    return _ml_backtest_result(run, ml, inputs)
+
+
+def _build_ml_batch_results(
+    io: SupabaseIO,
+    runs: Sequence[dict[str, Any]],
+    *,
+    on_progress: ProgressCallback | None = None,
+) -> list[BacktestResult]:
+    """Results for ML runs sharing one ``_ml_batch_key``: one price load and one walk-forward."""
+    first = runs[0]
+    inputs = _load_ml_inputs(
+        io,
+        first,
+        context=f"runs {', '.join(str(run['id']) for run in runs)} ml batch",
+        on_progress=on_progress,
+    )
+    artifacts = run_walk_forward_batch(
+        [_ml_model_spec(run, inputs) for run in runs],
+        prices=inputs.prices,
+        start_date=first["start_date"],
+        end_date=first["end_date"],
+        benchmark_ticker=inputs.benchmark_ticker,
+        progress_cb=_ml_train_progress(on_progress),
+    )
+    return [_ml_backtest_result(run, ml, inputs) for run, ml in zip(runs, artifacts)]
+
+
+def _group_ml_backtest_jobs(io: SupabaseIO, jobs: list[Job]) -> list[Job | tuple[Job, ...]]:
+    """``jobs`` in order, with ML backtests sharing a ``_ml_batch_key`` merged into one tuple.
+
+    A group takes the place of its first job.  Jobs whose run cannot be read stay alone and
+    fail or succeed on their own when processed.
+    """
+    if not _ML_JOB_BATCHING or sum(job.job_type == "backtest" for job in jobs) < 2:
+        return list(jobs)
+    groups: dict[tuple[Any, ...], list[Job]] = {}
+    job_keys: dict[str, tuple[Any, ...]] = {}
+    for job in jobs:
+        if job.job_type != "backtest" or not job.run_id:
+            continue
+        try:
+            run = io.fetch_run(job.run_id)
+            key = _ml_batch_key(run) if run is not None else None
+        except Exception as exc:
+            print(f"[engine] warning: not batching job={job.id}: {exc}")
+            continue
+        if key is not None:
+            groups.setdefault(key, []).append(job)
+            job_keys[job.id] = key
+
+    units: list[Job | tuple[Job, ...]] = []
+    for job in jobs:
+        group = groups.get(job_keys[job.id]) if job.id in job_keys else None
+        if group is None or len(group) < 2:
+            units.append(job)
+        elif group[0] is job:
+            units.append(tuple(group))
+    return units
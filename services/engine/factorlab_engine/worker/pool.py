@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from factorlab_engine.memory import current_rss_mb
+from factorlab_engine.supabase_io import SupabaseIO
+
+from .settings import _BACKTEST_WORKER_MAX_JOBS, _backtest_worker_max_rss_mb
+
+# Per-process state of a pool worker, set up once by _warm_backtest_worker.
+_WORKER_IO: SupabaseIO | None = None
+_WORKER_JOBS_DONE = 0
+
+
+@dataclass(frozen=True)
+class _WorkerReport:
+    """What a pool worker reports after each job, so the parent can decide to recycle."""
+
+    pid: int
+    jobs_done: int
+    rss_mb: float
+
+
+def _warm_backtest_worker() -> None:
+    """Pool initializer: pay the heavy imports and client setup once per worker process."""
+    global _WORKER_IO
+    try:
+        import lightgbm  # noqa: F401
+    except ImportError:
+        pass
+    try:
+        _WORKER_IO = SupabaseIO()
+    except Exception as exc:
+        # Leave it to the first job, which fails (and is recorded) on its own.
+        print(f"[engine] warning: worker pid={os.getpid()} could not pre-build client: {exc}")
+
+
+def _worker_io() -> SupabaseIO:
+    global _WORKER_IO
+    if _WORKER_IO is None:
+        _WORKER_IO = SupabaseIO()
+    return _WORKER_IO
+
+
+def _finish_worker_job() -> _WorkerReport:
+    global _WORKER_JOBS_DONE
+    _WORKER_JOBS_DONE += 1
+    return _WorkerReport(pid=os.getpid(), jobs_done=_WORKER_JOBS_DONE, rss_mb=current_rss_mb())
+
+
+class _BacktestWorkerPool:
+    """Spawn process pool that stays warm across polls.
+
+    Workers import the engine and build their SupabaseIO once, then serve jobs until the
+    parent retires the pool: after a batch in which a worker reached ``max_jobs_per_worker``
+    jobs or ``max_rss_mb`` resident memory (by default its share of the instance's memory),
+    or in which a worker died.  Jobs still run in the worker's main thread, so per-job
+    SIGALRM timeouts and heartbeats are unchanged.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        *,
+        executor_cls: type[ProcessPoolExecutor] = ProcessPoolExecutor,
+        mp_context_factory: Callable[[str], Any] = multiprocessing.get_context,
+        max_jobs_per_worker: int = _BACKTEST_WORKER_MAX_JOBS,
+        max_rss_mb: int | None = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = (
+            _backtest_worker_max_rss_mb(self.max_workers) if max_rss_mb is None else max_rss_mb
+        )
+        self._executor_cls = executor_cls
+        self._mp_context_factory = mp_context_factory
+        self._executor: ProcessPoolExecutor | None = None
+        self._retire = False
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._executor_cls(
+                max_workers=self.max_workers,
+                mp_context=self._mp_context_factory("spawn"),
+                initializer=_warm_backtest_worker,
+            )
+        return self._executor
+
+    def record(self, report: Any) -> None:
+        if not isinstance(report, _WorkerReport):
+            return
+        over_jobs = 0 < self.max_jobs_per_worker <= report.jobs_done
+        over_memory = 0 < self.max_rss_mb <= report.rss_mb
+        if over_jobs or over_memory:
+            print(
+                f"[engine] recycling backtest worker pool after this batch: pid={report.pid} "
+                f"jobs={report.jobs_done} rss={report.rss_mb:.0f}MB"
+            )
+            self._retire = True
+
+    def mark_broken(self) -> None:
+        self._retire = True
+
+    def end_batch(self) -> None:
+        if self._retire:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._executor = None
+        self._retire = False
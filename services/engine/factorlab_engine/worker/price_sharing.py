@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Any
+
+from factorlab_engine.repositories.shared_prices import SharedPriceFrame, SharedPriceFrameSpec
+from factorlab_engine.supabase_io import Job, SupabaseIO
+
+from .execution import _baseline_price_window
+from .ml_execution import _ml_price_window
+from .settings import _BASELINE_STRATEGIES
+from .sweep import _parse_sweep_grid
+
+
+def _job_price_window(run: dict[str, Any], job: Job) -> tuple[list[str], str, str] | None:
+    """The tickers and window ``job`` will pass to ``fetch_prices_frame``, if known."""
+    strategy = str(run.get("strategy_id") or "")
+    if job.job_type == "baseline_sweep":
+        grid = _parse_sweep_grid(run, job.payload)
+        strategies = list(dict.fromkeys(combo.strategy_id for combo in grid))
+        return _baseline_price_window(run, strategies)
+    if strategy in _BASELINE_STRATEGIES:
+        return _baseline_price_window(run, [strategy])
+    if strategy in ("ml_ridge", "ml_lightgbm"):
+        return _ml_price_window(run)
+    return None
+
+
+def _share_batch_prices(io: SupabaseIO, jobs: list[Job]) -> SharedPriceFrame | None:
+    """Load the union of a batch's price windows once and publish it in shared memory.
+
+    Returns None (workers then load their own prices) when fewer than two jobs have a
+    known window or anything goes wrong; sharing is an optimisation only.
+    """
+    try:
+        windows: list[tuple[list[str], str, str]] = []
+        for job in jobs:
+            run = io.fetch_run(job.run_id) if job.run_id else None
+            window = _job_price_window(run, job) if run is not None else None
+            if window is not None:
+                windows.append(window)
+        if len(windows) < 2:
+            return None
+        tickers = sorted({ticker for window in windows for ticker in window[0]})
+        start = min(window[1] for window in windows)
+        end = max(window[2] for window in windows)
+        raw = io.fetch_unfilled_prices_frame(tickers, start, end)
+        shared = SharedPriceFrame.create(raw, tickers, start, end)
+    except Exception as exc:
+        print(f"[engine] warning: not sharing batch prices, workers load their own: {exc}")
+        return None
+    if shared is not None:
+        print(
+            f"[engine] shared batch prices tickers={len(tickers)} range={start}..{end} "
+            f"dates={shared.spec.n_dates}"
+        )
+    return shared
+
+
+def _attach_shared_prices(spec: SharedPriceFrameSpec) -> SharedPriceFrame:
+    """Map a batch's prices for one job; the caller closes them when the job is done.
+
+    Each batch publishes a new segment, so a warm worker must not keep old ones mapped.
+    """
+    return SharedPriceFrame.attach(spec)
+
+
+def _release_shared_prices(shared: SharedPriceFrame) -> None:
+    if not shared.close():
+        print(
+            f"[engine] warning: shared prices {shared.spec.name} still viewed after the job; "
+            "unmapped when the last frame is freed"
+        )
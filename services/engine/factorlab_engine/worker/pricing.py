@@ -7,9 +7,12 @@ import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from factorlab_engine.metrics import compute_metrics as _compute_metrics
+from factorlab_engine.metrics import compute_period_metrics
+from factorlab_engine.repositories.price_cache import invalidate_cached_prices
 from factorlab_engine.supabase_io import SupabaseIO
 
-from .progress import _compute_metrics, _equity_rows
+from .progress import _equity_rows
 from .settings import MIN_DATA_POINTS, MIN_SPAN_DAYS, BacktestResult, _to_date
 
 
@@ -25,9 +28,12 @@ def _build_synthetic_result(start: str, end: str, seed: int = 7) -> BacktestResu
     portfolio = 100_000.0 * pd.Series(1.0 + daily_r, index=dates).cumprod()
     benchmark = 100_000.0 * pd.Series(1.0 + bench_r, index=dates).cumprod()
 
-    metrics = _compute_metrics(pd.Series(daily_r, index=dates), turnover=0.12)
+    daily_returns = pd.Series(daily_r, index=dates)
+    metrics = _compute_metrics(daily_returns, turnover=0.12)
     rows = _equity_rows(dates, portfolio, benchmark)
-    return BacktestResult(equity_rows=rows, metrics=metrics)
+    return BacktestResult(
+        equity_rows=rows, metrics=metrics, period_metrics=compute_period_metrics(daily_returns)
+    )
 
 
 def _resolve_run_benchmark_ticker(run: dict[str, Any]) -> str:
@@ -95,6 +101,8 @@ def _persist_prices_to_db(io: SupabaseIO, prices: pd.DataFrame) -> None:
         io.client.table("prices").upsert(
             price_rows[i : i + chunk_size], on_conflict="ticker,date"
         ).execute()
+    # No ingest ran, so ticker_stats (the price cache token) did not move with these rows.
+    invalidate_cached_prices([str(ticker) for ticker in prices.columns])
     print(f"[engine] persisted {len(price_rows)} yfinance fallback price rows to DB")
 
 
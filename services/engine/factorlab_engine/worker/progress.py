@@ -5,9 +5,10 @@ import json
 import threading
 from typing import Any, Callable
 
-import numpy as np
 import pandas as pd
 
+from factorlab_engine.equity_columns import EquityColumns
+
 from .settings import _ML_SNAPSHOT_MODE, BacktestResult
 
 
@@ -61,58 +62,8 @@ def _apply_rebalance_costs(
     return net
 
 
-def _compute_metrics(daily_returns: pd.Series, turnover: float) -> dict[str, float]:
-    daily_returns = daily_returns.replace([np.inf, -np.inf], np.nan).dropna()
-    if daily_returns.empty:
-        raise ValueError("No returns available")
-
-    mean_daily = float(daily_returns.mean())
-    vol_daily = float(daily_returns.std(ddof=0))
-    volatility = vol_daily * np.sqrt(252.0)
-    sharpe = (mean_daily / vol_daily) * np.sqrt(252.0) if vol_daily > 1e-10 else 0.0
-
-    equity = (1.0 + daily_returns).cumprod()
-    peak = equity.cummax()
-    drawdown = equity / peak - 1.0
-    max_drawdown = float(drawdown.min())
-
-    n = len(daily_returns)
-    cagr = float(equity.iloc[-1] ** (252.0 / n) - 1.0) if n > 0 else 0.0
-    calmar = cagr / abs(max_drawdown) if max_drawdown < 0 else 0.0
-    win_rate = float((daily_returns > 0).mean())
-
-    gains = float(daily_returns[daily_returns > 0].sum())
-    losses = float(abs(daily_returns[daily_returns < 0].sum()))
-    profit_factor = gains / losses if losses > 0 else 0.0
-
-    return {
-        "cagr": cagr,
-        "sharpe": sharpe,
-        "max_drawdown": max_drawdown,
-        "turnover": float(turnover),
-        "volatility": volatility,
-        "win_rate": win_rate,
-        "profit_factor": profit_factor,
-        "calmar": calmar,
-    }
-
-
-def _equity_rows(
-    dates: pd.Index, portfolio: pd.Series, benchmark: pd.Series
-) -> list[dict[str, Any]]:
-    aligned_dates = (
-        pd.Index(dates).intersection(portfolio.index).intersection(benchmark.index).sort_values()
-    )
-    rows: list[dict[str, Any]] = []
-    for dt in aligned_dates:
-        rows.append(
-            {
-                "date": pd.Timestamp(dt).strftime("%Y-%m-%d"),
-                "portfolio": float(portfolio.loc[dt]),
-                "benchmark": float(benchmark.loc[dt]),
-            }
-        )
-    return rows
+def _equity_rows(dates: pd.Index, portfolio: pd.Series, benchmark: pd.Series) -> EquityColumns:
+    return EquityColumns.from_series(dates, portfolio, benchmark)
 
 
 def _rows_digest(rows: list[dict[str, Any]] | None, *, keys: list[str]) -> str | None:
@@ -364,5 +315,7 @@ def _build_run_metadata(run: dict[str, Any], result: BacktestResult) -> dict[str
             keys=["date", "portfolio", "benchmark"],
         ),
     }
+    if result.period_metrics is not None:
+        metadata["period_metrics"] = result.period_metrics
     metadata.update(audit_metadata)
     return metadata
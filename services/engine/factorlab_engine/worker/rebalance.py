@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from factorlab_engine.selection import top_n_mask
+from factorlab_engine.turnover import rebalance_turnover_batch
+
+from .settings import _ALL_CASH_SENTINEL
+
+
+@dataclass(frozen=True)
+class PositionColumns:
+    """Columnar rebalance positions: one entry per (rebalance date, held symbol).
+
+    ``symbol_codes`` index into ``symbols``.  Rows for the positions table are only built by
+    ``to_rows`` when results are handed to persistence.
+    """
+
+    dates: np.ndarray  # datetime64[D]
+    symbol_codes: np.ndarray  # int32
+    symbols: tuple[str, ...]
+    weights: np.ndarray  # float64
+
+    def __len__(self) -> int:
+        return int(self.weights.shape[0])
+
+    def between(self, start: str, end: str) -> PositionColumns:
+        """Keep rebalance dates inside the inclusive ``start``..``end`` window."""
+        lo = np.datetime64(pd.Timestamp(start).date(), "D")
+        hi = np.datetime64(pd.Timestamp(end).date(), "D")
+        mask = (self.dates >= lo) & (self.dates <= hi)
+        return PositionColumns(
+            dates=self.dates[mask],
+            symbol_codes=self.symbol_codes[mask],
+            symbols=self.symbols,
+            weights=self.weights[mask],
+        )
+
+    def symbol_array(self) -> np.ndarray:
+        return np.asarray(self.symbols, dtype=object)[self.symbol_codes]
+
+    def to_rows(self, run_id: str | None = None) -> list[dict[str, Any]]:
+        dates = np.datetime_as_string(self.dates, unit="D").tolist()
+        symbols = self.symbol_array().tolist()
+        weights = self.weights.tolist()
+        if run_id is None:
+            return [
+                {"date": date, "symbol": symbol, "weight": weight}
+                for date, symbol, weight in zip(dates, symbols, weights)
+            ]
+        return [
+            {"run_id": run_id, "date": date, "symbol": symbol, "weight": weight}
+            for date, symbol, weight in zip(dates, symbols, weights)
+        ]
+
+
+def _rebalance_mask(index: pd.Index) -> np.ndarray:
+    """Return a boolean mask marking the first trading day of every calendar month."""
+    if len(index) == 0:
+        return np.zeros(0, dtype=bool)
+    dates = pd.DatetimeIndex(index)
+    month_key = dates.year.to_numpy() * 12 + dates.month.to_numpy()
+    mask = np.empty(len(month_key), dtype=bool)
+    mask[0] = True
+    mask[1:] = month_key[1:] != month_key[:-1]
+    return mask
+
+
+def _equal_weight_rows(eligible: np.ndarray) -> np.ndarray:
+    """Spread 100% equally across the eligible columns of every row (all-cash rows stay 0)."""
+    counts = eligible.sum(axis=1)
+    per_asset = np.zeros(counts.shape[0], dtype=float)
+    held = counts > 0
+    per_asset[held] = 1.0 / counts[held]
+    return np.where(eligible, per_asset[:, None], 0.0)
+
+
+def _top_n_weight_rows(
+    values: np.ndarray,
+    eligible: np.ndarray,
+    top_n: int,
+    *,
+    descending: bool,
+) -> np.ndarray:
+    """Equal-weight the best ``top_n`` eligible columns of every row.
+
+    Ties are broken by column position, which is the order ``Series.sort_values`` leaves
+    tied labels in for both ascending and descending sorts.
+    """
+    if values.size == 0:
+        return np.zeros(values.shape, dtype=float)
+    return _equal_weight_rows(top_n_mask(values, top_n, descending=descending, eligible=eligible))
+
+
+def _portfolio_returns(
+    asset_rets: pd.DataFrame, daily_weights: np.ndarray, *, lag_weights: bool
+) -> pd.Series:
+    """Daily portfolio returns from a (dates x tickers) weight matrix in one vectorized pass.
+
+    With ``lag_weights`` the weights set on day t earn day t+1's return.  Both branches skip
+    NaN products (inf return x 0 weight) and keep the summation order of the original
+    per-strategy code, so results stay bit-identical: lagged strategies reduced the whole
+    weighted frame, equal weight summed each day's row on its own.
+    """
+    if lag_weights:
+        held = pd.DataFrame(daily_weights, index=asset_rets.index, columns=asset_rets.columns)
+        return (asset_rets * held.shift(1).fillna(0.0)).sum(axis=1)
+    products = np.ascontiguousarray(asset_rets.to_numpy(dtype=float)) * daily_weights
+    products[np.isnan(products)] = 0.0
+    return pd.Series(products.sum(axis=1), index=asset_rets.index)
+
+
+def _position_columns(
+    rebalance_dates: pd.DatetimeIndex,
+    columns: pd.Index,
+    target_weights: np.ndarray,
+    *,
+    emit_cash_sentinel: bool,
+) -> PositionColumns:
+    """Held (weight > 0) entries of every rebalance row, in date then column order.
+
+    With ``emit_cash_sentinel`` an all-cash rebalance gets one ``_CASH`` entry with weight 0.0
+    so the date stays auditable in the DB.
+    """
+    row_idx, col_idx = np.nonzero(target_weights > 0)
+    weights = target_weights[row_idx, col_idx]
+    cash_code = len(columns)
+    if emit_cash_sentinel:
+        cash_rows = np.flatnonzero(~(target_weights > 0).any(axis=1))
+        if cash_rows.size:
+            order = np.argsort(np.concatenate([row_idx, cash_rows]), kind="stable")
+            row_idx = np.concatenate([row_idx, cash_rows])[order]
+            col_idx = np.concatenate([col_idx, np.full(cash_rows.size, cash_code)])[order]
+            weights = np.concatenate([weights, np.zeros(cash_rows.size)])[order]
+    return PositionColumns(
+        dates=rebalance_dates.to_numpy().astype("datetime64[D]")[row_idx],
+        symbol_codes=col_idx.astype(np.int32),
+        symbols=(*(str(col) for col in columns), _ALL_CASH_SENTINEL),
+        weights=weights.astype(float),
+    )
+
+
+def _run_rebalance_schedule(
+    prices: pd.DataFrame,
+    rebalance_mask: np.ndarray,
+    target_weights: np.ndarray,
+    *,
+    lag_weights: bool = True,
+    emit_cash_sentinel: bool = True,
+) -> tuple[pd.Series, pd.Series, PositionColumns]:
+    """Shared rebalance engine for the baseline strategies.
+
+    ``target_weights`` holds one row per rebalance date (``rebalance_mask.sum()`` rows) and one
+    column per price column. Rows are forward-filled to daily weights, applied to daily asset
+    returns, and diffed against the drifted previous allocation to measure one-way turnover.
+
+    Returns ``(portfolio_rets, rebalance_turnover, rebalance_positions)``.
+    """
+    asset_rets = prices.pct_change().fillna(0.0)
+    rebalance_dates = pd.DatetimeIndex(prices.index[rebalance_mask])
+    period_index = np.cumsum(rebalance_mask) - 1
+    daily_weights = target_weights[period_index]
+    portfolio_rets = _portfolio_returns(asset_rets, daily_weights, lag_weights=lag_weights)
+
+    _, turnover_values = rebalance_turnover_batch(
+        target_weights, prices.to_numpy(dtype=float)[rebalance_mask]
+    )
+    rebalance_turnover = pd.Series(0.0, index=prices.index)
+    rebalance_turnover.iloc[np.flatnonzero(rebalance_mask)] = turnover_values
+
+    positions = _position_columns(
+        rebalance_dates,
+        prices.columns,
+        target_weights,
+        emit_cash_sentinel=emit_cash_sentinel,
+    )
+    return portfolio_rets, rebalance_turnover, positions
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING, Any, Callable
 import pandas as pd
 
 if TYPE_CHECKING:
+    from factorlab_engine.equity_columns import EquityColumns
     from factorlab_engine.supabase_io import SupabaseIO
 
 
@@ -24,6 +25,29 @@ _ML_LIGHTGBM_JOB_TIMEOUT_SECONDS: int = int(
 # Separate budget for the persistence phase (save_success DB writes) after the compute
 # timeout has been cancelled. Keeps persistence bounded without constraining computation.
 _PERSIST_TIMEOUT_SECONDS: int = int(os.getenv("PERSIST_TIMEOUT_SECONDS", "600"))  # 10 min
+# Concurrent backtest batches load the union of their price windows once, in the parent,
+# and hand it to worker processes through shared memory.
+_SHARED_PRICE_FRAMES: bool = os.getenv("SHARED_PRICE_FRAMES", "1").lower() in ("1", "true", "yes")
+# Compatible queued ML backtests (same universe, window and benchmark) train in one batch.
+_ML_JOB_BATCHING: bool = os.getenv("ML_JOB_BATCHING", "1").lower() in ("1", "true", "yes")
+# The concurrent backtest pool stays warm across polls and is recycled after a batch in which
+# a worker process served this many jobs or grew past this resident size (0 disables either).
+_BACKTEST_WORKER_MAX_JOBS: int = int(os.getenv("BACKTEST_WORKER_MAX_JOBS", "50"))
+_BACKTEST_WORKER_MAX_RSS_MB: int | None = (
+    int(os.environ["BACKTEST_WORKER_MAX_RSS_MB"])
+    if os.getenv("BACKTEST_WORKER_MAX_RSS_MB")
+    else None
+)
+# Memory of the whole worker instance; unless BACKTEST_WORKER_MAX_RSS_MB is set, each warm
+# backtest process is recycled once it holds more than an even share of it.
+_WORKER_MEMORY_MB: int = int(os.getenv("WORKER_MEMORY_MB", "2048"))
+
+
+def _backtest_worker_max_rss_mb(workers: int) -> int:
+    if _BACKTEST_WORKER_MAX_RSS_MB is not None:
+        return _BACKTEST_WORKER_MAX_RSS_MB
+    return _WORKER_MEMORY_MB // max(1, workers)
+
 
 ProgressCallback = Callable[[str, int], None]
 
@@ -60,6 +84,10 @@ _TREND_SMA_WINDOW: int = 200  # 200-day benchmark SMA for trend signal
 _TREND_DEFENSIVE: str = "TLT"  # Primary risk-off asset
 _TREND_DEFENSIVE_FALLBACK: str = "BIL"  # Cash-proxy fallback
 
+# Upper bound on (strategy, top_n, costs_bps) combinations evaluated by one baseline_sweep job.
+_BASELINE_SWEEP_MAX_COMBINATIONS: int = int(os.getenv("BASELINE_SWEEP_MAX_COMBINATIONS", "500"))
+_BASELINE_STRATEGIES: tuple[str, ...] = ("equal_weight", "momentum_12_1", "low_vol", "trend_filter")
+
 # Sentinel symbol written to the positions table for rebalance dates where a strategy
 # holds no risky assets (e.g. momentum_12_1 with all-negative scores).  Weight is 0.0.
 # Consumers MUST filter this symbol out before treating rows as real ticker holdings.
@@ -125,13 +153,15 @@ UNIVERSE_PRESETS: dict[str, list[str]] = {
 
 @dataclass(frozen=True)
 class BacktestResult:
-    equity_rows: list[dict[str, Any]]
+    equity_rows: EquityColumns
     metrics: dict[str, float]
     feature_rows: list[dict[str, Any]] | None = None
     prediction_rows: list[dict[str, Any]] | None = None
     model_metadata: dict[str, Any] | None = None
     position_rows: list[dict[str, Any]] | None = None
     run_audit_metadata: dict[str, Any] | None = None
+    # Rolling 1-year and calendar-year metrics (metrics.compute_period_metrics).
+    period_metrics: dict[str, Any] | None = None
 
 
 def validate_backtest_window(
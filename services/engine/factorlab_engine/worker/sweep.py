@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from factorlab_engine.metrics import _last_of_each, metric_rows, performance_metrics
+from factorlab_engine.supabase_io import SupabaseIO
+
+from .execution import (
+    _baseline_result_from_outputs,
+    _baseline_strategy_outputs,
+    _BaselineInputs,
+    _load_baseline_inputs,
+)
+from .progress import _read_initial_capital
+from .settings import (
+    _BASELINE_STRATEGIES,
+    _BASELINE_SWEEP_MAX_COMBINATIONS,
+    BacktestResult,
+    ProgressCallback,
+    _job_timeout_seconds_for_strategy,
+)
+from .strategies import (
+    _annualize_turnover_from_rebalances,
+    _low_vol_scores,
+    _momentum_scores,
+    _slice_series_to_run_window,
+)
+
+
+@dataclass(frozen=True)
+class SweepCombination:
+    strategy_id: str
+    top_n: int
+    costs_bps: float
+
+
+def _as_list(value: Any, default: Any) -> list[Any]:
+    if value is None:
+        return [default]
+    if isinstance(value, (list, tuple)):
+        return list(value) or [default]
+    return [value]
+
+
+def _parse_sweep_grid(
+    run: dict[str, Any], payload: dict[str, Any] | None
+) -> list[SweepCombination]:
+    """Expand a ``baseline_sweep`` job payload into the cartesian grid it describes.
+
+    Payload keys ``strategies``, ``top_n`` and ``costs_bps`` each take a value or a list and
+    default to the run's own setting.  The run's own combination is always evaluated first
+    because it is persisted as the run's regular result.
+    """
+    payload = payload or {}
+    own = SweepCombination(
+        strategy_id=str(run["strategy_id"]),
+        top_n=int(run.get("top_n") or 5),
+        costs_bps=float(run.get("costs_bps") or 0.0),
+    )
+    strategies = [str(s) for s in _as_list(payload.get("strategies"), own.strategy_id)]
+    unsupported = sorted(set(strategies + [own.strategy_id]) - set(_BASELINE_STRATEGIES))
+    if unsupported:
+        raise ValueError(f"Parameter sweeps only support baseline strategies, got {unsupported}")
+    top_ns = [int(n) for n in _as_list(payload.get("top_n"), own.top_n)]
+    costs = [float(c) for c in _as_list(payload.get("costs_bps"), own.costs_bps)]
+    if any(n < 1 for n in top_ns) or any(c < 0 for c in costs):
+        raise ValueError("Sweep top_n values must be >= 1 and costs_bps values >= 0")
+
+    grid = [own]
+    seen = {own}
+    for strat, top_n, cost in itertools.product(strategies, top_ns, costs):
+        combo = SweepCombination(strat, top_n, cost)
+        if combo not in seen:
+            seen.add(combo)
+            grid.append(combo)
+    if len(grid) > _BASELINE_SWEEP_MAX_COMBINATIONS:
+        raise ValueError(
+            f"Sweep grid has {len(grid)} combinations; the limit is "
+            f"{_BASELINE_SWEEP_MAX_COMBINATIONS} (BASELINE_SWEEP_MAX_COMBINATIONS)."
+        )
+    return grid
+
+
+def _sweep_groups(
+    grid: list[SweepCombination],
+) -> dict[tuple[str, int], list[SweepCombination]]:
+    """Combinations by (strategy, top_n): one strategy evaluation each, costs applied in batch.
+
+    ``equal_weight`` ignores ``top_n``, so all of its combinations share one group.
+    """
+    groups: dict[tuple[str, int], list[SweepCombination]] = {}
+    for combo in grid:
+        top_n = 0 if combo.strategy_id == "equal_weight" else combo.top_n
+        groups.setdefault((combo.strategy_id, top_n), []).append(combo)
+    return groups
+
+
+def _sweep_timeout_seconds(run: dict[str, Any], payload: dict[str, Any] | None) -> int:
+    """Compute budget for a ``baseline_sweep`` job: one backtest budget per grid group.
+
+    An invalid payload gets a single backtest budget; ``_run_baseline_sweep`` raises the
+    same error once the job is running, so it is reported like any other job failure.
+    """
+    try:
+        grid = _parse_sweep_grid(run, payload)
+    except (TypeError, ValueError):
+        return _job_timeout_seconds_for_strategy(str(run.get("strategy_id", "")))
+    return sum(_job_timeout_seconds_for_strategy(strat) for strat, _ in _sweep_groups(grid))
+
+
+def _net_returns_matrix(
+    daily_rets: pd.Series, rebalance_turnover: pd.Series, costs_bps: list[float]
+) -> np.ndarray:
+    """Apply every cost level at once: one column per entry of ``costs_bps``.
+
+    Same arithmetic as ``_apply_rebalance_costs`` (``ret - rate * turnover`` on rebalance
+    days only), so each column matches a standalone run exactly.
+    """
+    rets = daily_rets.to_numpy(dtype=float)
+    turnover = rebalance_turnover.reindex(daily_rets.index).fillna(0.0).to_numpy(dtype=float)
+    rates = np.maximum(np.asarray(costs_bps, dtype=float), 0.0) / 10_000.0
+    charged = (turnover > 0)[:, None] & (rates > 0)[None, :]
+    costs = rates[None, :] * turnover[:, None]
+    return np.where(charged, rets[:, None] - costs, rets[:, None])
+
+
+def _sweep_navs(values: np.ndarray) -> list[float]:
+    """NAVs to the cent, which keeps each curve's JSON in run_metadata compact."""
+    return np.round(values, 2).tolist()
+
+
+def _strategy_signal(
+    strat: str, inputs: _BaselineInputs, cache: dict[tuple[str, pd.Timestamp], pd.DataFrame]
+) -> pd.DataFrame | None:
+    """Signal matrix for ``strat``, computed once per (signal, warmup window)."""
+    if strat == "equal_weight" or inputs.prices.empty:
+        return None
+    name = "low_vol" if strat == "low_vol" else "momentum"
+    key = (name, inputs.prices.index[0])
+    if key not in cache:
+        universe_prices = inputs.universe_prices
+        if name == "low_vol":
+            cache[key] = _low_vol_scores(universe_prices)
+        else:
+            cache[key] = _momentum_scores(universe_prices)
+    return cache[key]
+
+
+def _build_baseline_sweep(
+    io: SupabaseIO,
+    run: dict[str, Any],
+    grid: list[SweepCombination],
+    *,
+    on_progress: ProgressCallback | None = None,
+) -> tuple[BacktestResult, dict[str, Any]]:
+    """Evaluate a (strategy, top_n, costs_bps) grid over one price load.
+
+    Returns the regular result for the run's own combination (``grid[0]``) plus a sweep
+    summary with per-combination metrics and equity curves sharing one date axis.  The
+    summary lands in run_metadata, so curves keep month-end NAVs only (as
+    ``compute_period_metrics`` does): about 240 points per combination for 20 years.
+    """
+    run_start = str(run["start_date"])
+    run_end = str(run["end_date"])
+    strategies = list(dict.fromkeys(combo.strategy_id for combo in grid))
+    shared = _load_baseline_inputs(io, run, strategies, on_progress=on_progress)
+    if on_progress:
+        on_progress("compute_signals", 40)
+
+    # One strategy evaluation per (strategy, top_n); cost levels are applied in one batch.
+    groups = _sweep_groups(grid)
+
+    signal_cache: dict[tuple[str, pd.Timestamp], pd.DataFrame] = {}
+    own_result: BacktestResult | None = None
+    initial_capital = _read_initial_capital(run)
+    window_index: pd.DatetimeIndex | None = None
+    month_end = np.zeros(0, dtype=np.intp)
+    benchmark_curve: np.ndarray | None = None
+    summaries: dict[SweepCombination, dict[str, Any]] = {}
+    for (strat, top_n), combos in groups.items():
+        inputs = shared.for_strategy(strat, run_start)
+        signal = _strategy_signal(strat, inputs, signal_cache)
+        outputs = _baseline_strategy_outputs(strat, inputs, combos[0].top_n, signal=signal)
+        if grid[0] in combos:
+            own_result = _baseline_result_from_outputs(run, inputs, outputs, grid[0].costs_bps)
+
+        daily_rets, _, rebalance_turnover, _ = outputs
+        net = _net_returns_matrix(daily_rets, rebalance_turnover, [c.costs_bps for c in combos])
+        in_window = (daily_rets.index >= pd.Timestamp(run_start)) & (
+            daily_rets.index <= pd.Timestamp(run_end)
+        )
+        net = net[in_window]
+        if net.shape[0]:
+            net[0] = 0.0
+        index = daily_rets.index[in_window]
+        window_turnover = _annualize_turnover_from_rebalances(
+            _slice_series_to_run_window(rebalance_turnover, run_start, run_end),
+            periods_per_year=12.0,
+            exclude_initial=False,
+        )
+        if window_index is None:
+            window_index = pd.DatetimeIndex(index)
+            month_end = _last_of_each(
+                window_index.year.to_numpy() * 12 + window_index.month.to_numpy()
+            )
+            bench_rets = _slice_series_to_run_window(
+                inputs.prices[inputs.bench_col].pct_change().fillna(0.0), run_start, run_end
+            )
+            benchmark_curve = initial_capital * np.cumprod(
+                1.0 + bench_rets.reindex(index).fillna(0.0).to_numpy(dtype=float)
+            )
+        equity = initial_capital * np.cumprod(1.0 + net, axis=0)
+        # One kernel pass scores every cost level of the group.
+        group_metrics = metric_rows(performance_metrics(net, window_turnover))
+        for j, combo in enumerate(combos):
+            summaries[combo] = {
+                "strategy_id": combo.strategy_id,
+                "top_n": combo.top_n,
+                "costs_bps": combo.costs_bps,
+                "metrics": group_metrics[j],
+                "equity": _sweep_navs(equity[month_end, j]),
+            }
+
+    if on_progress:
+        on_progress("metrics", 78)
+    assert own_result is not None and window_index is not None and benchmark_curve is not None
+    summary = {
+        "combinations": len(grid),
+        "initial_capital": initial_capital,
+        "sampling": "month_end",
+        "dates": window_index[month_end].strftime("%Y-%m-%d").tolist(),
+        "benchmark": _sweep_navs(benchmark_curve[month_end]),
+        "results": [summaries[combo] for combo in grid],
+    }
+    return own_result, summary
+
+
+def _run_baseline_sweep(
+    io: SupabaseIO,
+    run: dict[str, Any],
+    payload: dict[str, Any] | None,
+    on_progress: ProgressCallback | None = None,
+) -> tuple[BacktestResult, dict[str, Any]]:
+    grid = _parse_sweep_grid(run, payload)
+    return _build_baseline_sweep(io, run, grid, on_progress=on_progress)
@@ -5,15 +5,25 @@ from collections import defaultdict
 import numpy as np
 import pandas as pd
 
-from factorlab_engine.turnover import annualize_turnover
+from factorlab_engine.turnover import (
+    annualize_turnover,
+    one_way_turnover,
+    rebalance_turnover_batch,
+    turnover_series_from_position_columns,
+    turnover_series_from_position_rows,
+)
 from factorlab_engine.worker import (
     _annualize_turnover_from_rebalances,
     _apply_rebalance_costs,
     _compute_metrics,
     _equal_weight,
+    _equity_rows,
     _momentum_12_1,
+    _rebalance_mask,
     _rebalance_turnover_points,
+    _slice_positions_to_run_window,
     _slice_series_to_run_window,
+    _top_n_weight_rows,
 )
 
 
@@ -69,7 +79,7 @@ def test_equal_weight_positions_sum_to_one():
     _, _, _, positions = _equal_weight(prices)
 
     totals: dict[str, float] = defaultdict(float)
-    for pos in positions:
+    for pos in positions.to_rows():
         totals[pos["date"]] += pos["weight"]
 
     assert len(totals) > 0, "No positions produced"
@@ -86,7 +96,7 @@ def test_momentum_12_1_respects_top_n():
 
     # Group positions by date
     per_date: dict[str, list[dict]] = defaultdict(list)
-    for pos in positions:
+    for pos in positions.to_rows():
         per_date[pos["date"]].append(pos)
 
     # Only check rebalance dates well after the 12-month warmup
@@ -108,7 +118,7 @@ def test_momentum_12_1_default_top_half_backward_compat():
 
     # Both calls should produce identical position snapshots
     assert len(positions_default) == len(positions_half)
-    for a, b in zip(positions_default, positions_half):
+    for a, b in zip(positions_default.to_rows(), positions_half.to_rows()):
         assert a["date"] == b["date"]
         assert a["symbol"] == b["symbol"]
         assert abs(a["weight"] - b["weight"]) < 1e-12
@@ -176,3 +186,119 @@ def test_equal_weight_turnover_excludes_warmup():
         sliced, periods_per_year=12.0, exclude_initial=False
     )
     assert abs(kpi_fixed - kpi_via_helper) < 1e-12
+
+
+def test_rebalance_mask_marks_first_trading_day_of_each_month():
+    prices = _prices(periods=70)
+    mask = _rebalance_mask(prices.index)
+    expected = prices.index.to_period("M") != prices.index.to_period("M").to_series().shift(1)
+    assert np.array_equal(mask, np.asarray(expected))
+    assert list(prices.index[mask].strftime("%Y-%m-%d")) == [
+        "2023-01-02",
+        "2023-02-01",
+        "2023-03-01",
+        "2023-04-03",
+    ]
+
+
+def test_top_n_weight_rows_breaks_ties_by_column_order():
+    values = np.array([[0.0, 0.3, 0.0, 0.0], [0.2, np.nan, 0.2, 0.1]])
+    eligible = ~np.isnan(values)
+
+    lowest = _top_n_weight_rows(values, eligible, 2, descending=False)
+    assert lowest.tolist() == [[0.5, 0.0, 0.5, 0.0], [0.5, 0.0, 0.0, 0.5]]
+
+    highest = _top_n_weight_rows(values, eligible & (values > 0), 2, descending=True)
+    assert highest.tolist() == [[0.0, 1.0, 0.0, 0.0], [0.5, 0.0, 0.5, 0.0]]
+
+
+def test_momentum_weights_apply_from_the_day_after_rebalance():
+    prices = _prices(periods=550)
+    daily_rets, _, _, positions = _momentum_12_1(prices, top_n=1)
+    asset_rets = prices.pct_change().fillna(0.0)
+
+    last_position = positions.to_rows()[-1]
+    last_rebalance = pd.Timestamp(last_position["date"])
+    held = last_position["symbol"]
+    after = prices.index[prices.index > last_rebalance]
+    if held == "_CASH":
+        assert (daily_rets.loc[after] == 0.0).all()
+    else:
+        assert np.array_equal(
+            daily_rets.loc[after].to_numpy(), asset_rets.loc[after, held].to_numpy()
+        )
+
+
+def test_rebalance_turnover_batch_drifts_previous_weights():
+    target = np.array([[0.5, 0.5, 0.0], [0.5, 0.5, 0.0], [0.0, 0.5, 0.5]])
+    rebalance_prices = np.array([[100.0, 100.0, 50.0], [150.0, 100.0, 50.0], [150.0, np.nan, 60.0]])
+
+    drifted, turnover = rebalance_turnover_batch(target, rebalance_prices)
+
+    assert drifted[0].tolist() == [0.0, 0.0, 0.0]
+    assert np.allclose(drifted[1], [0.6, 0.4, 0.0])
+    # BBB has no price on the third rebalance, so only AAA's drift survives renormalization.
+    assert np.allclose(drifted[2], [1.0, 0.0, 0.0])
+    expected = [
+        one_way_turnover(pd.Series(prev), pd.Series(curr)) for prev, curr in zip(drifted, target)
+    ]
+    assert np.allclose(turnover, expected)
+    assert np.allclose(turnover, [0.5, 0.1, 1.0])
+
+
+def test_turnover_series_from_position_columns_matches_row_form():
+    rows = [
+        {"date": "2024-02-01", "symbol": "AAA", "weight": 0.5},
+        {"date": "2024-02-01", "symbol": "BBB", "weight": 0.5},
+        {"date": "2024-01-02", "symbol": "AAA", "weight": 1.0},
+        {"date": "2024-03-01", "symbol": "CCC", "weight": 1.0},
+        {"date": "", "symbol": "AAA", "weight": 1.0},
+    ]
+    columnar = turnover_series_from_position_columns(
+        [r["date"] for r in rows], [r["symbol"] for r in rows], [r["weight"] for r in rows]
+    )
+
+    assert columnar.equals(turnover_series_from_position_rows(rows))
+    assert list(columnar.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-02-01", "2024-03-01"]
+    assert columnar.tolist() == [0.5, 0.5, 1.0]
+
+    # With nothing left after filtering, the index type matches the non-empty case.
+    empty = turnover_series_from_position_columns([""], ["AAA"], [1.0])
+    assert empty.empty and isinstance(empty.index, pd.DatetimeIndex)
+    assert isinstance(turnover_series_from_position_rows([]).index, pd.DatetimeIndex)
+
+
+def test_slice_positions_keeps_window_and_materializes_rows_once():
+    prices = _prices(periods=120)
+    _, _, _, positions = _equal_weight(prices)
+    start = prices.index[30].strftime("%Y-%m-%d")
+    end = prices.index[90].strftime("%Y-%m-%d")
+
+    window = _slice_positions_to_run_window(positions, start, end)
+    expected = [
+        {"run_id": "run-1", **row} for row in positions.to_rows() if start <= row["date"] <= end
+    ]
+
+    assert 0 < len(window) < len(positions)
+    assert window.to_rows("run-1") == expected
+
+
+def test_equity_rows_are_columnar_and_match_per_date_lookups():
+    dates = pd.bdate_range("2023-01-02", periods=30)
+    portfolio = pd.Series(np.linspace(100_000.0, 101_000.0, 30), index=dates)
+    # Benchmark starts later and arrives unsorted: only shared dates survive, ascending.
+    benchmark = pd.Series(np.linspace(1.0, 2.0, 25), index=dates[5:])[::-1]
+
+    curve = _equity_rows(dates, portfolio, benchmark)
+    expected = [
+        {
+            "date": dt.strftime("%Y-%m-%d"),
+            "portfolio": float(portfolio.loc[dt]),
+            "benchmark": float(benchmark.loc[dt]),
+        }
+        for dt in dates[5:]
+    ]
+
+    assert curve == expected
+    assert len(curve) == 25 and curve[0] == expected[0] and curve[-1] == expected[-1]
+    assert curve[20:].to_rows("run-1") == [{"run_id": "run-1", **row} for row in expected[20:]]
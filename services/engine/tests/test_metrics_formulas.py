@@ -48,8 +48,16 @@ Convention reference (cross-check with TypeScript metrics.ts):
 
 import math
 
+import numpy as np
 import pandas as pd
+import pytest
 
+from factorlab_engine.metrics import (
+    METRIC_KEYS,
+    compute_period_metrics,
+    metric_rows,
+    performance_metrics,
+)
 from factorlab_engine.worker import (
     _annualize_turnover_from_rebalances,
     _compute_metrics,
@@ -685,3 +693,78 @@ class TestMetricConventions:
         for t_val in [0.0, 0.08, 0.25, 1.5]:
             result = _compute_metrics(rets, turnover=t_val)
             assert_close(result["turnover"], t_val, abs_tol=1e-12)
+
+
+# ── Vectorized kernel ────────────────────────────────────────────────────────
+
+
+class TestMetricsKernel:
+    """performance_metrics scores many return series at once (periods down the rows)."""
+
+    def test_columns_match_single_series_metrics_exactly(self):
+        rng = np.random.default_rng(11)
+        returns = rng.normal(0.0004, 0.01, size=(300, 6))
+        returns[[0, 40], 2] = np.nan
+        returns[7, 4] = np.inf
+
+        rows = metric_rows(performance_metrics(returns, np.linspace(0.0, 0.5, 6)))
+
+        for j, row in enumerate(rows):
+            assert tuple(row) == METRIC_KEYS
+            assert row == _compute_metrics(pd.Series(returns[:, j]), turnover=0.1 * j)
+
+    def test_non_finite_returns_are_skipped_like_dropped_days(self):
+        rets = make_returns(0.01, float("nan"), -0.02, float("-inf"), 0.03, 0.005)
+        result = _compute_metrics(rets, turnover=0.0)
+        expected = _compute_metrics(make_returns(0.01, -0.02, 0.03, 0.005), turnover=0.0)
+        for key in METRIC_KEYS:
+            assert_close(result[key], expected[key], abs_tol=1e-15)
+
+    def test_series_without_returns_is_nan_and_rejected(self):
+        metrics = performance_metrics(np.array([[0.01, np.nan], [0.02, np.nan]]))
+        assert math.isnan(metrics["cagr"][1]) and not math.isnan(metrics["cagr"][0])
+        with pytest.raises(ValueError, match="No returns available"):
+            metric_rows(metrics)
+        with pytest.raises(ValueError, match="No returns available"):
+            _compute_metrics(make_returns(), turnover=0.0)
+
+
+# ── Rolling and calendar-year metrics ────────────────────────────────────────
+
+
+class TestPeriodMetrics:
+    """compute_period_metrics: prefix-sum rolling stats sampled at month ends."""
+
+    def _returns(self) -> pd.Series:
+        dates = pd.bdate_range("2019-03-01", periods=700)
+        rng = np.random.default_rng(5)
+        return pd.Series(rng.normal(0.0004, 0.01, len(dates)), index=dates)
+
+    def test_rolling_values_match_full_window_recomputation(self):
+        rets = self._returns()
+        rolling = compute_period_metrics(rets)["rolling"]
+        equity = (1.0 + rets).cumprod()
+
+        assert rolling["dates"][0] == "2020-02-28"  # first month end with 252 days behind it
+        for date, sharpe, vol, drawdown in zip(
+            rolling["dates"], rolling["sharpe"], rolling["volatility"], rolling["drawdown"]
+        ):
+            end = rets.index.get_loc(pd.Timestamp(date))
+            window = rets.iloc[end - 251 : end + 1]
+            assert_close(sharpe, window.mean() / window.std(ddof=0) * math.sqrt(252), 1e-6)
+            assert_close(vol, window.std(ddof=0) * math.sqrt(252), 1e-6)
+            peak = equity.iloc[end - 251 : end + 1].max()
+            assert_close(drawdown, equity.iloc[end] / peak - 1.0, 1e-6)
+
+    def test_calendar_years_compound_each_years_returns(self):
+        rets = self._returns()
+        years = compute_period_metrics(rets)["calendar_years"]
+
+        assert years["years"] == [2019, 2020, 2021]
+        assert sum(years["days"]) == len(rets)
+        for year, ret in zip(years["years"], years["returns"]):
+            assert_close(ret, (1.0 + rets[rets.index.year == year]).prod() - 1.0, 1e-6)
+
+    def test_short_history_has_no_rolling_points(self):
+        period = compute_period_metrics(self._returns().iloc[:100])
+        assert period["rolling"]["dates"] == [] and period["calendar_years"]["years"] == [2019]
@@ -132,6 +132,93 @@ def test_target_is_next_day_return_alignment():
     assert np.isclose(float(sample["target_return"]), expected, atol=1e-12)
 
 
+def test_stacked_features_are_date_ticker_sorted_and_masked_like_dropna():
+    from factorlab_engine.ml_features import _sort_ml_rows, stack_daily_features
+    from factorlab_engine.ml_validation import prepare_model_rows
+
+    prices = _make_prices(n_months=24, n_assets=4)[["T3", "SPY", "T0", "T2", "T1"]]
+    prices.loc[: prices.index[100], "T2"] = np.nan
+
+    features = stack_daily_features(prices, benchmark_ticker="SPY")
+    assert features.tickers == ["T0", "T1", "T2", "T3"]
+    assert features.date_code.dtype == np.int32 and features.ticker_code.dtype == np.int32
+    keys = features.date_code.astype(np.int64) * len(features.tickers) + features.ticker_code
+    assert np.all(np.diff(keys) == 1)  # one row per (date, ticker), already sorted
+
+    compact = stack_daily_features(prices, benchmark_ticker="SPY", dtype=np.float32)
+    assert compact.values.dtype == np.float32
+    np.testing.assert_allclose(compact.values, features.values, rtol=1e-6, equal_nan=True)
+
+    model_rows, _, all_tickers = prepare_model_rows(
+        features=features, prices=prices, start_date="2016-01-01", end_date="2016-06-30"
+    )
+    expected = compute_daily_features(prices, benchmark_ticker="SPY")
+    expected["target_date"] = expected["date"].map(
+        pd.Series(prices.index[1:], index=prices.index[:-1])
+    )
+    expected = _sort_ml_rows(
+        expected.dropna(subset=FEATURE_COLUMNS + ["target_return", "target_date"])
+    )
+    assert all_tickers == ["T0", "T1", "T2", "T3"]
+    pd.testing.assert_frame_equal(
+        model_rows.astype({"ticker": object}), expected.astype({"ticker": object})
+    )
+
+
+def test_feature_store_serves_seen_tickers_and_recomputes_changed_prices(
+    monkeypatch: pytest.MonkeyPatch, tmp_path, capsys
+):
+    from factorlab_engine import ml_feature_store
+
+    prices = _make_prices(n_months=60, n_assets=4)
+    prices.loc[: prices.index[300], "T2"] = np.nan  # listed inside the first window
+    monkeypatch.setattr(ml_feature_store, "_FEATURE_STORE_DIR", str(tmp_path))
+
+    def _check(frame: pd.DataFrame) -> str:
+        monkeypatch.setattr(ml_feature_store, "_FEATURE_STORE_DIR", "")
+        expected = compute_daily_features(frame, benchmark_ticker="SPY")
+        monkeypatch.setattr(ml_feature_store, "_FEATURE_STORE_DIR", str(tmp_path))
+        capsys.readouterr()
+        got = compute_daily_features(frame, benchmark_ticker="SPY")
+        # Rolling std/cov over a longer stored history can differ in the last bits.
+        pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-12, atol=1e-15)
+        return capsys.readouterr().out
+
+    assert "served=0 computed=4" in _check(prices.iloc[100:900])
+    assert "served=4 computed=0" in _check(prices.iloc[400:800])
+    assert "served=0 computed=4" in _check(prices.iloc[500:1200])  # appended to the entries
+    assert "served=4 computed=0" in _check(prices.iloc[200:1100])
+
+    revised = prices.copy()
+    revised.iloc[600, 1] *= 1.01  # a corrected T1 close invalidates only T1
+    assert "served=3 computed=1" in _check(revised.iloc[200:1100])
+
+
+def test_feature_store_evicts_least_recently_used_entries_past_its_size_bound(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+):
+    import os
+
+    from factorlab_engine import ml_feature_store
+
+    prices = _make_prices(n_months=24, n_assets=3)
+    monkeypatch.setattr(ml_feature_store, "_FEATURE_STORE_DIR", str(tmp_path))
+    compute_daily_features(prices[["T0", "T1", "SPY"]], benchmark_ticker="SPY")
+    files = {path.name.split("__")[0]: path for path in tmp_path.glob("*.npz")}
+    assert sorted(files) == ["T0", "T1"]
+    for age, ticker in enumerate(["T0", "T1"]):
+        stamp = files[ticker].stat().st_mtime - 600 + age
+        os.utime(files[ticker], (stamp, stamp))
+
+    # Serving T0 refreshes it, so storing T2 pushes the now least recent T1 out.
+    size = max(path.stat().st_size for path in files.values())
+    monkeypatch.setattr(ml_feature_store, "_FEATURE_STORE_MAX_BYTES", int(size * 2.5))
+    compute_daily_features(prices[["T0", "T2", "SPY"]], benchmark_ticker="SPY")
+
+    remaining = sorted(path.name.split("__")[0] for path in tmp_path.glob("*.npz"))
+    assert remaining == ["T0", "T2"]
+
+
 # ── run_walk_forward ──────────────────────────────────────────────────────────
 
 
@@ -217,6 +304,38 @@ def test_walk_forward_validates_recent_training_window_not_full_warmup_history()
     assert model_params.get("avg_symbols_per_day", 0) >= 5.0
 
 
+def test_walk_forward_store_slices_match_date_masks():
+    """searchsorted row ranges must select exactly the rows the per-step masks did."""
+    from factorlab_engine.ml_features import _feature_matrix, _sort_ml_rows
+    from factorlab_engine.ml_store import WalkForwardStore
+
+    prices = _make_prices(n_months=24, n_assets=4)
+    rows = _sort_ml_rows(
+        compute_daily_features(prices, benchmark_ticker="SPY").dropna(
+            subset=FEATURE_COLUMNS + ["target_return"]
+        )
+    )
+    rows["target_date"] = rows["date"] + pd.Timedelta(days=1)
+    store = WalkForwardStore.from_rows(rows)
+
+    as_of = pd.Timestamp(store.dates[200])
+    window_start = as_of - pd.Timedelta(days=365)
+    lo, hi = store.row_range(store.date_index(window_start), store.date_index(as_of))
+    expected = rows[(rows["date"] >= window_start) & (rows["date"] < as_of)]
+    pd.testing.assert_frame_equal(
+        store.feature_frame(lo, hi), _feature_matrix(expected).reset_index(drop=True)
+    )
+    assert np.array_equal(store.target_return[lo:hi], expected["target_return"].to_numpy())
+
+    k = store.date_index(as_of)
+    lo, hi = store.row_range(k, k + 1)
+    expected = rows[rows["date"] == as_of]
+    assert store.tickers[lo:hi].tolist() == expected["ticker"].tolist()
+    pd.testing.assert_frame_equal(
+        store.feature_frame(lo, hi), _feature_matrix(expected).reset_index(drop=True)
+    )
+
+
 def test_positions_match_selected_predictions():
     """Position weights must align with selected prediction weights."""
     prices = _make_prices(n_months=72, n_assets=6)
@@ -241,6 +360,41 @@ def test_positions_match_selected_predictions():
         assert np.isclose(positions[key], float(row["weight"]), atol=1e-12)
 
 
+def test_walk_forward_outputs_keep_only_recent_prediction_days():
+    from factorlab_engine.ml_outputs import WalkForwardOutputs
+    from factorlab_engine.ml_store import WalkForwardStore
+
+    n_days, tickers = 25, ["AAA", "BBB", "CCC"]
+    dates = pd.bdate_range("2024-01-01", periods=n_days)
+    store = WalkForwardStore(
+        dates=dates.to_numpy(),
+        offsets=np.arange(0, 3 * n_days + 1, 3, dtype=np.int64),
+        tickers=np.array(tickers * n_days, dtype=object),
+        features=np.zeros((len(FEATURE_COLUMNS), 3 * n_days)),
+        target_return=np.arange(3 * n_days, dtype=float) / 100.0,
+        benchmark_return=np.repeat(np.arange(n_days, dtype=float), 3),
+        target_date=np.repeat((dates + pd.Timedelta(days=1)).to_numpy(), 3),
+    )
+    outputs = WalkForwardOutputs(store, n_days, top_n=2, prediction_days=3)
+    for day in range(n_days):
+        preds = np.array([0.1, 0.3, 0.3])  # BBB/CCC tie; ticker order breaks it
+        outputs.record(dates[day], 3 * day, preds, 3 * day + np.array([1, 2]), float(day))
+
+    predictions = outputs.prediction_rows("run", "ml_ridge")
+    assert sorted({r["as_of_date"] for r in predictions}) == [
+        d.strftime("%Y-%m-%d") for d in dates[-3:]
+    ]
+    assert [r["ticker"] for r in predictions[:3]] == ["BBB", "CCC", "AAA"]
+    assert [r["selected"] for r in predictions[:3]] == [True, True, False]
+    assert [r["weight"] for r in predictions[:3]] == [0.5, 0.5, 0.0]
+    assert predictions[0]["realized_return"] == store.target_return[3 * 22 + 1]
+
+    positions = outputs.position_rows("run")
+    assert len(positions) == 2 * n_days
+    assert positions[0] == {"run_id": "run", "date": "2024-01-02", "symbol": "BBB", "weight": 0.5}
+    assert outputs.benchmark.tolist() == [float(day) for day in range(n_days)]
+
+
 def test_walk_forward_invokes_progress_callback():
     prices = _make_prices(n_months=72, n_assets=6)
     progress_calls: list[tuple[int, int]] = []
@@ -261,6 +415,137 @@ def test_walk_forward_invokes_progress_callback():
     assert progress_calls[-1][0] == progress_calls[-1][1]
 
 
+def test_incremental_ridge_matches_sklearn_pipeline(monkeypatch: pytest.MonkeyPatch):
+    """Rolling sufficient statistics must reproduce the StandardScaler+Ridge predictions."""
+    prices = _make_prices(n_months=72, n_assets=6)
+    kwargs = dict(
+        strategy="ml_ridge",
+        prices=prices,
+        start_date="2019-01-01",
+        end_date="2020-06-30",
+        benchmark_ticker="SPY",
+        top_n=2,
+        cost_bps=5.0,
+    )
+    monkeypatch.setenv("ML_REFIT_FREQ_DAYS", "1")
+    reference = run_walk_forward(run_id="test-ridge-sklearn", **kwargs)
+    monkeypatch.setenv("ML_INCREMENTAL_RIDGE", "1")
+    incremental = run_walk_forward(run_id="test-ridge-sklearn", **kwargs)
+
+    assert incremental.metadata["model_params"]["incremental_ridge"] is True
+    assert len(incremental.prediction_rows) == len(reference.prediction_rows)
+    for inc_row, ref_row in zip(incremental.prediction_rows, reference.prediction_rows):
+        assert (inc_row["as_of_date"], inc_row["ticker"]) == (
+            ref_row["as_of_date"],
+            ref_row["ticker"],
+        )
+        assert np.isclose(inc_row["predicted_return"], ref_row["predicted_return"], rtol=1e-9)
+    assert incremental.position_rows == reference.position_rows
+    for name, value in reference.metadata["feature_importance"].items():
+        assert np.isclose(incremental.metadata["feature_importance"][name], value, rtol=1e-9)
+
+
+def test_float32_pipeline_halves_feature_memory_and_tracks_float64(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    prices = _make_prices(n_months=72, n_assets=6)
+    kwargs = dict(
+        run_id="test-float32",
+        strategy="ml_ridge",
+        prices=prices,
+        start_date="2019-01-01",
+        end_date="2020-06-30",
+        benchmark_ticker="SPY",
+        top_n=2,
+        cost_bps=5.0,
+    )
+    reference = run_walk_forward(**kwargs)
+    monkeypatch.setenv("ML_FLOAT32", "1")
+    reduced = run_walk_forward(**kwargs)
+
+    ref_memory = reference.metadata["model_params"]["memory"]
+    memory = reduced.metadata["model_params"]["memory"]
+    assert ref_memory["feature_dtype"] == "float64"
+    assert memory["feature_dtype"] == "float32"
+    assert memory["stage_data_mb"]["prices"] == ref_memory["stage_data_mb"]["prices"]
+    for stage in ("features", "train_store"):
+        assert memory["stage_data_mb"][stage] < ref_memory["stage_data_mb"][stage]
+
+    assert len(reduced.prediction_rows) == len(reference.prediction_rows)
+    predicted = np.array([row["predicted_return"] for row in reduced.prediction_rows])
+    expected = np.array([row["predicted_return"] for row in reference.prediction_rows])
+    assert np.allclose(predicted, expected, rtol=1e-3, atol=1e-6)
+
+
+def test_parallel_refits_match_sequential_walk_forward(monkeypatch: pytest.MonkeyPatch):
+    prices = _make_prices(n_months=72, n_assets=6)
+    kwargs = dict(
+        run_id="test-parallel-refits",
+        strategy="ml_ridge",
+        prices=prices,
+        start_date="2019-01-01",
+        end_date="2020-06-30",
+        benchmark_ticker="SPY",
+        top_n=2,
+        cost_bps=5.0,
+    )
+    monkeypatch.setenv("ML_REFIT_FREQ_DAYS", "21")
+    sequential = run_walk_forward(**kwargs)
+    monkeypatch.setenv("ML_REFIT_WORKERS", "2")
+    parallel = run_walk_forward(**kwargs)
+
+    assert parallel.metadata["model_params"]["refit_workers"] == 2
+    assert parallel.prediction_rows == sequential.prediction_rows
+    assert parallel.position_rows == sequential.position_rows
+    assert parallel.equity_rows == sequential.equity_rows
+    assert parallel.metrics == sequential.metrics
+    assert parallel.metadata["feature_importance"] == sequential.metadata["feature_importance"]
+
+
+def test_batched_walk_forward_matches_individual_runs():
+    from factorlab_engine.ml import MLModelSpec, run_walk_forward_batch
+
+    prices = _make_prices(n_months=72, n_assets=6)
+    window = dict(
+        prices=prices,
+        start_date="2019-01-01",
+        end_date="2020-06-30",
+        benchmark_ticker="SPY",
+    )
+    specs = [
+        MLModelSpec(run_id="batch-ridge", strategy="ml_ridge", top_n=2, cost_bps=5.0),
+        MLModelSpec(run_id="batch-lgbm", strategy="ml_lightgbm", top_n=3, cost_bps=5.0),
+        MLModelSpec(
+            run_id="batch-ridge-wide",
+            strategy="ml_ridge",
+            top_n=3,
+            cost_bps=20.0,
+            initial_capital=50_000.0,
+        ),
+    ]
+    progress: list[tuple[int, int]] = []
+    batch = run_walk_forward_batch(
+        specs, progress_cb=lambda done, total: progress.append((done, total)), **window
+    )
+
+    assert len(batch) == len(specs)
+    assert progress and progress[-1][0] == progress[-1][1]
+    for spec, artifacts in zip(specs, batch):
+        alone = run_walk_forward(
+            run_id=spec.run_id,
+            strategy=spec.strategy,
+            top_n=spec.top_n,
+            cost_bps=spec.cost_bps,
+            initial_capital=spec.initial_capital,
+            **window,
+        )
+        assert artifacts.equity_rows == alone.equity_rows
+        assert artifacts.metrics == alone.metrics
+        assert artifacts.prediction_rows == alone.prediction_rows
+        assert artifacts.position_rows == alone.position_rows
+        assert artifacts.metadata == alone.metadata
+
+
 def test_ml_ridge_turnover_matches_position_history_annualized_at_252():
     prices = _make_prices(n_months=72, n_assets=6)
     result = run_walk_forward(
@@ -359,6 +644,61 @@ def test_lightgbm_repeatability_same_deployment():
     assert isinstance(model_params_a.get("deterministic_model_params"), dict)
 
 
+@_requires_lgbm
+def test_lightgbm_dataset_reuse_reproduces_regressor_fit(monkeypatch: pytest.MonkeyPatch):
+    """The first reused-dataset fit bins and trains exactly like LGBMRegressor."""
+    prices = _make_prices(n_months=72, n_assets=6, seed=7)
+    kwargs = dict(
+        run_id="test-lgbm-reuse",
+        strategy="ml_lightgbm",
+        prices=prices,
+        start_date="2019-01-01",
+        end_date="2020-06-30",
+        benchmark_ticker="SPY",
+        top_n=3,
+        cost_bps=10.0,
+    )
+    monkeypatch.setenv("ML_REFIT_FREQ_DAYS", "10000")  # one fit, on the bin window itself
+    reference = run_walk_forward(**kwargs)
+    monkeypatch.setenv("ML_LIGHTGBM_DATASET_REUSE", "1")
+    reused = run_walk_forward(**kwargs)
+
+    assert reused.prediction_rows == reference.prediction_rows
+    assert reused.position_rows == reference.position_rows
+    assert reused.metadata["feature_importance"] == reference.metadata["feature_importance"]
+    assert reference.metadata["model_params"]["lightgbm_training"] == {"mode": "refit_per_window"}
+    training = reused.metadata["model_params"]["lightgbm_training"]
+    assert training["mode"] == "dataset_reuse"
+    assert training["full_refits"] == 1
+
+
+@_requires_lgbm
+def test_lightgbm_warm_start_is_repeatable_and_recorded(monkeypatch: pytest.MonkeyPatch):
+    prices = _make_prices(n_months=72, n_assets=6, seed=7)
+    kwargs = dict(
+        run_id="test-lgbm-warm-start",
+        strategy="ml_lightgbm",
+        prices=prices,
+        start_date="2019-01-01",
+        end_date="2020-06-30",
+        benchmark_ticker="SPY",
+        top_n=3,
+        cost_bps=10.0,
+    )
+    monkeypatch.setenv("ML_REFIT_FREQ_DAYS", "21")
+    monkeypatch.setenv("ML_LIGHTGBM_WARM_START_TREES", "25")
+    result_a = run_walk_forward(**kwargs)
+    result_b = run_walk_forward(**kwargs)
+
+    _assert_repeatable_results(result_a, result_b, expected_impl="lightgbm")
+    training = result_a.metadata["model_params"]["lightgbm_training"]
+    assert training["mode"] == "dataset_reuse"
+    assert training["warm_start_trees"] == 25
+    assert training["warm_start_refits"] > 0
+    assert training["full_refits"] >= 1
+    assert training["final_num_trees"] <= training["max_trees"]
+
+
 @_requires_lgbm
 def test_metrics_sanity():
     prices = _make_prices(n_months=72, n_assets=6)
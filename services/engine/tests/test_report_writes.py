@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import json
+import threading
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from factorlab_engine.supabase_io import SupabaseIO
+
+
+class _Result:
+    def __init__(self, data: Any = None) -> None:
+        self.data = data
+
+
+class _WriteTable:
+    def __init__(self, name: str, calls: list[tuple[str, str, Any]]) -> None:
+        self._name = name
+        self._calls = calls
+        self._op: tuple[str, Any] = ("select", None)
+
+    def delete(self) -> _WriteTable:
+        self._op = ("delete", None)
+        return self
+
+    def insert(self, rows: list[dict[str, Any]]) -> _WriteTable:
+        self._op = ("insert", rows)
+        return self
+
+    def update(self, values: dict[str, Any]) -> _WriteTable:
+        self._op = ("update", values)
+        return self
+
+    def eq(self, column: str, value: Any) -> _WriteTable:
+        return self
+
+    def execute(self) -> _Result:
+        self._calls.append((self._name, *self._op))
+        return _Result()
+
+
+class _WriteClient:
+    def __init__(self, rpc_error: Exception | None = None) -> None:
+        self.calls: list[tuple[str, str, Any]] = []
+        self.rpc_calls: list[tuple[str, dict[str, Any]]] = []
+        self._rpc_error = rpc_error
+
+    def table(self, name: str) -> _WriteTable:
+        return _WriteTable(name, self.calls)
+
+    def rpc(self, fn: str, params: dict[str, Any]) -> Any:
+        # PostgREST sends params as JSON; round-trip them the same way.
+        self.rpc_calls.append((fn, json.loads(json.dumps(params))))
+        if self._rpc_error is not None:
+            raise self._rpc_error
+        return SimpleNamespace(execute=lambda: _Result(len(params["p_payload"])))
+
+
+def _io(client: _WriteClient) -> SupabaseIO:
+    io = object.__new__(SupabaseIO)
+    io.client = client  # type: ignore[assignment]
+    return io
+
+
+def _decode(run_id: str, payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Mirror of run_rows_column: expand dictionary columns and zip the arrays into rows."""
+    columns = {}
+    for name, column in payload["columns"].items():
+        if isinstance(column, dict):
+            column = [column["dict"][code] for code in column["codes"]]
+        assert len(column) == payload["rows"]
+        columns[name] = column
+    return [
+        {"run_id": run_id, **{name: values[i] for name, values in columns.items()}}
+        for i in range(payload["rows"])
+    ]
+
+
+def _run_rows(run_id: str) -> dict[str, list[dict[str, Any]]]:
+    dates = ["2021-01-04", "2021-01-05", "2021-01-06"]
+    return {
+        "equity_curve": [
+            {"run_id": run_id, "date": d, "portfolio": 100_000.0 + i / 3, "benchmark": 1e5}
+            for i, d in enumerate(dates)
+        ],
+        "model_predictions": [
+            {
+                "run_id": run_id,
+                "model_name": "ridge",
+                "as_of_date": d,
+                "target_date": dates[-1],
+                "ticker": ticker,
+                "predicted_return": 0.01 * rank - 1e-7,
+                "realized_return": None if d == dates[-1] else -0.125,
+                "rank": rank,
+                "selected": rank == 1,
+                "weight": 1.0 if rank == 1 else 0.0,
+            }
+            for d in dates
+            for rank, ticker in enumerate(["AAA", "BBB"], start=1)
+        ],
+        "positions": [
+            {"run_id": run_id, "date": d, "symbol": s, "weight": 0.5}
+            for d in dates[:2]
+            for s in ("AAA", "BBB")
+        ],
+    }
+
+
+def test_replace_run_rows_sends_one_columnar_rpc_per_table() -> None:
+    client = _WriteClient()
+    io = _io(client)
+    tables = _run_rows("run-1")
+
+    for table, rows in tables.items():
+        io._replace_run_rows(table, "run-1", rows)
+
+    assert client.calls == []
+    assert [fn for fn, _ in client.rpc_calls] == [
+        "replace_equity_curve",
+        "replace_model_predictions",
+        "replace_positions",
+    ]
+    for (table, rows), (_, params) in zip(tables.items(), client.rpc_calls):
+        assert params["p_run_id"] == "run-1"
+        assert _decode("run-1", params["p_payload"]) == rows
+    predictions = client.rpc_calls[1][1]["p_payload"]["columns"]
+    assert predictions["ticker"] == {"dict": ["AAA", "BBB"], "codes": [0, 1] * 3}
+
+
+def test_replace_run_rows_falls_back_to_chunks_when_rpc_missing() -> None:
+    client = _WriteClient(
+        RuntimeError("Could not find the function public.replace_positions in the schema cache")
+    )
+    io = _io(client)
+    rows = _run_rows("run-1")["positions"]
+
+    io._replace_positions("run-1", rows, chunk_size=3)
+    io._replace_positions("run-1", rows, chunk_size=3)
+
+    assert len(client.rpc_calls) == 1
+    chunked = [
+        ("positions", "delete", None),
+        ("positions", "insert", rows[:3]),
+        ("positions", "insert", rows[3:]),
+    ]
+    assert client.calls == chunked * 2
+
+
+@pytest.mark.parametrize("reason", ["disabled", "extra_column", "other_run"])
+def test_replace_run_rows_keeps_chunks_for_rows_the_rpc_cannot_take(monkeypatch, reason) -> None:
+    from factorlab_engine.repositories import run_rows
+
+    rows = _run_rows("run-1")["equity_curve"]
+    if reason == "disabled":
+        monkeypatch.setattr(run_rows, "_RUN_ROWS_RPC", False)
+    elif reason == "extra_column":
+        rows[0] = {**rows[0], "note": "x"}
+    else:
+        rows[0] = {**rows[0], "run_id": "run-2"}
+    client = _WriteClient()
+
+    _io(client)._replace_equity_curve("run-1", rows)
+
+    assert client.rpc_calls == []
+    assert client.calls == [
+        ("equity_curve", "delete", None),
+        ("equity_curve", "insert", rows),
+    ]
+
+
+def test_replace_run_rows_falls_back_to_chunks_after_rpc_statement_timeout() -> None:
+    client = _WriteClient(
+        RuntimeError("{'message': 'canceling statement due to statement timeout', 'code': '57014'}")
+    )
+    io = _io(client)
+    rows = _run_rows("run-1")["model_predictions"]
+
+    io._replace_model_predictions("run-1", rows, chunk_size=4)
+    io._replace_model_predictions("run-1", rows, chunk_size=4)
+
+    # The rolled-back RPC is not re-sent as is, and stays enabled for the next run.
+    assert [fn for fn, _ in client.rpc_calls] == ["replace_model_predictions"] * 2
+    chunked = [
+        ("model_predictions", "delete", None),
+        ("model_predictions", "insert", rows[:4]),
+        ("model_predictions", "insert", rows[4:]),
+    ]
+    assert client.calls == chunked * 2
+
+
+def test_replace_run_rows_splits_row_sets_above_the_rpc_bound(monkeypatch) -> None:
+    from factorlab_engine.repositories import run_rows
+
+    monkeypatch.setattr(run_rows, "_RUN_ROWS_RPC_MAX_ROWS", 4)
+    client = _WriteClient()
+    io = _io(client)
+    tables = _run_rows("run-1")
+
+    io._replace_model_predictions("run-1", tables["model_predictions"])
+    io._replace_positions("run-1", tables["positions"])
+
+    assert client.calls == []
+    assert [(fn, params.get("p_replace")) for fn, params in client.rpc_calls] == [
+        ("replace_model_predictions", None),
+        ("replace_model_predictions", False),
+        ("replace_positions", None),
+    ]
+    sent = [_decode("run-1", params["p_payload"]) for _, params in client.rpc_calls[:2]]
+    assert [len(rows) for rows in sent] == [4, 2]
+    assert sent[0] + sent[1] == tables["model_predictions"]
+
+
+def test_replace_run_rows_redoes_a_split_write_in_chunks_after_a_timeout(monkeypatch) -> None:
+    from factorlab_engine.repositories import run_rows
+
+    class _TimeoutOnAppend(_WriteClient):
+        def rpc(self, fn: str, params: dict[str, Any]) -> Any:
+            if params.get("p_replace") is False:
+                self._rpc_error = RuntimeError("canceling statement due to statement timeout")
+            return super().rpc(fn, params)
+
+    monkeypatch.setattr(run_rows, "_RUN_ROWS_RPC_MAX_ROWS", 4)
+    client = _TimeoutOnAppend()
+    rows = _run_rows("run-1")["model_predictions"]
+
+    _io(client)._replace_model_predictions("run-1", rows, chunk_size=4)
+
+    # The first slice was committed, so the chunked path deletes it before re-inserting.
+    assert len(client.rpc_calls) == 2
+    assert client.calls == [
+        ("model_predictions", "delete", None),
+        ("model_predictions", "insert", rows[:4]),
+        ("model_predictions", "insert", rows[4:]),
+    ]
+
+
+def test_replace_run_rows_propagates_other_rpc_errors() -> None:
+    client = _WriteClient(RuntimeError("permission denied for table equity_curve"))
+
+    with pytest.raises(RuntimeError, match="permission denied"):
+        _io(client)._replace_equity_curve("run-1", _run_rows("run-1")["equity_curve"])
+    assert client.calls == []
+
+
+def _save_success_io(monkeypatch, client: _WriteClient, write: Any) -> tuple[SupabaseIO, list[str]]:
+    from factorlab_engine.repositories import reports
+
+    monkeypatch.setattr(reports, "_PERSIST_WRITE_CONCURRENCY", 6)
+    io = _io(client)
+    written: list[str] = []
+    for name in (
+        "_replace_equity_curve",
+        "_upsert_metrics",
+        "_upsert_features_monthly",
+        "_replace_model_predictions",
+        "_replace_model_metadata",
+        "_replace_positions",
+    ):
+
+        def _write(*args: Any, name: str = name) -> None:
+            write(name)
+            written.append(name)
+
+        monkeypatch.setattr(io, name, _write)
+    monkeypatch.setattr(io, "_sync_backtest_notification", lambda *args, **kwargs: None)
+    return io, written
+
+
+def _save(io: SupabaseIO) -> None:
+    from factorlab_engine.repositories.client import Job
+
+    rows = _run_rows("run-1")
+    io.save_success(
+        job=Job(id="job-1", run_id="run-1", name="job"),
+        duration_seconds=3,
+        metrics={},
+        equity_rows=iter(rows["equity_curve"]),
+        feature_rows=[{"ticker": "AAA"}],
+        prediction_rows=rows["model_predictions"],
+        model_metadata={"run_id": "run-1"},
+        position_rows=rows["positions"],
+    )
+
+
+def test_save_success_writes_tables_concurrently_then_finalizes_run_before_job(
+    monkeypatch,
+) -> None:
+    client = _WriteClient()
+    # Every write waits for all six, so this only completes if they run at once.
+    barrier = threading.Barrier(6, timeout=5)
+    io, written = _save_success_io(monkeypatch, client, lambda name: barrier.wait())
+
+    _save(io)
+
+    assert len(written) == 6
+    assert [(table, op) for table, op, _ in client.calls] == [
+        ("runs", "update"),
+        ("jobs", "update"),
+    ]
+    runs_update = client.calls[0][2]
+    assert runs_update == {
+        "status": "completed",
+        "executed_start_date": "2021-01-04",
+        "executed_end_date": "2021-01-06",
+    }
+    assert client.calls[1][2]["status"] == "completed"
+
+
+def test_save_success_failed_write_lets_others_finish_and_skips_finalization(
+    monkeypatch,
+) -> None:
+    def _write(name: str) -> None:
+        if name == "_replace_model_predictions":
+            raise RuntimeError("insert failed")
+
+    client = _WriteClient()
+    io, written = _save_success_io(monkeypatch, client, _write)
+
+    with pytest.raises(RuntimeError, match="insert failed"):
+        _save(io)
+
+    assert len(written) == 5
+    assert client.calls == []
+
+
+def test_equity_columns_stream_into_the_bulk_writer_and_chunked_fallback() -> None:
+    from factorlab_engine.equity_columns import EquityColumns
+
+    rows = _run_rows("run-1")["equity_curve"]
+    curve = EquityColumns.from_rows(rows)
+    client = _WriteClient()
+
+    _io(client)._replace_equity_curve("run-1", curve)
+
+    ((fn, params),) = client.rpc_calls
+    assert fn == "replace_equity_curve"
+    assert params["p_payload"] == {
+        "rows": 3,
+        "columns": {
+            "date": [row["date"] for row in rows],
+            "portfolio": [row["portfolio"] for row in rows],
+            "benchmark": [row["benchmark"] for row in rows],
+        },
+    }
+
+    missing = _WriteClient(RuntimeError("function public.replace_equity_curve does not exist"))
+    _io(missing)._replace_equity_curve("run-1", curve, chunk_size=2)
+    assert missing.calls == [
+        ("equity_curve", "delete", None),
+        ("equity_curve", "insert", rows[:2]),
+        ("equity_curve", "insert", rows[2:]),
+    ]
+
+
+def test_interrupted_persist_drains_running_writes_and_skips_queued_ones(monkeypatch) -> None:
+    import time
+
+    from factorlab_engine.repositories import reports
+
+    class _Interrupt(Exception):
+        pass
+
+    monkeypatch.setattr(reports, "_PERSIST_WRITE_CONCURRENCY", 2)
+    started = threading.Barrier(3, timeout=5)
+    done: list[str] = []
+
+    def _slow(name: str) -> Any:
+        def _write() -> None:
+            started.wait()
+            time.sleep(0.2)
+            done.append(name)
+
+        return _write
+
+    real_wait = reports.wait
+    calls = iter(range(2))
+
+    def _wait(futures: Any, timeout: float | None = None) -> Any:
+        # The persist SIGALRM fires while save_success waits on the pool.
+        if next(calls) == 0:
+            started.wait()
+            raise _Interrupt("persist timeout")
+        return real_wait(futures, timeout=timeout)
+
+    monkeypatch.setattr(reports, "wait", _wait)
+
+    with pytest.raises(_Interrupt):
+        reports._run_writes([_slow("equity"), _slow("predictions"), lambda: done.append("late")])
+
+    # Both running writes finished before the interrupt propagated; the queued one never ran.
+    assert sorted(done) == ["equity", "predictions"]
+    time.sleep(0.1)
+    assert "late" not in done
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from factorlab_engine.selection import top_n_mask, top_n_order
+
+
+def _sorted_top_n(values: np.ndarray, eligible: np.ndarray, top_n: int, descending: bool):
+    """Reference: full stable sort per row, ineligible entries last."""
+    keys = np.where(eligible, -values if descending else values, 0.0)
+    order = np.lexsort((keys, ~eligible), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(values.shape[1])[None, :], axis=1)
+    return eligible & (ranks < top_n)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("top_n", [1, 3, 7, 12])
+def test_top_n_mask_matches_full_sort_with_ties(descending: bool, top_n: int):
+    rng = np.random.default_rng(7)
+    # Few distinct values so most cutoffs fall inside a tie.
+    values = rng.integers(-3, 4, size=(200, 12)).astype(float)
+    values[rng.random(values.shape) < 0.05] = np.inf
+    values[rng.random(values.shape) < 0.05] = -np.inf
+    eligible = rng.random(values.shape) < 0.8
+
+    expected = _sorted_top_n(values, eligible, top_n, descending)
+    selected = top_n_mask(values, top_n, descending=descending, eligible=eligible)
+    assert np.array_equal(selected, expected)
+
+
+def test_top_n_order_ranks_best_first_with_position_tie_break():
+    values = np.array([0.2, 0.5, np.nan, 0.5, 0.1, 0.5])
+    assert top_n_order(values, 2, descending=True).tolist() == [1, 3]
+    assert top_n_order(values, 4, descending=True).tolist() == [1, 3, 5, 0]
+    assert top_n_order(values, 10, descending=True).tolist() == [1, 3, 5, 0, 4]
+    assert top_n_order(values, 2, descending=False).tolist() == [4, 0]
+
+    finite = np.random.default_rng(3).normal(size=50).round(1)
+    order = top_n_order(finite, len(finite), descending=True)
+    assert order.tolist() == np.argsort(-finite, kind="stable").tolist()
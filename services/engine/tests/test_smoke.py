@@ -18,7 +18,11 @@ import pandas as pd
 import pytest
 
 from factorlab_engine.ml import run_walk_forward
-from factorlab_engine.worker import _build_baseline_result
+from factorlab_engine.worker import (
+    _build_baseline_result,
+    _build_baseline_sweep,
+    _parse_sweep_grid,
+)
 
 # ---------------------------------------------------------------------------
 # LightGBM availability check
@@ -559,3 +563,67 @@ def test_momentum_12_1_emits_all_cash_sentinel(monkeypatch):
     for row in real_rows:
         assert row["symbol"] != _ALL_CASH_SENTINEL
         assert row["weight"] > 0.0, "Real position rows must have positive weight"
+
+
+# ---------------------------------------------------------------------------
+# Parameter sweep: one price load, results identical to standalone runs
+# ---------------------------------------------------------------------------
+
+
+def test_baseline_sweep_matches_standalone_runs(monkeypatch):
+    tickers = ["A", "B", "C", "D", "BENCH", "TLT"]
+    prices = _make_prices(tickers, start="2015-06-01", periods=1450, seed=7)
+    run = _fake_run("momentum_12_1", ["A", "B", "C", "D"], top_n=2, costs_bps=10.0)
+    io = _FakeIO(prices)
+
+    import factorlab_engine.worker as w
+
+    monkeypatch.setattr(w, "_download_prices", lambda *a, **kw: prices)
+
+    grid = _parse_sweep_grid(
+        run,
+        {
+            "strategies": ["momentum_12_1", "low_vol", "trend_filter", "equal_weight"],
+            "top_n": [1, 2],
+            "costs_bps": [0, 25],
+        },
+    )
+    assert grid[0].strategy_id == "momentum_12_1" and grid[0].costs_bps == 10.0
+    assert len(grid) == 17
+
+    own, summary = _build_baseline_sweep(io, run, grid)
+
+    assert own == _build_baseline_result(io, run)
+    assert summary["combinations"] == len(grid)
+    # Curves keep month-end NAVs only, rounded to the cent.
+    own_rows = pd.DataFrame(list(own.equity_rows))
+    month_ends = own_rows.groupby(own_rows["date"].str[:7]).tail(1).index
+    assert summary["sampling"] == "month_end"
+    assert summary["dates"] == own_rows.loc[month_ends, "date"].tolist()
+    assert summary["benchmark"] == own_rows.loc[month_ends, "benchmark"].round(2).tolist()
+    for combo, entry in zip(grid, summary["results"]):
+        standalone = _build_baseline_result(
+            io,
+            {
+                **run,
+                "strategy_id": combo.strategy_id,
+                "top_n": combo.top_n,
+                "costs_bps": combo.costs_bps,
+            },
+        )
+        assert entry["metrics"] == standalone.metrics, combo
+        portfolio = pd.Series([row["portfolio"] for row in standalone.equity_rows])
+        assert entry["equity"] == portfolio[month_ends].round(2).tolist(), combo
+
+
+def test_parse_sweep_grid_rejects_ml_strategies_and_oversized_grids(monkeypatch):
+    run = _fake_run("low_vol", ["A", "B"])
+
+    with pytest.raises(ValueError, match="baseline strategies"):
+        _parse_sweep_grid(run, {"strategies": ["ml_ridge"]})
+
+    import factorlab_engine.worker.sweep as sweep
+
+    monkeypatch.setattr(sweep, "_BASELINE_SWEEP_MAX_COMBINATIONS", 3)
+    with pytest.raises(ValueError, match="limit is 3"):
+        _parse_sweep_grid(run, {"top_n": [1, 2], "costs_bps": [0, 5]})
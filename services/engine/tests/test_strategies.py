@@ -82,7 +82,7 @@ def test_low_vol_selects_lowest_vol_asset():
     _, _, _, positions = _low_vol(prices, top_n=1)
 
     # Skip warmup period (first ~3 months); check all subsequent rebalances
-    late = [p for p in positions if p["date"] >= "2020-04-01"]
+    late = [p for p in positions.to_rows() if p["date"] >= "2020-04-01"]
     assert len(late) > 0, "No positions found after warmup"
     for pos in late:
         assert pos["symbol"] == "LOW", f"Expected 'LOW' but got '{pos['symbol']}' on {pos['date']}"
@@ -93,7 +93,7 @@ def test_low_vol_selects_two_lowest_vol_assets():
     prices = _make_known_vol_prices()
     _, _, _, positions = _low_vol(prices, top_n=2)
 
-    late = [p for p in positions if p["date"] >= "2020-04-01"]
+    late = [p for p in positions.to_rows() if p["date"] >= "2020-04-01"]
     assert len(late) > 0
     symbols_per_date: dict[str, set[str]] = defaultdict(set)
     for pos in late:
@@ -112,7 +112,7 @@ def test_low_vol_weights_sum_to_one():
     _, _, _, positions = _low_vol(prices, top_n=2)
 
     by_date: dict[str, list[dict]] = defaultdict(list)
-    for pos in positions:
+    for pos in positions.to_rows():
         by_date[pos["date"]].append(pos)
 
     for dt, rows in by_date.items():
@@ -128,7 +128,7 @@ def test_low_vol_top_n_clamped_to_universe():
     prices = _make_known_vol_prices()
     _, _, _, positions = _low_vol(prices, top_n=100)
 
-    late = [p for p in positions if p["date"] >= "2020-04-01"]
+    late = [p for p in positions.to_rows() if p["date"] >= "2020-04-01"]
     assert len(late) > 0
 
     totals: dict[str, float] = defaultdict(float)
@@ -167,7 +167,7 @@ def test_trend_filter_risk_off_when_below_sma():
 
     # Last 40 business days are deep in the decline — risk-off expected
     threshold = prices.index[-40].strftime("%Y-%m-%d")
-    late = [p for p in positions if p["date"] >= threshold]
+    late = [p for p in positions.to_rows() if p["date"] >= threshold]
     assert len(late) > 0, "No positions in the late period"
 
     for pos in late:
@@ -193,7 +193,7 @@ def test_trend_filter_risk_on_when_above_sma():
     # Window safely inside the uptrend (days 220–300), after 200-day warmup
     early_start = prices.index[220].strftime("%Y-%m-%d")
     early_end = prices.index[300].strftime("%Y-%m-%d")
-    early = [p for p in positions if early_start <= p["date"] <= early_end]
+    early = [p for p in positions.to_rows() if early_start <= p["date"] <= early_end]
     assert len(early) > 0, "No risk-on positions found in the early window"
 
     for pos in early:
@@ -219,7 +219,7 @@ def test_trend_filter_weights_sum_to_one_throughout():
     )
 
     totals: dict[str, float] = defaultdict(float)
-    for pos in positions:
+    for pos in positions.to_rows():
         totals[pos["date"]] += pos["weight"]
 
     for dt, total in totals.items():
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import base64
+import struct
+import threading
+from types import SimpleNamespace
 from typing import Any
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
+import pytest
 
 from factorlab_engine.supabase_io import SupabaseIO
 
@@ -34,6 +40,15 @@ class _JobsTable:
     def lt(self, _column: str, _value: Any) -> "_JobsTable":
         return self
 
+    def gt(self, _column: str, _value: Any) -> "_JobsTable":
+        return self
+
+    def order(self, _column: str, desc: bool = False) -> "_JobsTable":  # noqa: ARG002
+        return self
+
+    def limit(self, _count: int) -> "_JobsTable":
+        return self
+
     @property
     def not_(self) -> "_JobsTable":
         return self
@@ -70,14 +85,19 @@ class _FakeIngestClient:
 class _PricesTable:
     def __init__(self, rows: list[dict[str, Any]]) -> None:
         self._rows = rows
-        self._range = (0, len(rows) - 1)
+        self._limit = len(rows)
+
+    def _filtered(self, rows: list[dict[str, Any]]) -> "_PricesTable":
+        return _PricesTable(rows)
 
     def select(self, _fields: str) -> "_PricesTable":
         return self
 
     def eq(self, column: str, value: str) -> "_PricesTable":
-        filtered = [r for r in self._rows if r.get(column) == value]
-        return _PricesTable(filtered)
+        return self._filtered([r for r in self._rows if r.get(column) == value])
+
+    def gt(self, column: str, value: str) -> "_PricesTable":
+        return self._filtered([r for r in self._rows if r[column] > value])
 
     def in_(self, _column: str, _values: list[str]) -> "_PricesTable":
         return self
@@ -91,13 +111,12 @@ class _PricesTable:
     def order(self, _column: str, desc: bool = False) -> "_PricesTable":  # noqa: ARG002
         return self
 
-    def range(self, start: int, end: int) -> "_PricesTable":
-        self._range = (start, end)
+    def limit(self, count: int) -> "_PricesTable":
+        self._limit = count
         return self
 
     def execute(self) -> _Result:
-        start, end = self._range
-        return _Result(self._rows[start : end + 1])
+        return _Result(self._rows[: self._limit])
 
 
 class _FakePricesClient:
@@ -114,20 +133,17 @@ class _CappedPricesTable(_PricesTable):
         super().__init__(rows)
         self._cap = cap
 
-    def eq(self, column: str, value: str) -> "_CappedPricesTable":
-        filtered = [r for r in self._rows if r.get(column) == value]
-        return _CappedPricesTable(filtered, cap=self._cap)
+    def _filtered(self, rows: list[dict[str, Any]]) -> "_CappedPricesTable":
+        return _CappedPricesTable(rows, cap=self._cap)
 
     def execute(self) -> _Result:
-        start, end = self._range
-        capped_end = min(end, start + self._cap - 1)
-        return _Result(self._rows[start : capped_end + 1])
+        return _Result(self._rows[: min(self._limit, self._cap)])
 
 
 class _RetryablePricesTable:
     def __init__(self, rows: list[dict[str, Any]], failures_remaining: int = 1) -> None:
         self._rows = rows
-        self._range = (0, len(rows) - 1)
+        self._limit = len(rows)
         self.failures_remaining = failures_remaining
         self.execute_calls = 0
 
@@ -146,8 +162,8 @@ class _RetryablePricesTable:
     def order(self, _column: str, desc: bool = False) -> "_RetryablePricesTable":  # noqa: ARG002
         return self
 
-    def range(self, start: int, end: int) -> "_RetryablePricesTable":
-        self._range = (start, end)
+    def limit(self, count: int) -> "_RetryablePricesTable":
+        self._limit = count
         return self
 
     def execute(self) -> _Result:
@@ -157,8 +173,7 @@ class _RetryablePricesTable:
             raise RuntimeError(
                 "{'message': 'canceling statement due to statement timeout', 'code': '57014'}"
             )
-        start, end = self._range
-        return _Result(self._rows[start : end + 1])
+        return _Result(self._rows[: self._limit])
 
 
 class _RunsTable:
@@ -281,9 +296,10 @@ def test_requeue_due_for_retry_resets_legacy_jobs_to_ingest_stage() -> None:
     assert isinstance(payload["updated_at"], str)
 
 
-def test_requeue_due_for_retry_resets_backtest_run_to_queued() -> None:
+@pytest.mark.parametrize("job_type", ["backtest", "baseline_sweep"])
+def test_requeue_due_for_retry_resets_backtest_run_to_queued(job_type: str) -> None:
     jobs_table = _RetryJobsTable(
-        [{"id": "job-1", "attempt_count": 2, "job_type": "backtest", "run_id": "run-1"}]
+        [{"id": "job-1", "attempt_count": 2, "job_type": job_type, "run_id": "run-1"}]
     )
     runs_table = _RunsTable()
     io = object.__new__(SupabaseIO)
@@ -298,13 +314,14 @@ def test_requeue_due_for_retry_resets_backtest_run_to_queued() -> None:
     assert runs_table.update_payloads[0]["status"] == "queued"
 
 
-def test_permanently_stalled_backtest_marks_run_failed() -> None:
+@pytest.mark.parametrize("job_type", ["backtest", "baseline_sweep"])
+def test_permanently_stalled_backtest_marks_run_failed(job_type: str) -> None:
     jobs_table = _RetryJobsTable(
         [
             {
                 "id": "job-1",
                 "attempt_count": 4,
-                "job_type": "backtest",
+                "job_type": job_type,
                 "run_id": "run-1",
                 "name": "Alpha",
                 "stage": "compute_signals",
@@ -330,6 +347,24 @@ def test_permanently_stalled_backtest_marks_run_failed() -> None:
     assert calls == [("failed", jobs_table.update_payloads[0]["error_message"])]
 
 
+def test_fetch_queued_jobs_skips_run_jobs_without_run_id() -> None:
+    rows = [
+        {"id": "job-1", "name": "Backtest", "job_type": "backtest", "run_id": None},
+        {"id": "job-2", "name": "Sweep", "job_type": "baseline_sweep", "run_id": None},
+        {"id": "job-3", "name": "Sweep", "job_type": "baseline_sweep", "run_id": "run-3"},
+        {"id": "job-4", "name": "Ingest", "job_type": "data_ingest", "run_id": None},
+    ]
+    io = object.__new__(SupabaseIO)
+    io.client = _FakeClient(_RetryJobsTable(rows))
+
+    jobs = io.fetch_queued_jobs(limit=10)
+
+    assert [(job.id, job.job_type) for job in jobs] == [
+        ("job-3", "baseline_sweep"),
+        ("job-4", "data_ingest"),
+    ]
+
+
 def test_queued_too_long_backtest_stays_queued_for_immediate_claim_retry() -> None:
     jobs_table = _RetryJobsTable(
         [
@@ -745,3 +780,419 @@ def test_update_run_metadata_retries_transient_statement_timeout() -> None:
         io.update_run_metadata("run-1", {"model_impl": "ridge"})
 
     assert runs_table.update_payloads == [{"run_metadata": {"model_impl": "ridge"}}]
+
+
+class _DatedPricesTable:
+    """Prices table that honours ticker/date filters and records each page request."""
+
+    def __init__(
+        self,
+        rows: list[dict[str, Any]],
+        log: list[tuple[str, str, str]],
+        filters: dict[str, str] | None = None,
+    ) -> None:
+        self._rows = rows
+        self._log = log
+        self._filters = filters or {}
+        self._limit = len(rows)
+
+    def _narrow(self, rows: list[dict[str, Any]], **filters: str) -> "_DatedPricesTable":
+        return _DatedPricesTable(rows, self._log, {**self._filters, **filters})
+
+    def select(self, _fields: str) -> "_DatedPricesTable":
+        return self
+
+    def eq(self, column: str, value: str) -> "_DatedPricesTable":
+        return self._narrow([r for r in self._rows if r.get(column) == value], **{column: value})
+
+    def gte(self, _column: str, value: str) -> "_DatedPricesTable":
+        return self._narrow([r for r in self._rows if r["date"] >= value], gte=value)
+
+    def lte(self, _column: str, value: str) -> "_DatedPricesTable":
+        return self._narrow([r for r in self._rows if r["date"] <= value], lte=value)
+
+    def gt(self, _column: str, value: str) -> "_DatedPricesTable":
+        return self._narrow([r for r in self._rows if r["date"] > value])
+
+    def order(self, _column: str, desc: bool = False) -> "_DatedPricesTable":  # noqa: ARG002
+        return self
+
+    def limit(self, count: int) -> "_DatedPricesTable":
+        self._limit = count
+        return self
+
+    def execute(self) -> _Result:
+        self._log.append((self._filters["ticker"], self._filters["gte"], self._filters["lte"]))
+        return _Result(self._rows[: self._limit])
+
+
+class _StateTable:
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+
+    def select(self, _fields: str) -> "_StateTable":
+        return self
+
+    def eq(self, _column: str, _value: Any) -> "_StateTable":
+        return self
+
+    def in_(self, _column: str, _values: list[str]) -> "_StateTable":
+        return self
+
+    def execute(self) -> _Result:
+        return _Result([dict(r) for r in self.rows])
+
+
+class _CachedPricesClient:
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.price_requests: list[tuple[str, str, str]] = []
+        self._rows = rows
+        self.data_state = _StateTable([{"data_cutoff_date": "2021-06-30"}])
+        self.ticker_stats = _StateTable(
+            [
+                {"symbol": "AAA", "last_date": "2021-06-30", "row_count": 10, "updated_at": "t1"},
+                {"symbol": "BBB", "last_date": "2021-06-30", "row_count": 10, "updated_at": "t1"},
+            ]
+        )
+
+    def table(self, name: str) -> Any:
+        if name == "prices":
+            return _DatedPricesTable(self._rows, self.price_requests)
+        if name == "data_state":
+            return self.data_state
+        if name == "ticker_stats":
+            return self.ticker_stats
+        raise AssertionError(f"unexpected table: {name}")
+
+
+def _cached_price_rows() -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for i, dt in enumerate(pd.bdate_range("2021-01-01", "2021-06-30")):
+        day = dt.strftime("%Y-%m-%d")
+        rows.append({"ticker": "AAA", "date": day, "adj_close": 100.0 + i})
+        if i % 7:
+            rows.append({"ticker": "BBB", "date": day, "adj_close": 50.0 + 0.5 * i})
+    return rows
+
+
+def test_fetch_prices_frame_cache_hit_matches_db_and_skips_price_queries(
+    monkeypatch, tmp_path
+) -> None:
+    from factorlab_engine.repositories import price_cache
+
+    io = object.__new__(SupabaseIO)
+    io.client = _CachedPricesClient(_cached_price_rows())
+    uncached = io.fetch_prices_frame(["AAA", "BBB"], "2021-02-01", "2021-05-31")
+
+    monkeypatch.setattr(price_cache, "_PRICE_CACHE_DIR", str(tmp_path))
+    io.client.price_requests.clear()
+    first = io.fetch_prices_frame(["AAA", "BBB"], "2021-02-01", "2021-05-31")
+    assert len(io.client.price_requests) == 2
+
+    io.client.price_requests.clear()
+    second = io.fetch_prices_frame(["AAA", "BBB"], "2021-02-01", "2021-05-31")
+
+    assert io.client.price_requests == []
+    pd.testing.assert_frame_equal(first, uncached)
+    pd.testing.assert_frame_equal(second, uncached)
+
+
+def test_fetch_prices_frame_cache_fetches_only_past_high_water_mark(monkeypatch, tmp_path) -> None:
+    from factorlab_engine.repositories import price_cache
+
+    monkeypatch.setattr(price_cache, "_PRICE_CACHE_DIR", str(tmp_path))
+    io = object.__new__(SupabaseIO)
+    io.client = _CachedPricesClient(_cached_price_rows())
+    io.fetch_prices_frame(["AAA"], "2021-01-01", "2021-03-31")
+
+    io.client.price_requests.clear()
+    extended = io.fetch_prices_frame(["AAA"], "2021-01-01", "2021-06-30")
+
+    assert io.client.price_requests == [("AAA", "2021-04-01", "2021-06-30")]
+    assert extended.index.max() == pd.Timestamp("2021-06-30")
+    assert len(extended) == len(pd.bdate_range("2021-01-01", "2021-06-30"))
+
+
+def test_fetch_prices_frame_cache_invalidated_by_ingest_or_cutoff_change(
+    monkeypatch, tmp_path
+) -> None:
+    from factorlab_engine.repositories import price_cache
+
+    monkeypatch.setattr(price_cache, "_PRICE_CACHE_DIR", str(tmp_path))
+    io = object.__new__(SupabaseIO)
+    io.client = _CachedPricesClient(_cached_price_rows())
+    io.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-03-31")
+
+    io.client.ticker_stats.rows[1]["updated_at"] = "t2"
+    io.client.price_requests.clear()
+    io.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-03-31")
+    assert io.client.price_requests == [("BBB", "2021-01-01", "2021-03-31")]
+
+    io.client.data_state.rows[0]["data_cutoff_date"] = "2021-07-01"
+    io.client.price_requests.clear()
+    io.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-03-31")
+    assert sorted(ticker for ticker, _, _ in io.client.price_requests) == ["AAA", "BBB"]
+
+
+def test_fallback_price_persist_invalidates_cached_tickers(monkeypatch, tmp_path) -> None:
+    from factorlab_engine.repositories import price_cache
+    from factorlab_engine.worker.pricing import _persist_prices_to_db
+
+    monkeypatch.setattr(price_cache, "_PRICE_CACHE_DIR", str(tmp_path))
+    io = object.__new__(SupabaseIO)
+    io.client = _CachedPricesClient(_cached_price_rows())
+    io.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-03-31")
+
+    upserts: list[list[dict[str, Any]]] = []
+    prices_table = SimpleNamespace(
+        upsert=lambda rows, on_conflict: SimpleNamespace(execute=lambda: upserts.append(rows))
+    )
+    writer = SimpleNamespace(client=SimpleNamespace(table=lambda name: prices_table))
+    frame = pd.DataFrame({"BBB": [1.0]}, index=pd.to_datetime(["2021-03-31"]))
+    # ticker_stats is untouched by this write, so only an explicit invalidation drops BBB.
+    _persist_prices_to_db(writer, frame)  # type: ignore[arg-type]
+
+    io.client.price_requests.clear()
+    io.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-03-31")
+    assert len(upserts) == 1
+    assert io.client.price_requests == [("BBB", "2021-01-01", "2021-03-31")]
+
+
+def test_price_cache_evicts_least_recently_used_tickers_past_its_size_bound(
+    monkeypatch, tmp_path
+) -> None:
+    import os
+    import time
+
+    from factorlab_engine.repositories import price_cache
+
+    monkeypatch.setattr(price_cache, "_PRICE_CACHE_DIR", str(tmp_path))
+    io = object.__new__(SupabaseIO)
+    io.client = _CachedPricesClient(_cached_price_rows())
+    io.fetch_prices_frame(["AAA"], "2021-01-01", "2021-03-31")
+    io.fetch_prices_frame(["BBB"], "2021-01-01", "2021-03-31")
+    size = os.path.getsize(tmp_path / "AAA.npz")
+    past = time.time() - 60
+    os.utime(tmp_path / "AAA.npz", (past, past))
+    os.utime(tmp_path / "BBB.npz", (past - 60, past - 60))
+
+    # A hit refreshes AAA, so BBB is the least recently used once the bound is exceeded.
+    monkeypatch.setattr(price_cache, "_PRICE_CACHE_MAX_BYTES", int(size * 1.5))
+    io.fetch_prices_frame(["AAA"], "2021-01-01", "2021-03-31")
+
+    assert sorted(path.name for path in tmp_path.glob("*.npz")) == ["AAA.npz"]
+
+
+class _BarrierPricesTable(_PricesTable):
+    """Blocks each ticker's first page until ``parties`` tickers are in flight at once."""
+
+    def __init__(self, rows: list[dict[str, Any]], barrier: threading.Barrier) -> None:
+        super().__init__(rows)
+        self._barrier = barrier
+
+    def eq(self, column: str, value: str) -> "_BarrierPricesTable":
+        return _BarrierPricesTable([r for r in self._rows if r.get(column) == value], self._barrier)
+
+    def execute(self) -> _Result:
+        self._barrier.wait()
+        return super().execute()
+
+
+def test_fetch_prices_frame_issues_ticker_queries_concurrently(monkeypatch) -> None:
+    from factorlab_engine.repositories import prices
+
+    tickers = ["AAA", "BBB", "CCC", "DDD"]
+    rows = [
+        {"ticker": t, "date": dt.strftime("%Y-%m-%d"), "adj_close": 10.0 * (i + 1) + j}
+        for i, t in enumerate(tickers)
+        for j, dt in enumerate(pd.bdate_range("2021-01-01", periods=20))
+    ]
+    sequential_io = object.__new__(SupabaseIO)
+    sequential_io.client = _FakePricesClient(_PricesTable(rows))
+    monkeypatch.setattr(prices, "_PRICE_FETCH_CONCURRENCY", 1)
+    expected = sequential_io.fetch_prices_frame(tickers, "2021-01-01", "2021-12-31")
+
+    # Every query waits until all four are running, so this only completes when the
+    # tickers are fetched in parallel.
+    monkeypatch.setattr(prices, "_PRICE_FETCH_CONCURRENCY", 4)
+    io = object.__new__(SupabaseIO)
+    io.client = _FakePricesClient(_BarrierPricesTable(rows, threading.Barrier(4, timeout=5)))
+    frame = io.fetch_prices_frame(tickers, "2021-01-01", "2021-12-31")
+
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+class _KeysetJobsTable:
+    """Jobs table that supports only keyset paging and records the seek value of each page."""
+
+    def __init__(self, rows: list[dict[str, Any]], seeks: list[Any]) -> None:
+        self._rows = rows
+        self._seeks = seeks
+        self._after: Any = None
+        self._limit = len(rows)
+
+    def select(self, _fields: str) -> "_KeysetJobsTable":
+        return self
+
+    def eq(self, _column: str, _value: Any) -> "_KeysetJobsTable":
+        return self
+
+    def gt(self, column: str, value: Any) -> "_KeysetJobsTable":
+        self._after = value
+        return self
+
+    def order(self, _column: str, desc: bool = False) -> "_KeysetJobsTable":  # noqa: ARG002
+        return self
+
+    def limit(self, count: int) -> "_KeysetJobsTable":
+        self._limit = count
+        return self
+
+    def execute(self) -> _Result:
+        self._seeks.append(self._after)
+        rows = sorted(self._rows, key=lambda r: r["id"])
+        if self._after is not None:
+            rows = [r for r in rows if r["id"] > self._after]
+        return _Result(rows[: self._limit])
+
+
+def test_select_keyset_seeks_past_last_key_instead_of_offsetting() -> None:
+    rows = [{"id": f"job-{i:02d}"} for i in range(5)]
+    seeks: list[Any] = []
+    io = object.__new__(SupabaseIO)
+    io.client = _FakeClient(_KeysetJobsTable(rows, seeks))  # type: ignore[arg-type]
+
+    selected = io._select_keyset(
+        lambda: io.client.table("jobs").select("id").eq("status", "queued"),
+        key="id",
+        context="test",
+        page_size=2,
+    )
+
+    assert selected == rows
+    assert seeks == [None, "job-01", "job-03"]
+
+
+def _packed_price_matrix(rows: list[dict[str, Any]]) -> dict[str, Any]:
+    """Encode rows the way get_price_matrix does (big-endian float8, dates x tickers)."""
+    tickers = sorted({row["ticker"] for row in rows})
+    dates = sorted({row["date"] for row in rows})
+    cells = {(row["date"], row["ticker"]): row["adj_close"] for row in rows}
+    packed = b"".join(
+        struct.pack(">d", cells.get((date, ticker), float("nan")))
+        for date in dates
+        for ticker in tickers
+    )
+    return {"tickers": tickers, "dates": dates, "values": base64.b64encode(packed).decode()}
+
+
+class _PriceMatrixClient(_FakePricesClient):
+    def __init__(self, prices_table: _PricesTable, rpc_result: Any) -> None:
+        super().__init__(prices_table)
+        self.rpc_result = rpc_result
+        self.rpc_calls: list[tuple[str, dict[str, Any]]] = []
+
+    def rpc(self, fn: str, params: dict[str, Any]) -> Any:
+        self.rpc_calls.append((fn, params))
+        if isinstance(self.rpc_result, Exception):
+            raise self.rpc_result
+        return SimpleNamespace(execute=lambda: _Result(self.rpc_result))  # type: ignore[arg-type]
+
+
+def test_fetch_prices_frame_decodes_price_matrix_rpc_like_row_pivot(monkeypatch) -> None:
+    rows = [
+        {"ticker": "BBB", "date": "2021-01-04", "adj_close": 50.25},
+        {"ticker": "AAA", "date": "2021-01-04", "adj_close": 100.1},
+        {"ticker": "AAA", "date": "2021-01-05", "adj_close": 101.7},
+        {"ticker": "BBB", "date": "2021-01-06", "adj_close": 51.0},
+        {"ticker": "AAA", "date": "2021-01-07", "adj_close": 99.3},
+    ]
+    io_rows = object.__new__(SupabaseIO)
+    io_rows.client = _FakePricesClient(_PricesTable(rows))
+    expected = io_rows.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-01-31")
+
+    from factorlab_engine.repositories import price_matrix
+
+    monkeypatch.setattr(price_matrix, "_PRICE_MATRIX_RPC", True)
+    client = _PriceMatrixClient(_PricesTable([]), _packed_price_matrix(rows))
+    io = object.__new__(SupabaseIO)
+    io.client = client
+    frame = io.fetch_prices_frame(["AAA", "BBB"], "2021-01-01", "2021-01-31")
+
+    pd.testing.assert_frame_equal(frame, expected)
+    assert client.rpc_calls == [
+        (
+            "get_price_matrix",
+            {"p_tickers": ["AAA", "BBB"], "p_start": "2021-01-01", "p_end": "2021-01-31"},
+        )
+    ]
+
+
+def test_fetch_prices_frame_falls_back_to_row_queries_when_rpc_missing(monkeypatch) -> None:
+    rows = [{"ticker": "AAA", "date": "2021-01-04", "adj_close": 100.0}]
+    from factorlab_engine.repositories import price_matrix
+
+    monkeypatch.setattr(price_matrix, "_PRICE_MATRIX_RPC", True)
+    client = _PriceMatrixClient(
+        _PricesTable(rows),
+        RuntimeError("Could not find the function public.get_price_matrix in the schema cache"),
+    )
+    io = object.__new__(SupabaseIO)
+    io.client = client
+
+    first = io.fetch_prices_frame(["AAA"], "2021-01-01", "2021-01-31")
+    second = io.fetch_prices_frame(["AAA"], "2021-01-01", "2021-01-31")
+
+    assert list(first.columns) == ["AAA"] and len(first) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert len(client.rpc_calls) == 1
+
+
+def test_shared_price_frame_serves_what_a_fresh_fetch_returns() -> None:
+    from factorlab_engine.repositories.shared_prices import SharedPriceFrame
+
+    rows = _cached_price_rows()
+    rows += [
+        {"ticker": "CCC", "date": day.strftime("%Y-%m-%d"), "adj_close": 10.0}
+        for day in pd.bdate_range("2021-01-04", "2021-01-29")
+    ]
+    fresh = object.__new__(SupabaseIO)
+    fresh.client = _CachedPricesClient(rows)
+    union = ["AAA", "BBB", "CCC", "ZZZ"]
+    shared = SharedPriceFrame.create(
+        fresh.fetch_unfilled_prices_frame(union, "2021-01-01", "2021-06-30"),
+        union,
+        "2021-01-01",
+        "2021-06-30",
+    )
+    assert shared is not None
+    try:
+        io = object.__new__(SupabaseIO)
+        io.client = _CachedPricesClient([])
+        io.shared_prices = SharedPriceFrame.attach(shared.spec)
+        for tickers, start, end in [
+            (union, "2021-01-01", "2021-06-30"),
+            (["BBB", "CCC"], "2021-03-01", "2021-04-15"),
+            (["CCC", "ZZZ"], "2021-01-15", "2021-02-15"),
+            (["ZZZ"], "2021-01-01", "2021-06-30"),
+        ]:
+            pd.testing.assert_frame_equal(
+                io.fetch_prices_frame(tickers, start, end),
+                fresh.fetch_prices_frame(tickers, start, end),
+            )
+        assert io.client.price_requests == []
+
+        # Outside the shared window the worker falls back to its own query.
+        io.fetch_prices_frame(["AAA"], "2020-12-01", "2021-01-31")
+        assert io.client.price_requests == [("AAA", "2020-12-01", "2021-01-31")]
+
+        # Every column, no gaps: the frame is a read-only view of the shared segment.
+        view = io.fetch_prices_frame(["AAA", "BBB", "CCC"], "2021-01-04", "2021-01-08")
+        assert np.shares_memory(view.to_numpy(), io.shared_prices.matrix)
+
+        # A worker can only unmap the segment once the frames viewing it are gone.
+        attached, io.shared_prices = io.shared_prices, None
+        del view
+        assert attached.close()
+    finally:
+        shared.unlink()
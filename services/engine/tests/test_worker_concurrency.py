@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from types import SimpleNamespace
 from typing import Any, Callable
 
 from factorlab_engine.supabase_io import Job
@@ -29,6 +30,13 @@ def test_resolve_backtest_concurrency_clamps_invalid_values(monkeypatch) -> None
 
 def test_partition_jobs_keeps_only_backtests_in_concurrent_bucket() -> None:
     backtest = Job(id="job-backtest", run_id="run-1", name="Backtest")
+    sweep = Job(
+        id="job-sweep",
+        run_id="run-2",
+        name="Sweep",
+        job_type="baseline_sweep",
+        payload={"top_n": [3, 5]},
+    )
     legacy_ingest = Job(
         id="job-ingest",
         run_id=None,
@@ -37,12 +45,42 @@ def test_partition_jobs_keeps_only_backtests_in_concurrent_bucket() -> None:
         payload={"ticker": "SPY"},
     )
 
-    concurrent_jobs, sequential_jobs = _partition_jobs_for_concurrency([backtest, legacy_ingest])
+    concurrent_jobs, sequential_jobs = _partition_jobs_for_concurrency(
+        [backtest, sweep, legacy_ingest]
+    )
 
-    assert concurrent_jobs == [backtest]
+    assert concurrent_jobs == [backtest, sweep]
     assert sequential_jobs == [legacy_ingest]
 
 
+def test_group_ml_backtest_jobs_merges_runs_sharing_prices_and_window() -> None:
+    from factorlab_engine.worker.ml_execution import _group_ml_backtest_jobs
+
+    base = {
+        "start_date": "2021-01-04",
+        "end_date": "2021-06-30",
+        "benchmark": "SPY",
+        "universe_symbols": ["AAA", "BBB"],
+    }
+    runs = {
+        "run-1": {**base, "id": "run-1", "strategy_id": "ml_ridge"},
+        "run-2": {**base, "id": "run-2", "strategy_id": "equal_weight"},
+        "run-3": {**base, "id": "run-3", "strategy_id": "ml_lightgbm", "top_n": 3},
+        "run-4": {**base, "id": "run-4", "strategy_id": "ml_ridge", "end_date": "2021-07-30"},
+    }
+
+    class _IO:
+        def fetch_run(self, run_id: str) -> dict[str, Any]:
+            return runs[run_id]
+
+    jobs = [Job(id=f"job-{i}", run_id=f"run-{i}", name=str(i)) for i in range(1, 5)]
+    ingest = Job(id="job-ingest", run_id=None, name="Ingest", job_type="data_ingest")
+
+    units = _group_ml_backtest_jobs(_IO(), [*jobs, ingest])  # type: ignore[arg-type]
+
+    assert units == [(jobs[0], jobs[2]), jobs[1], jobs[3], ingest]
+
+
 def test_process_backtest_jobs_concurrently_uses_fresh_runner_per_job() -> None:
     jobs = [
         Job(id="job-1", run_id="run-1", name="One"),
@@ -58,14 +96,11 @@ def test_process_backtest_jobs_concurrently_uses_fresh_runner_per_job() -> None:
             return self._result
 
     class _Executor:
-        def __init__(self, *, max_workers: int, mp_context: Any) -> None:
+        def __init__(self, *, max_workers: int, mp_context: Any, initializer: Any) -> None:
             self.max_workers = max_workers
             self.mp_context = mp_context
 
-        def __enter__(self) -> "_Executor":
-            return self
-
-        def __exit__(self, *args: object) -> None:
+        def shutdown(self, wait: bool = True) -> None:
             return None
 
         def submit(self, runner: Callable[[Job], str], job: Job) -> _Future:
@@ -86,3 +121,217 @@ def test_process_backtest_jobs_concurrently_uses_fresh_runner_per_job() -> None:
 
     assert submitted == jobs
     assert processed == 2
+
+
+def test_process_backtest_jobs_shares_one_price_load_across_the_batch(monkeypatch) -> None:
+    from multiprocessing import shared_memory
+
+    import pandas as pd
+    import pytest
+
+    from factorlab_engine.repositories.shared_prices import SharedPriceFrame
+    from factorlab_engine.worker import claiming
+
+    dates = pd.bdate_range("2019-01-01", "2021-12-31")
+    unfilled = pd.DataFrame(
+        {"AAA": 1.0, "BBB": 2.0, "SPY": 3.0},
+        index=pd.DatetimeIndex(dates.to_numpy(), name="date"),
+    ).rename_axis(columns="ticker")
+    runs = {
+        "run-1": {"id": "run-1", "strategy_id": "equal_weight", "universe_symbols": ["AAA"]},
+        "run-2": {"id": "run-2", "strategy_id": "low_vol", "universe_symbols": ["AAA", "BBB"]},
+    }
+    for run in runs.values():
+        run.update(start_date="2021-01-04", end_date="2021-06-30", benchmark="SPY")
+
+    class _IO:
+        def __init__(self) -> None:
+            self.price_loads: list[tuple[list[str], str, str]] = []
+
+        def fetch_run(self, run_id: str) -> dict[str, Any]:
+            return runs[run_id]
+
+        def fetch_unfilled_prices_frame(
+            self, tickers: list[str], start: str, end: str
+        ) -> pd.DataFrame:
+            self.price_loads.append((tickers, start, end))
+            return unfilled.loc[start:end]
+
+    served: dict[str, pd.DataFrame] = {}
+    segments: list[str] = []
+
+    def fake_concurrently(
+        jobs: list[Job], *, max_workers: int, shared_prices: Any, pool: Any
+    ) -> int:
+        segments.append(shared_prices.name)
+        attached = SharedPriceFrame.attach(shared_prices)
+        for job in jobs:
+            served[job.id] = attached.frame(["AAA", "SPY"], "2021-01-04", "2021-06-30").copy()
+        return len(jobs)
+
+    monkeypatch.setattr(claiming, "_SHARED_PRICE_FRAMES", True)
+    monkeypatch.setattr(claiming, "_process_backtest_jobs_concurrently", fake_concurrently)
+    jobs = [
+        Job(id="job-1", run_id="run-1", name="One"),
+        Job(id="job-2", run_id="run-2", name="Two"),
+    ]
+    io = _IO()
+
+    claiming._process_backtest_jobs(io, jobs, concurrency=2)  # type: ignore[arg-type]
+
+    assert len(io.price_loads) == 1
+    tickers, start, _ = io.price_loads[0]
+    assert tickers == ["AAA", "BBB", "SPY"]
+    assert start < "2021-01-04"
+    expected = unfilled.loc["2021-01-04":"2021-06-30", ["AAA", "SPY"]]
+    assert set(served) == {"job-1", "job-2"}
+    for frame in served.values():
+        pd.testing.assert_frame_equal(frame, expected)
+    # The parent removes the segment once the batch is done.
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=segments[0])
+
+
+def test_backtest_worker_pool_stays_warm_until_a_worker_hits_its_limits() -> None:
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    from factorlab_engine.worker.pool import _BacktestWorkerPool, _WorkerReport
+
+    executors: list[Any] = []
+
+    class _Executor:
+        def __init__(self, *, max_workers: int, mp_context: Any, initializer: Any) -> None:
+            self.initializer = initializer
+            self.shut_down = False
+            executors.append(self)
+
+        def submit(self, runner: Callable[[Job], Any], job: Job) -> Future:
+            future: Future = Future()
+            try:
+                future.set_result(runner(job))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+
+        def shutdown(self, wait: bool = True) -> None:
+            self.shut_down = True
+
+    reports = iter([(1, 100.0), (2, 100.0), (3, 100.0), (1, 900.0)])
+
+    def runner(job: Job) -> _WorkerReport:
+        if job.id == "crash":
+            raise BrokenProcessPool("worker died")
+        jobs_done, rss_mb = next(reports)
+        return _WorkerReport(pid=123, jobs_done=jobs_done, rss_mb=rss_mb)
+
+    pool = _BacktestWorkerPool(
+        2,
+        executor_cls=_Executor,  # type: ignore[arg-type]
+        mp_context_factory=lambda _method: "spawn-context",
+        max_jobs_per_worker=3,
+        max_rss_mb=512,
+    )
+
+    def run_batch(*job_ids: str) -> int:
+        return _process_backtest_jobs_concurrently(
+            [Job(id=job_id, run_id=f"run-{job_id}", name=job_id) for job_id in job_ids],
+            max_workers=2,
+            runner=runner,
+            as_completed_fn=lambda futures: futures,
+            pool=pool,
+        )
+
+    assert run_batch("a") == 1
+    assert run_batch("b") == 1
+    assert len(executors) == 1 and not executors[0].shut_down
+
+    # Third job on the same worker reaches max_jobs_per_worker: recycled after the batch.
+    assert run_batch("c") == 1
+    assert executors[0].shut_down
+
+    # Memory limit and dead workers recycle too; the next batch gets a fresh pool.
+    assert run_batch("d") == 1
+    assert len(executors) == 2 and executors[1].shut_down
+    assert run_batch("crash") == 0
+    assert len(executors) == 3 and executors[2].shut_down
+
+
+def test_backtest_worker_rss_limit_defaults_to_a_share_of_instance_memory(monkeypatch) -> None:
+    from factorlab_engine.worker import settings
+    from factorlab_engine.worker.pool import _BacktestWorkerPool
+
+    monkeypatch.setattr(settings, "_BACKTEST_WORKER_MAX_RSS_MB", None)
+    monkeypatch.setattr(settings, "_WORKER_MEMORY_MB", 2048)
+    assert _BacktestWorkerPool(1).max_rss_mb == 2048
+    assert _BacktestWorkerPool(4).max_rss_mb == 512
+
+    monkeypatch.setattr(settings, "_BACKTEST_WORKER_MAX_RSS_MB", 900)
+    assert _BacktestWorkerPool(4).max_rss_mb == 900
+    assert _BacktestWorkerPool(4, max_rss_mb=0).max_rss_mb == 0
+
+
+def test_warm_worker_unmaps_shared_prices_after_each_batch(monkeypatch) -> None:
+    import os
+
+    import pandas as pd
+    import pytest
+
+    from factorlab_engine.repositories.shared_prices import SharedPriceFrame
+    from factorlab_engine.worker import claiming
+
+    if not os.path.exists("/proc/self/maps"):
+        pytest.skip("needs /proc/self/maps")
+
+    def mappings(name: str) -> int:
+        with open("/proc/self/maps") as maps:
+            return sum(name.lstrip("/") in line for line in maps)
+
+    frame = pd.DataFrame(
+        {"AAA": [1.0, 2.0]}, index=pd.to_datetime(["2021-01-04", "2021-01-05"])
+    ).rename_axis(index="date", columns="ticker")
+    io = SimpleNamespace(shared_prices=None)
+    seen: list[int] = []
+
+    def process_unit(io: Any, job: Job) -> None:
+        # The worker's job reads the shared matrix, as fetch_prices_frame would.
+        served = io.shared_prices.frame(["AAA"], "2021-01-01", "2021-01-31")
+        seen.append(mappings(io.shared_prices.spec.name))
+        assert served["AAA"].tolist() == [1.0, 2.0]
+
+    monkeypatch.setattr(claiming, "_worker_io", lambda: io)
+    monkeypatch.setattr(claiming, "_process_backtest_unit", process_unit)
+    monkeypatch.setattr(claiming, "_finish_worker_job", lambda: None)
+
+    for batch in range(3):
+        shared = SharedPriceFrame.create(frame, ["AAA"], "2021-01-01", "2021-01-31")
+        assert shared is not None
+        name = shared.spec.name
+        try:
+            job = Job(id=f"job-{batch}", run_id=f"run-{batch}", name="Job")
+            claiming._process_job_in_warm_worker(job, shared_prices=shared.spec)
+            # Only the creator's mapping remains once the worker's job is done.
+            assert seen[-1] == 2
+            assert mappings(name) == 1
+            assert io.shared_prices is None
+        finally:
+            shared.unlink()
+        assert mappings(name) == 0
+
+
+def test_sweep_timeout_budget_scales_with_strategy_evaluations(monkeypatch) -> None:
+    from factorlab_engine.worker import settings, sweep
+
+    monkeypatch.setattr(settings, "_JOB_TIMEOUT_SECONDS", 600)
+    run = {"strategy_id": "momentum_12_1", "top_n": 5, "costs_bps": 10}
+
+    assert sweep._sweep_timeout_seconds(run, None) == 600
+    # equal_weight ignores top_n: 3 momentum + 1 equal_weight evaluations, costs batched.
+    payload = {
+        "strategies": ["momentum_12_1", "equal_weight"],
+        "top_n": [3, 5, 10],
+        "costs_bps": [0, 10, 25],
+    }
+    assert sweep._sweep_timeout_seconds(run, payload) == 4 * 600
+    # Invalid grids keep one budget; the job reports the parse error itself.
+    assert sweep._sweep_timeout_seconds(run, {"strategies": ["ml_ridge"]}) == 600
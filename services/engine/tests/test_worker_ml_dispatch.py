@@ -157,6 +157,8 @@ def test_process_job_lightgbm_persists_model_impl_when_available():
     assert io.run_metadata_payload.get("data_snapshot_cutoff") == "2025-12-31"
     assert io.run_metadata_payload.get("data_snapshot_mode") == "db_only_strict_v1"
     assert io.run_metadata_payload.get("runtime_download_used") is False
+    period = io.run_metadata_payload["period_metrics"]
+    assert period["window_days"] == 252 and period["calendar_years"]["years"]
 
 
 def test_process_job_ml_ridge_repeatability_persists_same_snapshot_digests():
@@ -202,3 +204,136 @@ def test_process_job_ml_ridge_fails_when_snapshot_cutoff_is_unavailable(monkeypa
     assert io.failure is not None
     assert "ML reproducibility guard" in io.failure.error_message
     assert "Runtime price downloads are disabled for ML runs" in io.failure.error_message
+
+
+class _BatchIO(_FakeIO):
+    def __init__(self, runs: list[dict[str, Any]], prices: pd.DataFrame) -> None:
+        super().__init__(run=runs[0], prices=prices)
+        self._runs = {run["id"]: run for run in runs}
+        self.price_loads = 0
+        self.failed_jobs: list[str] = []
+
+    def fetch_run(self, run_id: str) -> dict[str, Any] | None:
+        return dict(self._runs[run_id])
+
+    def fetch_prices_frame(
+        self, tickers: list[str], start_date: str, end_date: str
+    ) -> pd.DataFrame:
+        self.price_loads += 1
+        return super().fetch_prices_frame(tickers, start_date, end_date)
+
+    def heartbeat_job(self, job_id: str) -> None:  # noqa: ARG002
+        return
+
+    def save_failure(self, job: Job, duration_seconds: int, error_message: str, **kwargs) -> None:
+        super().save_failure(job, duration_seconds, error_message, **kwargs)
+        self.failed_jobs.append(job.id)
+
+
+def _saved_predictions(io: _FakeIO) -> dict[str, list[dict[str, Any]]]:
+    return {
+        payload["job"].id: list(payload["prediction_rows"]) for payload in io.save_success_payloads
+    }
+
+
+@pytest.mark.parametrize("batch_fails", [False, True])
+def test_compatible_ml_jobs_train_in_one_batch_and_persist_separately(monkeypatch, batch_fails):
+    from factorlab_engine.worker import claiming
+
+    prices = _make_prices()
+    runs = [
+        _make_run(strategy_id="ml_ridge", run_id="run-batch-a"),
+        {**_make_run(strategy_id="ml_ridge", run_id="run-batch-b"), "top_n": 3},
+    ]
+    jobs = [Job(id=f"job-{run['id']}", run_id=run["id"], name="job") for run in runs]
+    if batch_fails:
+
+        def _failing_batch(*args: Any, **kwargs: Any) -> Any:
+            raise RuntimeError("batch exploded")
+
+        monkeypatch.setattr(claiming, "_build_ml_batch_results", _failing_batch)
+
+    io = _BatchIO(runs, prices)
+    claiming._process_backtest_jobs(io, jobs, concurrency=1)  # type: ignore[arg-type]
+
+    assert io.failure is None
+    assert io.price_loads == (2 if batch_fails else 1)
+    batched = _saved_predictions(io)
+    assert set(batched) == {job.id for job in jobs}
+    for run, job in zip(runs, jobs):
+        alone = _FakeIO(run=run, prices=prices)
+        _process_job(alone, job)
+        assert batched[job.id] == _saved_predictions(alone)[job.id]
+    top_ns = {
+        job_id: sum(row["selected"] for row in rows if row["as_of_date"] == rows[0]["as_of_date"])
+        for job_id, rows in batched.items()
+    }
+    assert top_ns == {"job-run-batch-a": 2, "job-run-batch-b": 3}
+
+
+def test_timed_out_ml_batch_fails_its_jobs_instead_of_rerunning_them(monkeypatch):
+    from factorlab_engine.worker import claiming
+
+    runs = [
+        _make_run(strategy_id="ml_ridge", run_id="run-slow-a"),
+        {**_make_run(strategy_id="ml_ridge", run_id="run-slow-b"), "top_n": 3},
+    ]
+    jobs = [Job(id=f"job-{run['id']}", run_id=run["id"], name="job") for run in runs]
+
+    def _slow_batch(*args: Any, **kwargs: Any) -> Any:
+        raise claiming._JobTimeout("Job exceeded maximum runtime of 1800s (30 min).")
+
+    monkeypatch.setattr(claiming, "_build_ml_batch_results", _slow_batch)
+    io = _BatchIO(runs, _make_prices())
+
+    claiming._process_backtest_jobs(io, jobs, concurrency=1)  # type: ignore[arg-type]
+
+    assert io.failed_jobs == [job.id for job in jobs]
+    assert io.failure is not None and "maximum runtime" in io.failure.error_message
+    assert io.price_loads == 0
+    assert io.save_success_payloads == []
+
+
+def test_batched_ml_jobs_keep_beating_while_earlier_jobs_persist(monkeypatch):
+    from factorlab_engine.worker import claiming
+
+    runs = [_make_run(strategy_id="ml_ridge", run_id=f"run-wait-{key}") for key in "abc"]
+    jobs = [Job(id=f"job-{run['id']}", run_id=run["id"], name="job") for run in runs]
+    beats: list[Any] = []
+
+    class _ManualHeartbeat:
+        def __init__(self, beat_fn: Any, interval: int = 15, *, job_id: str = "") -> None:
+            self._beat_fn = beat_fn
+
+        def __enter__(self) -> "_ManualHeartbeat":
+            beats.append(self._beat_fn)
+            return self
+
+        def __exit__(self, *args: object) -> None:
+            beats.remove(self._beat_fn)
+
+    beaten_during: dict[str, list[str]] = {}
+
+    def _persisting_job(io: Any, job: Job, *, precomputed: Any = None) -> None:
+        io.beaten = []
+        for beat in beats:
+            beat()
+        beaten_during[job.id] = io.beaten
+
+    class _RecordingIO(_BatchIO):
+        def heartbeat_job(self, job_id: str) -> None:
+            self.beaten.append(job_id)
+
+    monkeypatch.setattr(claiming, "_Heartbeat", _ManualHeartbeat)
+    monkeypatch.setattr(claiming, "_compute_ml_job_batch", lambda io, claimed: {})
+    monkeypatch.setattr(claiming, "_run_claimed_job", _persisting_job)
+
+    io = _RecordingIO(runs, _make_prices())
+    claiming._process_ml_job_batch(io, tuple(jobs))  # type: ignore[arg-type]
+
+    assert beaten_during == {
+        jobs[0].id: [jobs[1].id, jobs[2].id],
+        jobs[1].id: [jobs[2].id],
+        jobs[2].id: [],
+    }
+    assert beats == []
@@ -0,0 +1,143 @@
+-- =============================================================================
+-- 20261018010000_replace_run_rows.sql
+--
+-- Bulk writers for the engine's per-run result tables.  save_success used to
+-- delete a run's equity_curve / model_predictions / positions rows and then
+-- re-insert them in 500-row PostgREST chunks, one round trip per chunk.  Each
+-- replace_<table>(p_run_id, p_payload) function does the delete and the insert
+-- in one call (and therefore one transaction).  With p_replace = false it only
+-- appends: a table larger than RUN_ROWS_RPC_MAX_ROWS rows is written as one
+-- replacing call followed by appending calls of at most that many rows each.
+--
+-- p_payload is columnar:
+--
+--   rows     number of rows
+--   columns  column name -> JSON array of values, one per row, or
+--            {"dict": [...distinct values...], "codes": [...0-based indexes...]}
+--            for dictionary-encoded columns (dates, tickers, model names)
+--
+-- run_id is passed once as p_run_id instead of being repeated on every row.
+-- The engine falls back to the chunked inserts (delete first, then re-insert
+-- everything) if these functions are missing or a call hits the statement
+-- timeout.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION public.run_rows_column(p_payload JSONB, p_column TEXT)
+RETURNS TEXT[]
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN jsonb_typeof(p_payload -> 'columns' -> p_column) = 'object' THEN
+      ARRAY(
+        SELECT (p_payload -> 'columns' -> p_column -> 'dict') ->> code::int
+        FROM jsonb_array_elements_text(p_payload -> 'columns' -> p_column -> 'codes')
+          WITH ORDINALITY AS c(code, ord)
+        ORDER BY ord
+      )
+    ELSE
+      ARRAY(
+        SELECT value
+        FROM jsonb_array_elements_text(p_payload -> 'columns' -> p_column)
+          WITH ORDINALITY AS c(value, ord)
+        ORDER BY ord
+      )
+  END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.replace_equity_curve(
+  p_run_id UUID,
+  p_payload JSONB,
+  p_replace BOOLEAN DEFAULT true
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  IF p_replace THEN
+    DELETE FROM public.equity_curve WHERE run_id = p_run_id;
+  END IF;
+  INSERT INTO public.equity_curve (run_id, date, portfolio, benchmark)
+  SELECT p_run_id, c.date::date, c.portfolio::numeric, c.benchmark::numeric
+  FROM unnest(
+    run_rows_column(p_payload, 'date'),
+    run_rows_column(p_payload, 'portfolio'),
+    run_rows_column(p_payload, 'benchmark')
+  ) AS c(date, portfolio, benchmark);
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.replace_model_predictions(
+  p_run_id UUID,
+  p_payload JSONB,
+  p_replace BOOLEAN DEFAULT true
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  IF p_replace THEN
+    DELETE FROM public.model_predictions WHERE run_id = p_run_id;
+  END IF;
+  INSERT INTO public.model_predictions (
+    run_id, model_name, as_of_date, target_date, ticker,
+    predicted_return, realized_return, rank, selected, weight
+  )
+  SELECT
+    p_run_id, c.model_name, c.as_of_date::date, c.target_date::date, c.ticker,
+    c.predicted_return::numeric, c.realized_return::numeric, c.rank::integer,
+    c.selected::boolean, c.weight::numeric
+  FROM unnest(
+    run_rows_column(p_payload, 'model_name'),
+    run_rows_column(p_payload, 'as_of_date'),
+    run_rows_column(p_payload, 'target_date'),
+    run_rows_column(p_payload, 'ticker'),
+    run_rows_column(p_payload, 'predicted_return'),
+    run_rows_column(p_payload, 'realized_return'),
+    run_rows_column(p_payload, 'rank'),
+    run_rows_column(p_payload, 'selected'),
+    run_rows_column(p_payload, 'weight')
+  ) AS c(
+    model_name, as_of_date, target_date, ticker,
+    predicted_return, realized_return, rank, selected, weight
+  );
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.replace_positions(
+  p_run_id UUID,
+  p_payload JSONB,
+  p_replace BOOLEAN DEFAULT true
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+  v_rows INTEGER;
+BEGIN
+  IF p_replace THEN
+    DELETE FROM public.positions WHERE run_id = p_run_id;
+  END IF;
+  INSERT INTO public.positions (run_id, date, symbol, weight)
+  SELECT p_run_id, c.date::date, c.symbol, c.weight::numeric
+  FROM unnest(
+    run_rows_column(p_payload, 'date'),
+    run_rows_column(p_payload, 'symbol'),
+    run_rows_column(p_payload, 'weight')
+  ) AS c(date, symbol, weight);
+  GET DIAGNOSTICS v_rows = ROW_COUNT;
+  RETURN v_rows;
+END;
+$$;
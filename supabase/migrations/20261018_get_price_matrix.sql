@@ -0,0 +1,69 @@
+-- =============================================================================
+-- 20261018_get_price_matrix.sql
+--
+-- Bulk price loader for the engine.  fetch_prices_frame used to pull one JSON
+-- row per (ticker, date) and pivot them in pandas; for a 5-year SP100 window
+-- that is ~126 000 JSON objects.  get_price_matrix returns the same window as a
+-- single packed payload:
+--
+--   tickers  text[] in byte (COLLATE "C") order, only tickers with rows
+--   dates    ascending union of the tickers' trading dates (YYYY-MM-DD)
+--   values   base64 of big-endian float8 (float8send), row-major over
+--            dates x tickers, NaN where a ticker has no row on a date
+--
+-- The engine only calls it when PRICE_MATRIX_RPC=1 and falls back to the
+-- per-ticker row queries if the function is missing.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION public.get_price_matrix(
+  p_tickers TEXT[],
+  p_start DATE,
+  p_end DATE
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  WITH window_rows AS (
+    SELECT p.ticker, p.date, p.adj_close::float8 AS adj_close
+    FROM public.prices p
+    WHERE p.ticker = ANY(p_tickers)
+      AND p.date BETWEEN p_start AND p_end
+  ),
+  tickers AS (
+    SELECT t.ticker, ROW_NUMBER() OVER (ORDER BY t.ticker COLLATE "C") AS col
+    FROM (SELECT DISTINCT ticker FROM window_rows) t
+  ),
+  dates AS (
+    SELECT d.date, ROW_NUMBER() OVER (ORDER BY d.date) AS row
+    FROM (SELECT DISTINCT date FROM window_rows) d
+  ),
+  cells AS (
+    SELECT d.row, t.col, w.adj_close
+    FROM dates d
+    CROSS JOIN tickers t
+    LEFT JOIN window_rows w ON w.date = d.date AND w.ticker = t.ticker
+  )
+  SELECT jsonb_build_object(
+    'tickers', COALESCE((SELECT jsonb_agg(ticker ORDER BY col) FROM tickers), '[]'::jsonb),
+    'dates', COALESCE(
+      (SELECT jsonb_agg(to_char(date, 'YYYY-MM-DD') ORDER BY row) FROM dates),
+      '[]'::jsonb
+    ),
+    'values', COALESCE(
+      (
+        SELECT translate(
+          encode(
+            string_agg(float8send(COALESCE(adj_close, 'NaN'::float8)), ''::bytea ORDER BY row, col),
+            'base64'
+          ),
+          E'\n',
+          ''
+        )
+        FROM cells
+      ),
+      ''
+    )
+  );
+$$;